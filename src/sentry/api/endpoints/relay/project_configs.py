@@ -2,6 +2,7 @@ import logging
 from collections.abc import MutableMapping
 from typing import Any
 
+from django.http import HttpResponse
 from rest_framework.request import Request
 from rest_framework.response import Response
 from sentry_sdk import Hub, set_tag, start_span
@@ -18,7 +19,7 @@ from sentry.models.projectkey import ProjectKey, ProjectKeyStatus
 from sentry.relay import config, projectconfig_cache
 from sentry.relay.globalconfig import get_global_config
 from sentry.tasks.relay import schedule_build_project_config
-from sentry.utils import metrics
+from sentry.utils import json, metrics
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +29,17 @@ PROJECT_CONFIG_SIZE_THRESHOLD = 10000
 ProjectConfig = MutableMapping[str, Any]
 
 
+def _serialize_with_configs(response: dict[str, Any]) -> str:
+    """
+    Serializes a response whose `configs` are mapped to JSON strings.
+    """
+    configs = ",".join(
+        f"{json.dumps(public_key)}:{config}" for public_key, config in response["configs"].items()
+    )
+    rest = json.dumps({k: v for k, v in response.items() if k != "configs"})[1:-1]
+    return f'{{"configs":{{{configs}}}{"," if rest else ""}{rest}}}'
+
+
 @region_silo_endpoint
 class RelayProjectConfigsEndpoint(Endpoint):
     publish_status = {
@@ -60,6 +72,9 @@ class RelayProjectConfigsEndpoint(Endpoint):
             # configs to processing relays, and these validate the requests they
             # get with permissions and trim configs down accordingly.
             response.update(self._post_or_schedule_by_key(request))
+            # Cached configs are already serialized and are written to the
+            # response as they are.
+            return HttpResponse(_serialize_with_configs(response), content_type="application/json")
         elif version in ["2", "3"]:
             response["configs"] = self._post_by_key(
                 request=request,
@@ -143,14 +158,14 @@ class RelayProjectConfigsEndpoint(Endpoint):
         metrics.incr("relay.project_configs.post_v3.fetched", amount=len(proj_configs))
         return {"configs": proj_configs, "pending": pending}
 
-    def _get_cached_or_schedule(self, public_key) -> dict | None:
+    def _get_cached_or_schedule(self, public_key) -> str | None:
         """
-        Returns the config of a project if it's in the cache; else, schedules a
-        task to compute and write it into the cache.
+        Returns the serialized config of a project if it's in the cache; else,
+        schedules a task to compute and write it into the cache.
 
         Debouncing of the project happens after the task has been scheduled.
         """
-        cached_config = projectconfig_cache.backend.get(public_key)
+        cached_config = projectconfig_cache.backend.get_serialized(public_key)
         if cached_config:
             return cached_config
 
@@ -0,0 +1,195 @@
+"""
+An in-process front buffer for `buffer.incr`.
+
+A hot issue can produce thousands of `buffer.incr` calls per second for the
+same group from a single process, each of which costs a round trip to the
+buffer backend. The `IncrAccumulator` coalesces increments for the same
+(model, filters) pair and forwards the combined increment to the buffer
+backend once the oldest pending increment is older than `max_delay` seconds,
+or once `max_keys` distinct keys are pending.
+
+Pending increments are also flushed when the process exits and before an
+arroyo consumer commits offsets, see `flush`. Only the consumer process
+itself can flush before committing, so its multiprocessing workers send
+their increments to the buffer backend directly, see `disable`.
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import threading
+from typing import Any
+
+from celery.signals import worker_process_shutdown
+
+from sentry import options
+from sentry.db import models
+from sentry.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+AccumulatorKey = tuple[type[models.Model], tuple[tuple[str, Any], ...], bool]
+
+
+class PendingIncr:
+    __slots__ = ("model", "columns", "filters", "extra", "signal_only")
+
+    def __init__(
+        self,
+        model: type[models.Model],
+        filters: dict[str, Any],
+        signal_only: bool | None,
+    ) -> None:
+        self.model = model
+        self.columns: dict[str, int] = {}
+        self.filters = filters
+        self.extra: dict[str, Any] = {}
+        self.signal_only = signal_only
+
+
+class IncrAccumulator:
+    def __init__(self, max_delay: float, max_keys: int) -> None:
+        assert max_delay > 0
+        assert max_keys > 0
+        self.max_delay = max_delay
+        self.max_keys = max_keys
+
+        self._lock = threading.Lock()
+        self._pending: dict[AccumulatorKey, PendingIncr] = {}
+        self._timer: threading.Timer | None = None
+        self._pid = os.getpid()
+
+    @staticmethod
+    def _make_key(
+        model: type[models.Model], filters: dict[str, Any], signal_only: bool | None
+    ) -> AccumulatorKey:
+        return (
+            model,
+            tuple(
+                sorted((k, v.pk if isinstance(v, models.Model) else v) for k, v in filters.items())
+            ),
+            bool(signal_only),
+        )
+
+    def incr(
+        self,
+        model: type[models.Model],
+        columns: dict[str, int],
+        filters: dict[str, Any],
+        extra: dict[str, Any] | None = None,
+        signal_only: bool | None = None,
+    ) -> None:
+        """
+        Same as `buffer.incr`: counters are summed up and `extra` values are
+        last write wins.
+        """
+        key = self._make_key(model, filters, signal_only)
+
+        with self._lock:
+            if self._pid != os.getpid():
+                # Increments pending in the parent process belong to the parent.
+                self._pending = {}
+                self._timer = None
+                self._pid = os.getpid()
+
+            pending = self._pending.get(key)
+            if pending is None:
+                pending = self._pending[key] = PendingIncr(model, filters, signal_only)
+            for column, amount in columns.items():
+                pending.columns[column] = pending.columns.get(column, 0) + amount
+            if extra:
+                pending.extra.update(extra)
+
+            full = len(self._pending) >= self.max_keys
+            if not full and self._timer is None:
+                self._timer = threading.Timer(self.max_delay, self._flush_from_timer)
+                self._timer.daemon = True
+                self._timer.start()
+
+        metrics.incr("buffer.accumulator.incr", skip_internal=True)
+        if full:
+            self.flush()
+
+    def _flush_from_timer(self) -> None:
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("buffer.accumulator.flush-failed")
+
+    def flush(self) -> None:
+        """
+        Forward all pending increments to the buffer backend.
+        """
+        from sentry import buffer
+
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+        if not pending:
+            return
+
+        metrics.distribution("buffer.accumulator.flush-size", len(pending))
+        for incr in pending.values():
+            buffer.backend.incr(
+                incr.model,
+                incr.columns,
+                incr.filters,
+                extra=incr.extra or None,
+                signal_only=incr.signal_only,
+            )
+
+
+_accumulator: IncrAccumulator | None = None
+_accumulator_lock = threading.Lock()
+_disabled = False
+
+
+def disable() -> None:
+    """
+    Send the increments of this process to the buffer backend directly, even
+    if the `buffer.accumulate-incr` option is enabled.
+
+    For processes that can not flush before the offsets of the messages they
+    process are committed, like the multiprocessing workers of consumers.
+    Those are also not guaranteed to run `atexit` handlers.
+    """
+    global _disabled
+    _disabled = True
+
+
+def get_accumulator() -> IncrAccumulator | None:
+    """
+    Returns the accumulator for this process, or `None` if increments should
+    go to the buffer backend directly.
+    """
+    global _accumulator
+
+    if _disabled or not options.get("buffer.accumulate-incr"):
+        return None
+
+    if _accumulator is None:
+        with _accumulator_lock:
+            if _accumulator is None:
+                _accumulator = IncrAccumulator(
+                    max_delay=options.get("buffer.accumulate-incr.max-delay"),
+                    max_keys=options.get("buffer.accumulate-incr.max-keys"),
+                )
+                atexit.register(flush)
+    return _accumulator
+
+
+def flush(**kwargs: Any) -> None:
+    """
+    Flush the accumulator of this process, if there is one.
+    """
+    if _accumulator is not None:
+        _accumulator.flush()
+
+
+# Celery worker processes do not run `atexit` handlers.
+worker_process_shutdown.connect(flush, weak=False, dispatch_uid="sentry.buffer.accumulator.flush")
@@ -1,13 +1,35 @@
+import logging
+from collections import defaultdict
+from collections.abc import Sequence
 from datetime import date, datetime
-from typing import Any
+from typing import Any, NamedTuple
 
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connections, router
 from django.db.models import F
+from django.db.models.signals import post_save
+from psycopg2.extras import execute_values
 
 from sentry.db import models
 from sentry.signals import buffer_incr_complete
 from sentry.tasks.process_buffer import process_incr
 from sentry.utils.services import Service
 
+logger = logging.getLogger(__name__)
+
+
+class BufferedIncr(NamedTuple):
+    """
+    The accumulated `incr` calls for a single (model, filters) pair, as read
+    back from a buffer.
+    """
+
+    model: type[models.Model]
+    columns: dict[str, int]
+    filters: dict[str, Any]
+    extra: dict[str, Any] | None = None
+    signal_only: bool | None = None
+
 
 class Buffer(Service):
     """
@@ -116,3 +138,155 @@ class Buffer(Service):
             created=created,
             sender=model,
         )
+
+    def process_batch(self, incrs: Sequence[BufferedIncr]) -> list[BufferedIncr]:
+        """
+        Process many buffered increments at once. Increments for rows
+        identified by their primary key are grouped by model and the set of
+        updated columns, and every group is applied with a single bulk
+        `UPDATE`. Everything else is processed one by one like `process`.
+
+        Returns the increments that could not be applied, so the caller can
+        buffer them again.
+        """
+        failed: list[BufferedIncr] = []
+        batches: dict[tuple[Any, ...], list[BufferedIncr]] = defaultdict(list)
+        for incr in incrs:
+            if self._can_bulk_update(incr):
+                batches[
+                    (incr.model, tuple(sorted(incr.columns)), tuple(sorted(incr.extra or ())))
+                ].append(incr)
+            elif not self._process_incr(incr):
+                failed.append(incr)
+
+        for (model, columns, extra_columns), batch in batches.items():
+            try:
+                failed.extend(self._bulk_update(model, list(columns), list(extra_columns), batch))
+            except Exception:
+                logger.exception("buffer.bulk_update.failed", extra={"model": model.__name__})
+                failed.extend(batch)
+
+        return failed
+
+    def _process_incr(self, incr: BufferedIncr) -> bool:
+        try:
+            Buffer.process(self, *incr)
+        except Exception:
+            logger.exception("buffer.process.failed", extra={"model": incr.model.__name__})
+            return False
+        return True
+
+    def _can_bulk_update(self, incr: BufferedIncr) -> bool:
+        if incr.signal_only or len(incr.filters) != 1 or not incr.columns:
+            return False
+        if next(iter(incr.filters)) not in ("id", "pk"):
+            return False
+
+        opts = incr.model._meta
+        for name in [*incr.columns, *(incr.extra or ())]:
+            try:
+                field = opts.get_field(name)
+            except FieldDoesNotExist:
+                return False
+            if not field.concrete or field.is_relation or field.primary_key:
+                return False
+        return True
+
+    def _bulk_update(
+        self,
+        model: type[models.Model],
+        columns: list[str],
+        extra_columns: list[str],
+        batch: list[BufferedIncr],
+    ) -> list[BufferedIncr]:
+        """
+        Apply a group of increments with a single `UPDATE`. Raises if nothing
+        was applied, and returns the increments that failed otherwise.
+        """
+        from sentry.models.group import Group
+
+        using = router.db_for_write(model)
+        connection = connections[using]
+        qn = connection.ops.quote_name
+
+        opts = model._meta
+        pk = opts.pk
+        incr_fields = [opts.get_field(c) for c in columns]
+        extra_fields = [opts.get_field(c) for c in extra_columns]
+        fields = [pk, *incr_fields, *extra_fields]
+
+        assignments = [f"{qn(f.column)} = t.{qn(f.column)} + v.{qn(f.column)}" for f in incr_fields]
+        assignments += [f"{qn(f.column)} = v.{qn(f.column)}" for f in extra_fields]
+        # HACK: mirrors the `ScoreClause` that `process` applies to groups
+        if model is Group and "last_seen" in extra_columns and "times_seen" in columns:
+            assignments.append(
+                '"score" = log(t."times_seen" + v."times_seen") * 600'
+                ' + extract(epoch from v."last_seen")::int'
+            )
+
+        query = (
+            f"UPDATE {qn(opts.db_table)} AS t SET {', '.join(assignments)} "
+            f"FROM (VALUES %s) AS v ({', '.join(qn(f.column) for f in fields)}) "
+            f"WHERE t.{qn(pk.column)} = v.{qn(pk.column)} "
+            f"RETURNING t.{qn(pk.column)}"
+        )
+        template = "(" + ", ".join(f"%s::{f.cast_db_type(connection)}" for f in fields) + ")"
+
+        # `{"id": 1}` and `{"pk": 1}` are buffered under different keys, so a
+        # row can show up more than once. Its increments are summed, and the
+        # extra values of the last increment win like they do in `process`.
+        by_pk: dict[Any, list[BufferedIncr]] = defaultdict(list)
+        for incr in batch:
+            by_pk[pk.get_prep_value(next(iter(incr.filters.values())))].append(incr)
+        rows = [
+            [
+                pk_value,
+                *(sum(incr.columns[c] for incr in incrs) for c in columns),
+                *(
+                    f.get_db_prep_save((incrs[-1].extra or {})[f.name], connection)
+                    for f in extra_fields
+                ),
+            ]
+            for pk_value, incrs in by_pk.items()
+        ]
+
+        with connection.cursor() as cursor:
+            updated = {
+                row[0]
+                for row in execute_values(
+                    cursor, query, rows, template=template, page_size=len(rows), fetch=True
+                )
+            }
+
+        if model is Group:
+            # `process` updates groups through `Group.update`, which sends
+            # `post_save` to keep the group cache up to date.
+            update_fields = [*columns, *extra_columns]
+            try:
+                for group in Group.objects.filter(id__in=updated):
+                    post_save.send(
+                        sender=Group, instance=group, created=False, update_fields=update_fields
+                    )
+            except Exception:
+                # The increments are applied already, they must not be
+                # buffered again.
+                logger.exception("buffer.bulk_update.post_save_failed")
+
+        failed = []
+        for pk_value, incrs in by_pk.items():
+            for incr in incrs:
+                if pk_value not in updated:
+                    # The row does not exist yet, let `process` create it.
+                    if model is not Group and not self._process_incr(incr):
+                        failed.append(incr)
+                    continue
+
+                buffer_incr_complete.send_robust(
+                    model=model,
+                    columns=incr.columns,
+                    filters=incr.filters,
+                    extra=incr.extra,
+                    created=False,
+                    sender=model,
+                )
+        return failed
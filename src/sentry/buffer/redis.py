@@ -9,7 +9,8 @@ from typing import Any
 
 from django.utils.encoding import force_bytes, force_str
 
-from sentry.buffer.base import Buffer
+from sentry import options
+from sentry.buffer.base import Buffer, BufferedIncr
 from sentry.db import models
 from sentry.tasks.process_buffer import process_incr, process_pending
 from sentry.utils import json, metrics
@@ -21,6 +22,7 @@ from sentry.utils.redis import (
     get_dynamic_cluster_from_options,
     is_instance_rb_cluster,
     is_instance_redis_cluster,
+    load_script,
     validate_dynamic_cluster,
 )
 
@@ -29,6 +31,12 @@ _local_buffers_lock = threading.Lock()
 
 logger = logging.getLogger(__name__)
 
+pop_pending = load_script("buffer/pop_pending.lua")
+
+# Maximum time in seconds a single `process_pending` run spends draining a
+# pending set in bulk flush mode. Must stay below the lock timeout of 60s.
+BULK_FLUSH_MAX_SECONDS = 30
+
 # Debounce our JSON validation a bit in order to not cause too much additional
 # load everywhere
 _last_validation_log: float | None = None
@@ -80,14 +88,22 @@ class RedisBuffer(Buffer):
     key_expire = 60 * 60  # 1 hour
     pending_key = "b:p"
 
-    def __init__(self, pending_partitions: int = 1, incr_batch_size: int = 2, **options: object):
+    def __init__(
+        self,
+        pending_partitions: int = 1,
+        incr_batch_size: int = 2,
+        bulk_flush_batch_size: int = 1000,
+        **options: object,
+    ):
         self.is_redis_cluster, self.cluster, options = get_dynamic_cluster_from_options(
             "SENTRY_BUFFER_OPTIONS", options
         )
         self.pending_partitions = pending_partitions
         self.incr_batch_size = incr_batch_size
+        self.bulk_flush_batch_size = bulk_flush_batch_size
         assert self.pending_partitions > 0
         assert self.incr_batch_size > 0
+        assert self.bulk_flush_batch_size > 0
 
     def validate(self) -> None:
         validate_dynamic_cluster(self.is_redis_cluster, self.cluster)
@@ -291,6 +307,13 @@ class RedisBuffer(Buffer):
         if not client.set(lock_key, "1", nx=True, ex=60):
             return
 
+        if options.get("buffer.bulk-flush"):
+            try:
+                self._process_pending_bulk(pending_key)
+            finally:
+                client.delete(lock_key)
+            return
+
         pending_buffer = PendingBuffer(self.incr_batch_size)
 
         try:
@@ -388,29 +411,97 @@ class RedisBuffer(Buffer):
                 logger.debug("buffer.revoked.empty", extra={"redis_key": key})
                 return
 
-            model = import_string(force_str(values.pop("m")))
-
-            if values["f"].startswith(b"{" if not self.is_redis_cluster else "{"):
-                filters = self._load_values(json.loads(force_str(values.pop("f"))))
-            else:
-                # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
-                filters = pickle.loads(force_bytes(values.pop("f")))
-
-            incr_values = {}
-            extra_values = {}
-            signal_only = None
-            for k, v in values.items():
-                if k.startswith("i+"):
-                    incr_values[k[2:]] = int(v)
-                elif k.startswith("e+"):
-                    if v.startswith(b"[" if not self.is_redis_cluster else "["):
-                        extra_values[k[2:]] = self._load_value(json.loads(force_str(v)))
-                    else:
-                        # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
-                        extra_values[k[2:]] = pickle.loads(force_bytes(v))
-                elif k == "s":
-                    signal_only = bool(int(v))  # Should be 1 if set
-
-            self._process(model, incr_values, filters, extra_values, signal_only)
+            self._process(*self._load_incr(values))
         finally:
             client.delete(lock_key)
+
+    def _load_incr(self, values: dict[str, Any]) -> BufferedIncr:
+        """
+        Load the contents of a buffered hash, with keys already decoded.
+        """
+        model = import_string(force_str(values.pop("m")))
+
+        if values["f"].startswith(b"{" if not self.is_redis_cluster else "{"):
+            filters = self._load_values(json.loads(force_str(values.pop("f"))))
+        else:
+            # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
+            filters = pickle.loads(force_bytes(values.pop("f")))
+
+        incr_values = {}
+        extra_values = {}
+        signal_only = None
+        for k, v in values.items():
+            if k.startswith("i+"):
+                incr_values[k[2:]] = int(v)
+            elif k.startswith("e+"):
+                if v.startswith(b"[" if not self.is_redis_cluster else "["):
+                    extra_values[k[2:]] = self._load_value(json.loads(force_str(v)))
+                else:
+                    # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
+                    extra_values[k[2:]] = pickle.loads(force_bytes(v))
+            elif k == "s":
+                signal_only = bool(int(v))  # Should be 1 if set
+
+        return BufferedIncr(model, incr_values, filters, extra_values, signal_only)
+
+    def _pop_pending(self, pending_key: str) -> list[dict[str, Any]]:
+        """
+        Pop up to `bulk_flush_batch_size` keys from the pending set and return
+        the contents of their hashes, deleting them in the process.
+        """
+        if is_instance_redis_cluster(self.cluster, self.is_redis_cluster):
+            # Buffered hashes are spread across slots, so Redis Cluster cannot
+            # pop them in a single script.
+            keys = self.cluster.zrange(pending_key, 0, self.bulk_flush_batch_size - 1)
+            if not keys:
+                return []
+            pipe = self.cluster.pipeline(transaction=False)
+            for key in keys:
+                pipe.hgetall(key)
+                pipe.delete(key)
+            pipe.zrem(pending_key, *keys)
+            hashes = pipe.execute()[:-1:2]
+        elif is_instance_rb_cluster(self.cluster, self.is_redis_cluster):
+            # Every host holds its own pending set, next to the hashes of
+            # the keys that are pending there.
+            hashes = []
+            for host_id in self.cluster.hosts:
+                client = self.cluster.get_local_client(host_id)
+                result = pop_pending(client, [pending_key], [self.bulk_flush_batch_size])
+                for flat in result[1::2]:
+                    hashes.append(dict(zip(flat[::2], flat[1::2])))
+        else:
+            raise AssertionError("unreachable")
+
+        return [{force_str(k): v for k, v in values.items()} for values in hashes if values]
+
+    def _process_pending_bulk(self, pending_key: str) -> None:
+        """
+        Drain a pending set in batches of `bulk_flush_batch_size`, applying
+        every batch with `process_batch` rather than scheduling a
+        `process_incr` task per key.
+
+        Draining stops after `BULK_FLUSH_MAX_SECONDS`, well within the lock
+        held by `process_pending`; the remaining keys are left for the next
+        run. Increments that could not be applied are buffered again.
+        """
+        deadline = time() + BULK_FLUSH_MAX_SECONDS
+        keycount = 0
+        while time() < deadline:
+            hashes = self._pop_pending(pending_key)
+            if not hashes:
+                break
+            keycount += len(hashes)
+            failed = self.process_batch([self._load_incr(values) for values in hashes])
+            for incr in failed:
+                self.incr(
+                    incr.model,
+                    incr.columns,
+                    incr.filters,
+                    extra=incr.extra,
+                    signal_only=incr.signal_only,
+                )
+            if failed:
+                metrics.incr("buffer.bulk-flush.requeued", amount=len(failed))
+
+        metrics.distribution("buffer.pending-size", keycount, tags={"mode": "bulk"})
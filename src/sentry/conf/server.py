@@ -1221,6 +1221,12 @@ CELERYBEAT_SCHEDULE_REGION = {
         "task": "sentry.tasks.statistical_detectors.run_detection",
         "schedule": crontab(minute="0", hour="*/1"),
     },
+    "relay-rotate-projectconfig-compression-dictionary": {
+        "task": "sentry.tasks.relay.rotate_projectconfig_compression_dictionary",
+        # Run once a day
+        "schedule": crontab(minute="0", hour="3"),
+        "options": {"expires": 60 * 60},
+    },
     "refresh-artifact-bundles-in-use": {
         "task": "sentry.debug_files.tasks.refresh_artifact_bundles_in_use",
         "schedule": crontab(minute="*/1"),
@@ -2260,6 +2266,10 @@ SENTRY_SNUBA_CACHE_TTL_SECONDS = 60
 # Node storage backend
 SENTRY_NODESTORE = "sentry.nodestore.django.DjangoNodeStorage"
 SENTRY_NODESTORE_OPTIONS: dict[str, Any] = {}
+# Paths to trained zstd dictionaries for the binary nodestore encoding. The
+# first dictionary is used to compress new nodes, the remaining ones are only
+# used to read nodes written before the dictionary was rotated.
+SENTRY_NODESTORE_ZSTD_DICTIONARIES: list[str] = []
 
 # Node storage backend used for ArtifactBundle indexing (aka FlatFileIndex aka BundleIndex)
 SENTRY_INDEXSTORE = "sentry.nodestore.django.DjangoNodeStorage"
@@ -37,8 +37,21 @@ def convert_max_batch_time(ctx, param, value):
     return int(value / 1000.0)
 
 
+def convert_max_batch_time_float(ctx, param, value):
+    """
+    Same as `convert_max_batch_time`, but keeps fractions of a second for
+    strategies that flush batches more than once per second.
+    """
+    if value <= 0:
+        raise click.BadParameter("--max-batch-time must be greater than 0")
+
+    return value / 1000.0
+
+
 def multiprocessing_options(
-    default_max_batch_size: int | None = None, default_max_batch_time_ms: int | None = 1000
+    default_max_batch_size: int | None = None,
+    default_max_batch_time_ms: int | None = 1000,
+    max_batch_time_callback=convert_max_batch_time,
 ):
     return [
         click.Option(["--processes", "num_processes"], default=1, type=int),
@@ -53,7 +66,7 @@ def multiprocessing_options(
         click.Option(
             ["--max-batch-time-ms", "max_batch_time"],
             default=default_max_batch_time_ms,
-            callback=convert_max_batch_time,
+            callback=max_batch_time_callback,
             type=int,
             help="Maximum time (in milliseconds) to wait before flushing a batch.",
         ),
@@ -114,6 +127,24 @@ def ingest_monitors_options() -> list[click.Option]:
     return options
 
 
+def process_spans_options() -> list[click.Option]:
+    """Return a list of process-spans options."""
+    return [
+        click.Option(
+            ["--max-batch-size", "max_batch_size"],
+            type=int,
+            default=100,
+            help="Maximum number of spans to write to the buffer in one batch.",
+        ),
+        click.Option(
+            ["--max-batch-time", "max_batch_time"],
+            type=int,
+            default=1,
+            help="Maximum time in seconds spent batching spans.",
+        ),
+    ]
+
+
 def ingest_events_options() -> list[click.Option]:
     """
     Options for the "events"-like consumers: `events`, `attachments`, `transactions`.
@@ -170,7 +201,9 @@ _METRICS_LAST_SEEN_UPDATER_OPTIONS = [
 ]
 
 _POST_PROCESS_FORWARDER_OPTIONS = multiprocessing_options(
-    default_max_batch_size=1000, default_max_batch_time_ms=1000
+    default_max_batch_size=1000,
+    default_max_batch_time_ms=1000,
+    max_batch_time_callback=convert_max_batch_time_float,
 ) + [
     click.Option(
         ["--concurrency"],
@@ -181,7 +214,7 @@ _POST_PROCESS_FORWARDER_OPTIONS = multiprocessing_options(
     click.Option(
         ["--mode"],
         default="multithreaded",
-        type=click.Choice(["multithreaded", "multiprocess"]),
+        type=click.Choice(["multithreaded", "multiprocess", "batched"]),
         help="Mode to run post process forwarder in.",
     ),
 ]
@@ -338,6 +371,7 @@ KAFKA_CONSUMERS: Mapping[str, ConsumerDefinition] = {
     "process-spans": {
         "topic": Topic.SNUBA_SPANS,
         "strategy_factory": "sentry.spans.consumers.process.factory.ProcessSpansStrategyFactory",
+        "click_options": process_spans_options(),
     },
     **settings.SENTRY_KAFKA_CONSUMERS,
 }
@@ -472,6 +506,8 @@ def get_stream_processor(
             consumer_topic.value, validate_schema, strategy_factory
         )
 
+    strategy_factory = FlushBufferStrategyFactoryWrapper(strategy_factory)
+
     if healthcheck_file_path is not None:
         strategy_factory = HealthcheckStrategyFactoryWrapper(
             healthcheck_file_path, strategy_factory
@@ -534,6 +570,27 @@ class ValidateSchemaStrategyFactoryWrapper(ProcessingStrategyFactory):
         return ValidateSchema(self.topic, self.enforce_schema, rv)
 
 
+class FlushBufferStrategyFactoryWrapper(ProcessingStrategyFactory):
+    """
+    Flushes increments coalesced by the buffer accumulator of the consumer
+    process before offsets are committed. Multiprocessing workers do not
+    accumulate increments, so together no increment of a committed message
+    can be lost.
+    """
+
+    def __init__(self, inner: ProcessingStrategyFactory):
+        self.inner = inner
+
+    def create_with_partitions(self, commit, partitions):
+        from sentry.buffer.accumulator import flush
+
+        def flush_and_commit(offsets, force=False):
+            flush()
+            commit(offsets, force)
+
+        return self.inner.create_with_partitions(flush_and_commit, partitions)
+
+
 class HealthcheckStrategyFactoryWrapper(ProcessingStrategyFactory):
     def __init__(self, healthcheck_file_path: str, inner: ProcessingStrategyFactory):
         self.healthcheck_file_path = healthcheck_file_path
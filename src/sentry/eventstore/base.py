@@ -1,6 +1,8 @@
+from collections import defaultdict
 from collections.abc import Sequence
 from copy import deepcopy
 from datetime import datetime
+from itertools import chain
 
 import sentry_sdk
 from snuba_sdk import Condition
@@ -261,8 +263,8 @@ class EventStorage(Service):
         """
         For a list of Event objects, and a property name where we might find an
         (unfetched) NodeData on those objects, fetch all the data blobs for
-        those NodeDatas with a single multi-get command to nodestore, and bind
-        the returned blobs to the NodeDatas.
+        those NodeDatas with batched multi-get commands to nodestore, and bind
+        the returned blobs to the NodeDatas as they are decoded.
 
         It's not necessary to bind a single Event object since data will be lazily
         fetched on any attempt to access a property.
@@ -275,15 +277,19 @@ class EventStorage(Service):
             ]
 
             # Remove duplicates from the list of nodes to be fetched
-            node_ids = list({n.id for _, n in object_node_list})
-            if not node_ids:
+            nodes_by_id = defaultdict(list)
+            for item, node in object_node_list:
+                nodes_by_id[node.id].append((item, node))
+            if not nodes_by_id:
                 return
 
-            node_results = nodestore.backend.get_multi(node_ids)
+            for node_id, data in nodestore.backend.get_multi_iter(list(nodes_by_id)):
+                for item, node in nodes_by_id.pop(node_id, ()):
+                    node.bind_data(data or {}, ref=node.get_ref(item))
 
-            for item, node in object_node_list:
-                data = node_results.get(node.id) or {}
-                node.bind_data(data, ref=node.get_ref(item))
+            # Nodes that were not found are bound to empty data
+            for item, node in chain.from_iterable(nodes_by_id.values()):
+                node.bind_data({}, ref=node.get_ref(item))
 
     def get_unfetched_transactions(
         self,
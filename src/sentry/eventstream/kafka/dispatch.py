@@ -1,10 +1,11 @@
 import logging
 import random
-from collections.abc import Generator, Mapping
+from collections.abc import Generator, Mapping, Sequence
 from contextlib import contextmanager
 from typing import Any
 
 from arroyo.backends.kafka.consumer import KafkaPayload
+from arroyo.processing.strategies.batching import ValuesBatch
 from arroyo.types import Message
 
 from sentry import options
@@ -45,12 +46,14 @@ def dispatch_post_process_group_task(
     skip_consume: bool = False,
     group_states: GroupStates | None = None,
     occurrence_id: str | None = None,
+    producer: Any | None = None,
 ) -> None:
     if skip_consume:
         logger.info("post_process.skip.raw_event", extra={"event_id": event_id})
     else:
         cache_key = cache_key_for_event({"project": project_id, "event_id": event_id})
 
+        extra_options = {"producer": producer} if producer is not None else {}
         post_process_group.apply_async(
             kwargs={
                 "is_new": is_new,
@@ -64,9 +67,20 @@ def dispatch_post_process_group_task(
                 "project_id": project_id,
             },
             queue=queue,
+            **extra_options,
         )
 
 
+def dispatch_post_process_group_tasks(tasks: Sequence[Mapping[str, Any]]) -> None:
+    """
+    Dispatch the post process tasks of a batch of messages, publishing all of
+    them with a single producer instead of acquiring one per task.
+    """
+    with post_process_group.app.producer_or_acquire() as producer:
+        for task_kwargs in tasks:
+            dispatch_post_process_group_task(**task_kwargs, producer=producer)
+
+
 def _get_task_kwargs(message: Message[KafkaPayload]) -> Mapping[str, Any] | None:
     use_kafka_headers = options.get("post-process-forwarder:kafka-headers")
 
@@ -91,7 +105,24 @@ def _get_task_kwargs_and_dispatch(message: Message[KafkaPayload]) -> None:
     dispatch_post_process_group_task(**task_kwargs)
 
 
+def _get_task_kwargs_and_dispatch_batch(message: Message[ValuesBatch[KafkaPayload]]) -> None:
+    tasks = []
+    for value in message.payload:
+        task_kwargs = _get_task_kwargs(Message(value))
+        if task_kwargs:
+            tasks.append(task_kwargs)
+
+    if tasks:
+        with metrics.timer(_DURATION_METRIC, instance="dispatch_post_process_group_tasks"):
+            dispatch_post_process_group_tasks(tasks)
+        metrics.distribution("eventstream.dispatch.batch_size", len(tasks))
+
+
 class EventPostProcessForwarderStrategyFactory(PostProcessForwarderStrategyFactory):
     @staticmethod
     def _dispatch_function(message: Message[KafkaPayload]) -> None:
         return _get_task_kwargs_and_dispatch(message)
+
+    @staticmethod
+    def _dispatch_batch_function(message: Message[ValuesBatch[KafkaPayload]]) -> None:
+        return _get_task_kwargs_and_dispatch_batch(message)
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import functools
 import re
 from collections.abc import Sequence
 from dataclasses import dataclass
@@ -40,6 +41,11 @@ if TYPE_CHECKING:
 
 HASH_RE = re.compile(r"^[0-9a-f]{32}$")
 
+# Maximum number of fully built grouping and fingerprinting configs kept per
+# process. Entries are keyed by the contents of the config, so a change to
+# the project options of a project never returns a stale entry.
+CONFIG_CACHE_SIZE = 1000
+
 # Synthetic exceptions should be marked by the SDK, but
 # are also detected here as a fallback
 _synthetic_exception_type_re = re.compile(
@@ -99,24 +105,7 @@ class GroupingConfigLoader:
         config_id = self._get_config_id(project)
         enhancements_base = CONFIGURATIONS[config_id].enhancements_base
 
-        # Instead of parsing and dumping out config here, we can make a
-        # shortcut
-        from sentry.utils.cache import cache
-        from sentry.utils.hashlib import md5_text
-
-        cache_prefix = self.cache_prefix
-        cache_prefix += f"{LATEST_VERSION}:"
-        cache_key = cache_prefix + md5_text(f"{enhancements_base}|{enhancements}").hexdigest()
-        rv = cache.get(cache_key)
-        if rv is not None:
-            return rv
-
-        try:
-            rv = Enhancements.from_config_string(enhancements, bases=[enhancements_base]).dumps()
-        except InvalidEnhancerConfig:
-            rv = get_default_enhancements()
-        cache.set(cache_key, rv)
-        return rv
+        return _get_enhancements_dump(self.cache_prefix, enhancements_base, enhancements)
 
     def _get_config_id(self, project):
         raise NotImplementedError
@@ -155,6 +144,27 @@ class BackgroundGroupingConfigLoader(GroupingConfigLoader):
         return options.get("store.background-grouping-config-id")
 
 
+@functools.lru_cache(maxsize=CONFIG_CACHE_SIZE)
+def _get_enhancements_dump(cache_prefix: str, enhancements_base: str | None, enhancements) -> str:
+    # Instead of parsing and dumping out config here, we can make a
+    # shortcut
+    from sentry.utils.cache import cache
+    from sentry.utils.hashlib import md5_text
+
+    cache_prefix += f"{LATEST_VERSION}:"
+    cache_key = cache_prefix + md5_text(f"{enhancements_base}|{enhancements}").hexdigest()
+    rv = cache.get(cache_key)
+    if rv is not None:
+        return rv
+
+    try:
+        rv = Enhancements.from_config_string(enhancements, bases=[enhancements_base]).dumps()
+    except InvalidEnhancerConfig:
+        rv = get_default_enhancements()
+    cache.set(cache_key, rv)
+    return rv
+
+
 def get_grouping_config_dict_for_project(project, silent=True) -> GroupingConfig:
     """Fetches all the information necessary for grouping from the project
     settings.  The return value of this is persisted with the event on
@@ -215,9 +225,18 @@ def load_grouping_config(config_dict=None) -> StrategyConfiguration:
     config_id = config_dict.pop("id")
     if config_id not in CONFIGURATIONS:
         raise GroupingConfigNotFound(config_id)
+    if config_dict.keys() == {"enhancements"}:
+        return _load_grouping_config(config_id, config_dict["enhancements"])
     return CONFIGURATIONS[config_id](**config_dict)
 
 
+@functools.lru_cache(maxsize=CONFIG_CACHE_SIZE)
+def _load_grouping_config(config_id: str, enhancements: str) -> StrategyConfiguration:
+    # Parsing enhancements is expensive, configs are shared by all events
+    # using the same one.
+    return CONFIGURATIONS[config_id](enhancements=enhancements)
+
+
 def load_default_grouping_config() -> StrategyConfiguration:
     return load_grouping_config(config_dict=None)
 
@@ -230,12 +249,20 @@ def get_fingerprinting_config_for_project(
     Merges the project's custom fingerprinting rules (if any) with the default built-in rules.
     """
 
-    from sentry.grouping.fingerprinting import FingerprintingRules, InvalidFingerprintingConfig
-
     bases = get_projects_default_fingerprinting_bases(project, config_id=config_id)
     rules = project.get_option("sentry:fingerprinting_rules")
+    return _get_fingerprinting_config(rules or None, tuple(bases) if bases is not None else None)
+
+
+@functools.lru_cache(maxsize=CONFIG_CACHE_SIZE)
+def _get_fingerprinting_config(
+    rules: str | None, bases: tuple[str, ...] | None
+) -> FingerprintingRules:
+    from sentry.grouping.fingerprinting import FingerprintingRules, InvalidFingerprintingConfig
+
+    base_list = list(bases) if bases is not None else None
     if not rules:
-        return FingerprintingRules([], bases=bases)
+        return FingerprintingRules([], bases=base_list)
 
     from sentry.utils.cache import cache
     from sentry.utils.hashlib import md5_text
@@ -243,12 +270,12 @@ def get_fingerprinting_config_for_project(
     cache_key = "fingerprinting-rules:" + md5_text(rules).hexdigest()
     rv = cache.get(cache_key)
     if rv is not None:
-        return FingerprintingRules.from_json(rv, bases=bases)
+        return FingerprintingRules.from_json(rv, bases=base_list)
 
     try:
-        rv = FingerprintingRules.from_config_string(rules, bases=bases)
+        rv = FingerprintingRules.from_config_string(rules, bases=base_list)
     except InvalidFingerprintingConfig:
-        rv = FingerprintingRules([], bases=bases)
+        rv = FingerprintingRules([], bases=base_list)
     cache.set(cache_key, rv.to_json())
     return rv
 
@@ -27,6 +27,7 @@ from sentry.utils.safe import get_path, set_path
 from sentry.utils.strings import unescape_string
 
 from .actions import Action, FlagAction, VarAction
+from .compiled import CompiledRules, get_compiled_rules
 from .exceptions import InvalidEnhancerConfig
 from .matchers import (
     CalleeMatch,
@@ -247,6 +248,10 @@ class Enhancements:
 
         self.rust_enhancements = merge_rust_enhancements(bases, rust_enhancements)
 
+        # Identifies the rule set when sharing compiled rules between
+        # instances, see `_get_compiled_rules`.
+        self._config_key: bytes | None = None
+
         self._modifier_rules: list[Rule] = []
         self._updater_rules: list[Rule] = []
         for rule in self.iter_rules():
@@ -255,6 +260,12 @@ class Enhancements:
             if updater_rule := rule._as_updater_rule():
                 self._updater_rules.append(updater_rule)
 
+    def _get_compiled_rules(self, kind: Literal["modifier", "updater"]) -> CompiledRules:
+        if self._config_key is None:
+            self._config_key = msgpack.dumps(self._to_config_structure())
+        rules = self._modifier_rules if kind == "modifier" else self._updater_rules
+        return get_compiled_rules((self._config_key, kind), rules)
+
     def apply_modifications_to_frame(
         self,
         frames: Sequence[dict[str, Any]],
@@ -299,12 +310,14 @@ class Enhancements:
                 return
 
         with sentry_sdk.start_span(op="stacktrace_processing", description="apply_rules_to_frames"):
-            for rule in self._modifier_rules:
-                for idx, action in rule.get_matching_frame_actions(
-                    match_frames, exception_data, in_memory_cache
-                ):
-                    # Both frames and match_frames are updated
-                    action.apply_modifications_to_frame(frames, match_frames, idx, rule=rule)
+            compiled_rules = self._get_compiled_rules("modifier")
+            for rule, positions in compiled_rules.iter_matches(
+                match_frames, exception_data, in_memory_cache
+            ):
+                for idx in positions:
+                    for action in rule.actions:
+                        # Both frames and match_frames are updated
+                        action.apply_modifications_to_frame(frames, match_frames, idx, rule=rule)
             for frame, match_frame in zip(frames, match_frames):
                 if (in_app := match_frame["in_app"]) is not None:
                     set_in_app(frame, in_app)
@@ -321,12 +334,14 @@ class Enhancements:
 
         stacktrace_state = StacktraceState()
         # Apply direct frame actions and update the stack state alongside
-        for rule in self._updater_rules:
-            for idx, action in rule.get_matching_frame_actions(
-                match_frames, exception_data, in_memory_cache
-            ):
-                action.update_frame_components_contributions(components, frames, idx, rule=rule)
-                action.modify_stacktrace_state(stacktrace_state, rule)
+        compiled_rules = self._get_compiled_rules("updater")
+        for rule, positions in compiled_rules.iter_matches(
+            match_frames, exception_data, in_memory_cache
+        ):
+            for idx in positions:
+                for action in rule.actions:
+                    action.update_frame_components_contributions(components, frames, idx, rule=rule)
+                    action.modify_stacktrace_state(stacktrace_state, rule)
 
         # Use the stack state to update frame contributions again to trim
         # down to max-frames.  min-frames is handled on the other hand for
@@ -444,7 +459,11 @@ class Enhancements:
 
             rust_enhancements = parse_rust_enhancements("config_structure", encoded)
 
-            return cls._from_config_structure(msgpack.loads(encoded, raw=False), rust_enhancements)
+            enhancements = cls._from_config_structure(
+                msgpack.loads(encoded, raw=False), rust_enhancements
+            )
+            enhancements._config_key = encoded
+            return enhancements
         except (LookupError, AttributeError, TypeError, ValueError) as e:
             raise ValueError("invalid stack trace rule config: %s" % e)
 
@@ -0,0 +1,226 @@
+"""
+Indexed evaluation of enhancement rules against stacktrace frames.
+
+Matching every rule against every frame is the most expensive part of
+applying enhancements, and most rules only look at a single frame at a time.
+`CompiledRules` splits every rule into conditions: conjunctions of matchers
+that each apply to one frame, relative to the frame a rule is matched at
+(the frame itself, its caller or its callee). All conditions of a rule set
+are evaluated against a frame at once, and the result is memoized in a
+bounded LRU keyed by the frame's matchable values, which is shared across
+events using the same rule set.
+
+Conditions requiring a frame field to equal a literal pattern are indexed
+by that value, so frames only ever get checked against conditions that can
+possibly match them.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import defaultdict
+from collections.abc import Iterator, Sequence
+from typing import Any
+
+from cachetools import LRUCache
+
+from .matchers import CalleeMatch, CallerMatch, ExceptionFieldMatch, FrameFieldMatch, Match
+
+# Maximum number of distinct frames whose matching conditions are remembered
+# per rule set.
+FRAME_CACHE_SIZE = 5_000
+
+# Maximum number of compiled rule sets kept around, see `get_compiled_rules`.
+COMPILED_RULES_CACHE_SIZE = 64
+
+# The values of a match frame that matchers can look at.
+FRAME_KEY_FIELDS = ("category", "family", "function", "in_app", "module", "package", "path")
+
+# Characters that make a pattern behave differently from a plain comparison.
+GLOB_CHARACTERS = frozenset(b"*?[]{}\\!")
+
+FrameKey = tuple[Any, ...]
+Condition = tuple[Match, ...]
+
+
+def get_frame_key(match_frame: dict[str, Any]) -> FrameKey:
+    return tuple(match_frame[field] for field in FRAME_KEY_FIELDS)
+
+
+def _is_literal(pattern: bytes) -> bool:
+    return not GLOB_CHARACTERS.intersection(pattern)
+
+
+class CompiledRule:
+    __slots__ = ("rule", "conditions", "exception_matchers")
+
+    def __init__(self, rule: Any, conditions: list[tuple[int, int]], exception_matchers):
+        self.rule = rule
+        # `(offset, condition id)`, the condition of the frame itself comes first.
+        self.conditions = conditions
+        self.exception_matchers = exception_matchers
+
+
+class CompiledRules:
+    """
+    A sequence of enhancement rules compiled for matching, see the module
+    docstring.
+    """
+
+    def __init__(self, rules: Sequence[Any]) -> None:
+        self._conditions: list[Condition] = []
+        self._condition_ids: dict[Condition, int] = {}
+        self._literal_index: dict[tuple[str, bytes], list[int]] = defaultdict(list)
+        self._scan: list[int] = []
+
+        self._rules = [self._compile_rule(rule) for rule in rules if rule.matchers]
+
+        self._lock = threading.Lock()
+        self._frame_cache: LRUCache[FrameKey, frozenset[int]] = LRUCache(FRAME_CACHE_SIZE)
+
+    def _compile_rule(self, rule: Any) -> CompiledRule:
+        by_offset: dict[int, list[Match]] = {0: []}
+        exception_matchers = []
+        for matcher in rule.matchers:
+            offset = 0
+            if isinstance(matcher, CallerMatch):
+                offset, matcher = -1, matcher.inner
+            elif isinstance(matcher, CalleeMatch):
+                offset, matcher = 1, matcher.inner
+
+            # Exception matchers do not depend on the frame, but a caller or
+            # callee still needs to exist for the rule to match.
+            conjunction = by_offset.setdefault(offset, [])
+            if isinstance(matcher, ExceptionFieldMatch):
+                exception_matchers.append(matcher)
+            else:
+                conjunction.append(matcher)
+
+        conditions = [
+            (offset, self._add_condition(tuple(matchers))) for offset, matchers in by_offset.items()
+        ]
+        return CompiledRule(rule, conditions, exception_matchers)
+
+    def _add_condition(self, condition: Condition) -> int:
+        condition_id = self._condition_ids.get(condition)
+        if condition_id is not None:
+            return condition_id
+
+        condition_id = self._condition_ids[condition] = len(self._conditions)
+        self._conditions.append(condition)
+
+        for matcher in condition:
+            if (
+                isinstance(matcher, FrameFieldMatch)
+                and not matcher.negated
+                and _is_literal(matcher._encoded_pattern)
+            ):
+                self._literal_index[matcher.field, matcher._encoded_pattern].append(condition_id)
+                break
+        else:
+            self._scan.append(condition_id)
+
+        return condition_id
+
+    def _candidates(self, match_frame: dict[str, Any]) -> Iterator[int]:
+        yield from self._scan
+        for field in ("category", "function", "module"):
+            value = match_frame[field]
+            if value is not None:
+                yield from self._literal_index.get((field, value), ())
+
+    def match_frame(self, match_frame: dict[str, Any], cache: dict[Any, Any]) -> frozenset[int]:
+        """
+        Returns the ids of all conditions that match `match_frame`.
+        """
+        key = get_frame_key(match_frame)
+        with self._lock:
+            rv = self._frame_cache.get(key)
+        if rv is not None:
+            return rv
+
+        frames = [match_frame]
+        rv = frozenset(
+            condition_id
+            for condition_id in self._candidates(match_frame)
+            if all(
+                matcher.matches_frame(frames, 0, None, cache)
+                for matcher in self._conditions[condition_id]
+            )
+        )
+        with self._lock:
+            self._frame_cache[key] = rv
+        return rv
+
+    def iter_matches(
+        self,
+        match_frames: Sequence[dict[str, Any]],
+        exception_data: dict[str, Any],
+        cache: dict[Any, Any],
+    ) -> Iterator[tuple[Any, list[int]]]:
+        """
+        Yields every rule that matches any of the frames, in order, together
+        with the indices of the frames it matches.
+
+        The frames are looked at again after every matching rule, so a rule
+        sees the modifications the caller applied for the previous ones.
+        """
+        num_frames = len(match_frames)
+        frame_keys: list[FrameKey] = []
+        frame_matches: list[frozenset[int]] = []
+        by_condition: dict[int, list[int]] = {}
+
+        stale = True
+
+        for compiled in self._rules:
+            if stale:
+                stale = False
+                keys = [get_frame_key(match_frame) for match_frame in match_frames]
+                if keys != frame_keys:
+                    frame_keys = keys
+                    frame_matches = [self.match_frame(f, cache) for f in match_frames]
+                    by_condition = defaultdict(list)
+                    for idx, condition_ids in enumerate(frame_matches):
+                        for condition_id in condition_ids:
+                            by_condition[condition_id].append(idx)
+
+            (_, frame_condition), *neighbor_conditions = compiled.conditions
+            candidates = by_condition.get(frame_condition)
+            if not candidates:
+                continue
+
+            if not all(
+                m.matches_frame(match_frames, None, exception_data, cache)
+                for m in compiled.exception_matchers
+            ):
+                continue
+
+            positions = [
+                idx
+                for idx in candidates
+                if all(
+                    0 <= idx + offset < num_frames and condition_id in frame_matches[idx + offset]
+                    for offset, condition_id in neighbor_conditions
+                )
+            ]
+            if positions:
+                yield compiled.rule, positions
+                stale = True
+
+
+_compiled_rules: LRUCache[Any, CompiledRules] = LRUCache(COMPILED_RULES_CACHE_SIZE)
+_compiled_rules_lock = threading.Lock()
+
+
+def get_compiled_rules(key: Any, rules: Sequence[Any]) -> CompiledRules:
+    """
+    Returns the compiled version of `rules`, shared by all callers passing
+    the same `key`.
+    """
+    with _compiled_rules_lock:
+        compiled = _compiled_rules.get(key)
+    if compiled is None:
+        compiled = CompiledRules(rules)
+        with _compiled_rules_lock:
+            _compiled_rules[key] = compiled
+    return compiled
@@ -3,9 +3,12 @@ from __future__ import annotations
 import logging
 import uuid
 from collections import defaultdict
-from collections.abc import Mapping
+from collections.abc import Mapping, Sequence
 from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+from functools import reduce
+from operator import or_
 from typing import Literal
 
 import msgpack
@@ -17,11 +20,13 @@ from arroyo.processing.strategies.commit import CommitOffsets
 from arroyo.processing.strategies.run_task import RunTask
 from arroyo.types import BrokerValue, Commit, Message, Partition
 from django.db import router, transaction
+from django.db.models import Q
 from sentry_sdk.tracing import Span, Transaction
 
 from sentry import quotas, ratelimits
 from sentry.constants import DataCategory, ObjectStatus
 from sentry.killswitches import killswitch_matches_context
+from sentry.models.environment import Environment
 from sentry.models.project import Project
 from sentry.monitors.constants import PermitCheckInStatus
 from sentry.monitors.logic.mark_failed import mark_failed
@@ -56,20 +61,35 @@ CHECKIN_QUOTA_LIMIT = 6
 CHECKIN_QUOTA_WINDOW = 60
 
 
+@dataclass
+class PrefetchedCheckin:
+    """
+    State of a check-in that was looked up for the whole batch, see
+    `prefetch_checkins`. Anything that is `None` is looked up while the
+    check-in is processed.
+    """
+
+    ratelimited: bool | None = None
+    monitor: Monitor | None = None
+    monitor_environment: MonitorEnvironment | None = None
+
+
 def _ensure_monitor_with_config(
     project: Project,
     monitor_slug: str,
     config: dict | None,
     quotas_outcome: PermitCheckInStatus,
+    monitor: Monitor | None = None,
 ):
-    try:
-        monitor = Monitor.objects.get(
-            slug=monitor_slug,
-            project_id=project.id,
-            organization_id=project.organization_id,
-        )
-    except Monitor.DoesNotExist:
-        monitor = None
+    if monitor is None:
+        try:
+            monitor = Monitor.objects.get(
+                slug=monitor_slug,
+                project_id=project.id,
+                organization_id=project.organization_id,
+            )
+        except Monitor.DoesNotExist:
+            monitor = None
 
     if not config:
         return monitor
@@ -131,6 +151,12 @@ def _ensure_monitor_with_config(
     return monitor
 
 
+def is_killswitched(project: Project) -> bool:
+    return killswitch_matches_context(
+        "crons.organization.disable-check-in", {"organization_id": project.organization_id}
+    )
+
+
 def check_killswitch(
     metric_kwargs: dict,
     project: Project,
@@ -139,9 +165,7 @@ def check_killswitch(
     Enforce organization level monitor kill switch. Returns true if the
     killswitch is enforced.
     """
-    is_blocked = killswitch_matches_context(
-        "crons.organization.disable-check-in", {"organization_id": project.organization_id}
-    )
+    is_blocked = is_killswitched(project)
     if is_blocked:
         metrics.incr(
             "monitors.checkin.dropped.blocked",
@@ -150,21 +174,26 @@ def check_killswitch(
     return is_blocked
 
 
-def check_ratelimit(metric_kwargs: dict, item: CheckinItem):
-    """
-    Enforce check-in rate limits. Returns True if rate limit is enforced.
-    """
+def get_ratelimit_key(item: CheckinItem) -> str:
     # Use the kafka message timestamp as part of the key to ensure we do not
     # rate-limit during backlog processing.
     ts = item.ts.replace(second=0, microsecond=0)
 
-    ratelimit_key = f"{item.processing_key}:{ts}"
+    return f"monitor-checkins:{item.processing_key}:{ts}"
 
-    is_blocked = ratelimits.backend.is_limited(
-        f"monitor-checkins:{ratelimit_key}",
-        limit=CHECKIN_QUOTA_LIMIT,
-        window=CHECKIN_QUOTA_WINDOW,
-    )
+
+def check_ratelimit(metric_kwargs: dict, item: CheckinItem, is_blocked: bool | None = None):
+    """
+    Enforce check-in rate limits. Returns True if rate limit is enforced.
+    `is_blocked` is the result of a rate limit check that already happened
+    for the check-in.
+    """
+    if is_blocked is None:
+        is_blocked = ratelimits.backend.is_limited(
+            get_ratelimit_key(item),
+            limit=CHECKIN_QUOTA_LIMIT,
+            window=CHECKIN_QUOTA_WINDOW,
+        )
 
     if is_blocked:
         metrics.incr(
@@ -310,7 +339,12 @@ def update_existing_check_in(
     return
 
 
-def _process_checkin(item: CheckinItem, txn: Transaction | Span):
+def _process_checkin(
+    item: CheckinItem, txn: Transaction | Span, prefetched: PrefetchedCheckin | None = None
+):
+    if prefetched is None:
+        prefetched = PrefetchedCheckin()
+
     params = item.payload
 
     start_time = to_datetime(float(item.message["start_time"]))
@@ -342,7 +376,7 @@ def _process_checkin(item: CheckinItem, txn: Transaction | Span):
         )
         return
 
-    if check_ratelimit(metric_kwargs, item):
+    if check_ratelimit(metric_kwargs, item, prefetched.ratelimited):
         track_outcome(
             org_id=project.organization_id,
             project_id=project.id,
@@ -439,6 +473,7 @@ def _process_checkin(item: CheckinItem, txn: Transaction | Span):
             monitor_slug,
             monitor_config,
             quotas_outcome,
+            prefetched.monitor,
         )
     except MonitorLimitsExceeded:
         metrics.incr(
@@ -525,9 +560,11 @@ def _process_checkin(item: CheckinItem, txn: Transaction | Span):
     # 02
     # Retrieve or upsert monitor environment for this check-in
     try:
-        monitor_environment = MonitorEnvironment.objects.ensure_environment(
-            project, monitor, environment
-        )
+        monitor_environment = prefetched.monitor_environment
+        if monitor_environment is None or monitor_environment.monitor_id != monitor.id:
+            monitor_environment = MonitorEnvironment.objects.ensure_environment(
+                project, monitor, environment
+            )
     except MonitorEnvironmentLimitsExceeded:
         metrics.incr(
             "monitors.checkin.result",
@@ -755,7 +792,7 @@ def _process_checkin(item: CheckinItem, txn: Transaction | Span):
 _checkin_worker = ThreadPoolExecutor()
 
 
-def process_checkin(item: CheckinItem):
+def process_checkin(item: CheckinItem, prefetched: PrefetchedCheckin | None = None):
     """
     Process an individual check-in
     """
@@ -764,18 +801,137 @@ def process_checkin(item: CheckinItem):
             op="_process_checkin",
             name="monitors.monitor_consumer",
         ) as txn:
-            _process_checkin(item, txn)
+            _process_checkin(item, txn, prefetched)
     except Exception:
         logger.exception("Failed to process check-in")
 
 
-def process_checkin_group(items: list[CheckinItem]):
+def process_checkin_group(
+    items: list[CheckinItem], prefetched: Sequence[PrefetchedCheckin] | None = None
+):
     """
     Process a group of related check-ins (all part of the same monitor)
     completely serially.
     """
+    for i, item in enumerate(items):
+        process_checkin(item, prefetched[i] if prefetched else None)
+
+
+def prefetch_checkins(
+    checkin_mapping: Mapping[str, list[CheckinItem]]
+) -> dict[str, list[PrefetchedCheckin]]:
+    """
+    Looks up what processing needs for the check-ins of a whole batch at once,
+    instead of for every check-in:
+
+    - Rate limits of all check-ins are checked with a single pipeline.
+    - Monitors are fetched with a single query.
+    - Monitor environments are fetched with a single query. They are only
+      handed to the first check-in of each group, as processing a check-in
+      updates its monitor environment.
+
+    Returns the prefetched state of every check-in, in the order of the groups
+    in `checkin_mapping`. Once rate limits were checked, they count against
+    the check-ins. If looking up monitors fails afterwards, the rate limit
+    results are still returned and processing looks up the monitors instead.
+    """
+    items = [item for group in checkin_mapping.values() for item in group]
+    project_ids = {int(item.message["project_id"]) for item in items}
+    projects = {project.id: project for project in Project.objects.get_many_from_cache(project_ids)}
+    prefetched = {id(item): PrefetchedCheckin() for item in items}
+
+    # 01
+    # Check-ins dropped by the killswitch do not count against rate limits
+    killswitched = {project.id for project in projects.values() if is_killswitched(project)}
+    ratelimit_items = [
+        item
+        for item in items
+        if int(item.message["project_id"]) in projects
+        and int(item.message["project_id"]) not in killswitched
+    ]
+    ratelimited = ratelimits.backend.is_limited_many(
+        [(get_ratelimit_key(item), CHECKIN_QUOTA_LIMIT) for item in ratelimit_items],
+        window=CHECKIN_QUOTA_WINDOW,
+    )
+    for item, is_blocked in zip(ratelimit_items, ratelimited):
+        prefetched[id(item)].ratelimited = is_blocked
+
+    # 02
+    # Monitors and their environments
+    try:
+        _prefetch_monitors(checkin_mapping, ratelimit_items, projects, prefetched)
+    except Exception:
+        logger.exception("Failed to prefetch monitors")
+
+    return {key: [prefetched[id(item)] for item in group] for key, group in checkin_mapping.items()}
+
+
+def _prefetch_monitors(
+    checkin_mapping: Mapping[str, list[CheckinItem]],
+    items: list[CheckinItem],
+    projects: Mapping[int, Project],
+    prefetched: Mapping[int, PrefetchedCheckin],
+) -> None:
+    """
+    Fills in the monitors and monitor environments of `prefetched`, see
+    `prefetch_checkins`.
+    """
+    slugs_by_project: dict[int, set[str]] = defaultdict(set)
     for item in items:
-        process_checkin(item)
+        slugs_by_project[int(item.message["project_id"])].add(item.valid_monitor_slug)
+
+    monitors: dict[tuple[int, str], Monitor] = {}
+    if slugs_by_project:
+        monitors = {
+            (monitor.project_id, monitor.slug): monitor
+            for monitor in Monitor.objects.filter(
+                reduce(
+                    or_,
+                    (
+                        Q(
+                            project_id=project_id,
+                            organization_id=projects[project_id].organization_id,
+                            slug__in=slugs,
+                        )
+                        for project_id, slugs in slugs_by_project.items()
+                    ),
+                )
+            )
+        }
+
+    monitor_environments: dict[tuple[int, str], MonitorEnvironment] = {}
+    if monitors:
+        monitor_environment_list = list(
+            MonitorEnvironment.objects.filter(monitor__in=monitors.values())
+        )
+        environment_names = dict(
+            Environment.objects.filter(
+                id__in={
+                    monitor_environment.environment_id
+                    for monitor_environment in monitor_environment_list
+                }
+            ).values_list("id", "name")
+        )
+        for monitor_environment in monitor_environment_list:
+            name = environment_names.get(monitor_environment.environment_id)
+            if name is not None:
+                monitor_environments[(monitor_environment.monitor_id, name)] = monitor_environment
+
+    for group in checkin_mapping.values():
+        item = group[0]
+        monitor = monitors.get((int(item.message["project_id"]), item.valid_monitor_slug))
+        if monitor is None:
+            continue
+
+        for group_item in group:
+            prefetched[id(group_item)].monitor = monitor
+
+        monitor_environment = monitor_environments.get(
+            (monitor.id, item.payload.get("environment") or "production")
+        )
+        if monitor_environment is not None:
+            monitor_environment.monitor = monitor
+            prefetched[id(item)].monitor_environment = monitor_environment
 
 
 def process_batch(message: Message[ValuesBatch[KafkaPayload]]):
@@ -825,9 +981,17 @@ def process_batch(message: Message[ValuesBatch[KafkaPayload]]):
 
     # Submit check-in groups for processing
     with sentry_sdk.start_transaction(op="process_batch", name="monitors.monitor_consumer"):
+        try:
+            prefetched = prefetch_checkins(checkin_mapping)
+        except Exception:
+            # Nothing was counted against rate limits yet. Everything is
+            # looked up while processing the check-ins instead
+            logger.exception("Failed to prefetch check-ins")
+            prefetched = {}
+
         futures = [
-            _checkin_worker.submit(process_checkin_group, group)
-            for group in checkin_mapping.values()
+            _checkin_worker.submit(process_checkin_group, group, prefetched.get(key))
+            for key, group in checkin_mapping.items()
         ]
         wait(futures)
 
@@ -1,12 +1,20 @@
 from __future__ import annotations
 
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from threading import local
+from typing import Any
 
 import sentry_sdk
+from django.conf import settings
 from django.core.cache import InvalidCacheBackendError, caches
 
+from sentry import options
+from sentry.nodestore.encoding import decode_node, encode_node, is_encoded_node, load_dictionaries
 from sentry.utils import json
 from sentry.utils.cache import memoize
+from sentry.utils.iterators import chunked
 from sentry.utils.services import Service
 
 # Cache an instance of the encoder we want to use
@@ -24,6 +32,23 @@ json_dumps = json.JSONEncoder(
 
 json_loads = json.loads
 
+# Number of nodes fetched from the backend per round trip by `get_multi_iter`.
+MULTI_GET_CHUNK_SIZE = 100
+
+# Shared by all backends to decompress and parse nodes of batched reads.
+_decode_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="nodestore-decode")
+
+
+def _load_and_decode(
+    item: tuple[str, Any],
+    load_raw: Callable[[Any], bytes | None],
+    decode_value: Callable[[bytes | None, str | None, Any], Any],
+    subkey: str | None,
+    dictionaries: Any,
+) -> tuple[str, Any]:
+    id, value = item
+    return id, decode_value(load_raw(value), subkey, dictionaries)
+
 
 class NodeStorage(local, Service):
     """
@@ -58,6 +83,13 @@ class NodeStorage(local, Service):
 
     This is used in reprocessing to store a snapshot of the event from multiple
     stages of the pipeline.
+
+    When the `nodestore.use-binary-encoding` option is enabled, nodes are
+    written in the binary format from `sentry.nodestore.encoding` instead. It
+    compresses every subkey as its own zstd section (optionally with one of the
+    dictionaries from `SENTRY_NODESTORE_ZSTD_DICTIONARIES`), so fetching a
+    subkey only decompresses and parses that one section. Nodes in the older
+    formats can always be read.
     """
 
     __all__ = (
@@ -66,6 +98,7 @@ class NodeStorage(local, Service):
         "get",
         "get_bytes",
         "get_multi",
+        "get_multi_iter",
         "set",
         "set_bytes",
         "set_subkeys",
@@ -92,10 +125,18 @@ class NodeStorage(local, Service):
         for id in id_list:
             self.delete(id)
 
-    def _decode(self, value, subkey):
+    @staticmethod
+    def _decode_value(value, subkey, dictionaries):
+        """
+        Decode the bytes of a node. Batched reads call this from worker
+        threads, so it must not depend on the instance, which is thread local.
+        """
         if value is None:
             return None
 
+        if is_encoded_node(value):
+            return decode_node(value, subkey=subkey, loads=json_loads, dictionaries=dictionaries)
+
         lines_iter = iter(value.splitlines())
         try:
             if subkey is not None:
@@ -116,6 +157,9 @@ class NodeStorage(local, Service):
         except StopIteration:
             return None
 
+    def _decode(self, value, subkey):
+        return self._decode_value(value, subkey, self.zstd_dictionaries)
+
     def get_bytes(self, id):
         """
         >>> nodestore._get_bytes('key1')
@@ -164,6 +208,42 @@ class NodeStorage(local, Service):
         """
         return {id: self._get_bytes(id) for id in id_list}
 
+    def _get_raw_multi(self, id_list: list[str]) -> dict[str, Any]:
+        """
+        Fetch multiple nodes in their stored representation, which `_load_raw`
+        turns into the bytes `_get_bytes` would return. Batched reads call
+        `_load_raw` from worker threads, so backends should defer expensive
+        work such as decompression to it.
+        """
+        return self._get_bytes_multi(id_list)
+
+    @staticmethod
+    def _load_raw(value: Any) -> bytes | None:
+        """
+        Like `_decode_value`, this must not depend on the instance.
+        """
+        return value
+
+    def _decode_multi(self, raw_items: dict[str, Any], subkey=None) -> Iterator[tuple[str, Any]]:
+        # Worker threads get everything they need up front. Touching the thread
+        # local instance from them would set it up again in every thread.
+        decode = partial(
+            _load_and_decode,
+            load_raw=self._load_raw,
+            decode_value=self._decode_value,
+            subkey=subkey,
+            dictionaries=self.zstd_dictionaries,
+        )
+        if len(raw_items) <= 1:
+            return map(decode, raw_items.items())
+        return _decode_pool.map(decode, raw_items.items())
+
+    def _cache_decoded(self, items: Iterable[tuple[str, Any]], subkey=None):
+        items = dict(items)
+        if subkey is None:
+            self._set_cache_items(items)
+        return items
+
     def get_multi(self, id_list, subkey=None):
         """
         >>> nodestore.get_multi(['key1', 'key2')
@@ -186,12 +266,11 @@ class NodeStorage(local, Service):
             else:
                 uncached_ids = id_list
 
-            items = {
-                id: self._decode(value, subkey=subkey)
-                for id, value in self._get_bytes_multi(uncached_ids).items()
-            }
+            items = self._cache_decoded(
+                self._decode_multi(self._get_raw_multi(uncached_ids), subkey=subkey),
+                subkey=subkey,
+            )
             if subkey is None:
-                self._set_cache_items(items)
                 items.update(cache_items)
 
             span.set_tag("result", "from_service")
@@ -199,6 +278,42 @@ class NodeStorage(local, Service):
 
             return items
 
+    def get_multi_iter(
+        self, id_list, subkey=None, chunk_size=MULTI_GET_CHUNK_SIZE
+    ) -> Iterator[tuple[str, Any]]:
+        """
+        Like `get_multi`, but fetches nodes in chunks of `chunk_size` and
+        yields `(id, data)` pairs instead of building one dictionary. While a
+        chunk is decoded by worker threads the next one is already fetched from
+        the backend, so at most two chunks are held in memory at a time.
+
+        >>> for id, data in nodestore.get_multi_iter(['key1', 'key2']):
+        ...     print(id, data)
+        key1 {"message": "hello world"}
+        key2 {"message": "hello world"}
+        """
+        pending: Iterable[tuple[str, Any]] = ()
+        for chunk in chunked(id_list, chunk_size):
+            with sentry_sdk.start_span(op="nodestore.get_multi_iter") as span:
+                span.set_tag("subkey", str(subkey))
+                span.set_tag("num_ids", len(chunk))
+
+                cache_items = self._get_cache_items(chunk) if subkey is None else {}
+                uncached_ids = [id for id in chunk if id not in cache_items]
+                raw_items = self._get_raw_multi(uncached_ids) if uncached_ids else {}
+                decoded = self._decode_multi(raw_items, subkey=subkey)
+
+            yield from pending
+            # Generators are lazy, waiting on the decoded chunk only happens
+            # once the next chunk has been requested from the backend.
+            pending = self._iter_chunk(cache_items, decoded, subkey=subkey)
+
+        yield from pending
+
+    def _iter_chunk(self, cache_items, decoded, subkey=None):
+        yield from cache_items.items()
+        yield from self._cache_decoded(decoded, subkey=subkey).items()
+
     def _encode(self, data):
         """
         Encode data dict in a way where its keys can be deserialized
@@ -208,6 +323,12 @@ class NodeStorage(local, Service):
         >>> _encode({"unprocessed": {}, None: {"stacktrace": {}}})
         b'{"stacktrace": {}}\nunprocessed\n{}'
         """
+        if options.get("nodestore.use-binary-encoding"):
+            # The first configured dictionary is used for writing, the others
+            # are only kept around to read nodes written before a rotation.
+            dictionary = next(iter(self.zstd_dictionaries.values()), None)
+            return encode_node(data, dumps=json_dumps, dictionary=dictionary)
+
         lines = [json_dumps(data.pop(None)).encode("utf8")]
         for key, value in data.items():
             lines.append(key.encode("ascii"))
@@ -288,6 +409,10 @@ class NodeStorage(local, Service):
         if self.cache:
             self.cache.delete_many([id for id in id_list])
 
+    @memoize
+    def zstd_dictionaries(self):
+        return load_dictionaries(settings.SENTRY_NODESTORE_ZSTD_DICTIONARIES)
+
     @memoize
     def cache(self):
         try:
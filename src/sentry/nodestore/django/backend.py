@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import base64
 import logging
 import math
 import pickle
@@ -8,25 +9,44 @@ from django.utils import timezone
 
 from sentry.db.models import create_or_update
 from sentry.nodestore.base import NodeStorage
+from sentry.nodestore.encoding import MAGIC, is_encoded_node
 from sentry.utils.strings import compress, decompress
 
 from .models import Node
 
 logger = logging.getLogger("sentry")
 
+# Binary encoded nodes are compressed already. They are only base64 encoded to
+# fit the text column, and can be told apart from zlib compressed nodes by the
+# encoded magic bytes.
+_ENCODED_NODE_PREFIX = base64.b64encode(MAGIC[:3]).decode("ascii")
+
+
+def compress_node(data: bytes) -> str:
+    if is_encoded_node(data):
+        return base64.b64encode(data).decode("ascii")
+    return compress(data)
+
+
+def decompress_node(value: str) -> bytes:
+    if value.startswith(_ENCODED_NODE_PREFIX):
+        return base64.b64decode(value)
+    return decompress(value)
+
 
 class DjangoNodeStorage(NodeStorage):
     def delete(self, id):
         Node.objects.filter(id=id).delete()
         self._delete_cache_item(id)
 
-    def _decode(self, value, subkey):
+    @staticmethod
+    def _decode_value(value, subkey, dictionaries):
         if value is None:
             return None
 
         try:
-            if value.startswith(b"{"):
-                return NodeStorage._decode(self, value, subkey=subkey)
+            if value.startswith(b"{") or is_encoded_node(value):
+                return NodeStorage._decode_value(value, subkey, dictionaries)
 
             if subkey is None:
                 return pickle.loads(value)
@@ -39,19 +59,28 @@ class DjangoNodeStorage(NodeStorage):
     def _get_bytes(self, id):
         try:
             data = Node.objects.get(id=id).data
-            return decompress(data)
+            return decompress_node(data)
         except Node.DoesNotExist:
             return None
 
     def _get_bytes_multi(self, id_list: list[str]) -> dict[str, bytes | None]:
-        return {n.id: decompress(n.data) for n in Node.objects.filter(id__in=id_list)}
+        return {n.id: decompress_node(n.data) for n in Node.objects.filter(id__in=id_list)}
+
+    def _get_raw_multi(self, id_list: list[str]) -> dict[str, str]:
+        return dict(Node.objects.filter(id__in=id_list).values_list("id", "data"))
+
+    @staticmethod
+    def _load_raw(value: str) -> bytes:
+        return decompress_node(value)
 
     def delete_multi(self, id_list):
         Node.objects.filter(id__in=id_list).delete()
         self._delete_cache_items(id_list)
 
     def _set_bytes(self, id, data, ttl=None):
-        create_or_update(Node, id=id, values={"data": compress(data), "timestamp": timezone.now()})
+        create_or_update(
+            Node, id=id, values={"data": compress_node(data), "timestamp": timezone.now()}
+        )
 
     def cleanup(self, cutoff_timestamp):
         from sentry.db.deletion import BulkDeleteQuery
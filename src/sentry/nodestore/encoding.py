@@ -0,0 +1,177 @@
+"""
+Versioned binary encoding for nodestore payloads.
+
+The legacy encoding joins the main payload and all subkeys into one
+newline-separated blob of JSON documents, which means that reading any subkey
+requires the entire blob to be scanned. This encoding instead stores every
+subkey as an independently compressed zstd section and prefixes the payload
+with a small table of offsets, so a reader only decompresses and parses the
+section it asked for.
+
+Layout (all integers are big-endian)::
+
+    magic       4 bytes     b"\\xffSNB"
+    version     u8
+    count       u16         number of sections
+    table       count * (u16 key length, key bytes, u32 dict id, u32 offset, u32 length)
+    sections    zstd frames, offsets are relative to the end of the table
+
+The default payload (subkey `None`) is stored under the empty key. A dict id of
+`0` means the section was compressed without a dictionary, any other value
+refers to a zstd dictionary that needs to be available to the reader.
+
+The magic starts with a byte that can neither begin a JSON document nor a
+pickle stream, so payloads in any of the older formats keep decoding.
+"""
+
+from __future__ import annotations
+
+import struct
+from collections.abc import Mapping
+from typing import Any
+
+import zstandard
+
+from sentry.utils import json
+
+MAGIC = b"\xffSNB"
+VERSION = 1
+
+# zstd level used for the individual sections. Sections are written once and
+# read many times, so we prefer a slightly better ratio over write speed.
+COMPRESSION_LEVEL = 3
+
+DEFAULT_KEY = b""
+
+_HEADER = struct.Struct(">4sBH")
+_KEY_LENGTH = struct.Struct(">H")
+_ENTRY = struct.Struct(">III")
+
+
+class NodeEncodingError(ValueError):
+    pass
+
+
+def is_encoded_node(value: bytes) -> bool:
+    return value[: len(MAGIC)] == MAGIC
+
+
+def _subkey_to_key(subkey: str | None) -> bytes:
+    if subkey is None:
+        return DEFAULT_KEY
+    # Those keys should be statically known identifiers in the app, such as
+    # "unprocessed_event". There is really no reason to allow anything but
+    # ASCII here.
+    key = subkey.encode("ascii")
+    if not key:
+        raise NodeEncodingError("Subkeys must not be empty")
+    return key
+
+
+def encode_node(
+    data: Mapping[str | None, Any],
+    dumps=json.dumps,
+    level: int = COMPRESSION_LEVEL,
+    dictionary: zstandard.ZstdCompressionDict | None = None,
+) -> bytes:
+    """
+    Encode a mapping of subkeys to JSON-serializable values. A `None` key
+    must always be present which is served as the "default" subkey.
+
+    >>> encode_node({None: {"stacktrace": {}}, "unprocessed": {}})
+    b'\\xffSNB\\x01\\x00\\x02...'
+    """
+    if None not in data:
+        raise NodeEncodingError("The default subkey is required")
+
+    compressor = zstandard.ZstdCompressor(level=level, dict_data=dictionary)
+    dict_id = dictionary.dict_id() if dictionary is not None else 0
+
+    table = []
+    sections = []
+    offset = 0
+    for subkey, value in data.items():
+        key = _subkey_to_key(subkey)
+        section = compressor.compress(dumps(value).encode("utf8"))
+        table.append(_KEY_LENGTH.pack(len(key)) + key + _ENTRY.pack(dict_id, offset, len(section)))
+        sections.append(section)
+        offset += len(section)
+
+    return b"".join([_HEADER.pack(MAGIC, VERSION, len(table)), *table, *sections])
+
+
+def read_section_table(value: bytes) -> tuple[dict[bytes, tuple[int, int, int]], int]:
+    """
+    Parse the header of an encoded node without touching any of the
+    sections. Returns the table of `key -> (dict id, offset, length)` and the
+    position at which the sections start.
+    """
+    try:
+        magic, version, count = _HEADER.unpack_from(value, 0)
+    except struct.error:
+        raise NodeEncodingError("Truncated node header")
+
+    if magic != MAGIC:
+        raise NodeEncodingError("Not an encoded node")
+    if version != VERSION:
+        raise NodeEncodingError(f"Unsupported node encoding version {version}")
+
+    table = {}
+    pos = _HEADER.size
+    try:
+        for _ in range(count):
+            (key_length,) = _KEY_LENGTH.unpack_from(value, pos)
+            pos += _KEY_LENGTH.size
+            key = bytes(value[pos : pos + key_length])
+            pos += key_length
+            table[key] = _ENTRY.unpack_from(value, pos)
+            pos += _ENTRY.size
+    except struct.error:
+        raise NodeEncodingError("Truncated node section table")
+
+    return table, pos
+
+
+def decode_node(
+    value: bytes,
+    subkey: str | None = None,
+    loads=json.loads,
+    dictionaries: Mapping[int, zstandard.ZstdCompressionDict] | None = None,
+) -> Any:
+    """
+    Decompress and deserialize a single subkey of an encoded node. Returns
+    `None` if the node does not contain the requested subkey.
+    """
+    table, start = read_section_table(value)
+
+    entry = table.get(_subkey_to_key(subkey))
+    if entry is None:
+        return None
+
+    dict_id, offset, length = entry
+    dictionary = None
+    if dict_id:
+        dictionary = (dictionaries or {}).get(dict_id)
+        if dictionary is None:
+            raise NodeEncodingError(f"Missing zstd dictionary {dict_id}")
+
+    begin = start + offset
+    section = memoryview(value)[begin : begin + length]
+    if len(section) != length:
+        raise NodeEncodingError("Truncated node section")
+
+    decompressor = zstandard.ZstdDecompressor(dict_data=dictionary)
+    return loads(decompressor.decompress(section))
+
+
+def load_dictionaries(paths: list[str]) -> dict[int, zstandard.ZstdCompressionDict]:
+    """
+    Load trained zstd dictionaries from disk, keyed by their dictionary id.
+    The order of `paths` is preserved.
+    """
+    rv = {}
+    for path in paths:
+        with open(path, "rb") as f:
+            dictionary = zstandard.ZstdCompressionDict(f.read())
+        rv[dictionary.dict_id()] = dictionary
+    return rv
@@ -1,54 +1,409 @@
-import datetime
-import os
-from datetime import timezone
+from __future__ import annotations
 
-from django.conf import settings
+import fcntl
+import mmap
+import os
+import shutil
+import struct
+import threading
+import time
+import zlib
+from collections.abc import Iterable
+from datetime import datetime
+from typing import NamedTuple
 
 from sentry.nodestore.base import NodeStorage
 
+# Index records consist of the length of the node id, the id itself and the
+# location of the node's data in the segment file.
+_ID_LENGTH = struct.Struct(">B")
+_LOCATION = struct.Struct(">QI")
 
-class FileSystemNodeStorage(NodeStorage):
+# Maximum length of a node id in bytes, when encoded as UTF-8.
+MAX_ID_LENGTH = 2 ** (8 * _ID_LENGTH.size) - 1
+
+# Length of an index record marking a node as deleted.
+TOMBSTONE = 0xFFFFFFFF
+
+SEGMENT_SUFFIX = ".seg"
+INDEX_SUFFIX = ".idx"
+
+# Maximum time in seconds before partitions created or removed by other
+# processes are noticed. Lookups of unknown ids do not scan more often.
+SCAN_INTERVAL = 1.0
+
+
+class Location(NamedTuple):
+    partition: int
+    shard: int
+    offset: int
+    length: int
+    # Position of the index record, orders records of the same id within a
+    # partition.
+    record: int
+
+
+def encode_index_record(id: str, offset: int, length: int) -> bytes:
+    encoded_id = id.encode("utf8")
+    return _ID_LENGTH.pack(len(encoded_id)) + encoded_id + _LOCATION.pack(offset, length)
+
+
+def decode_index_records(data: bytes) -> tuple[list[tuple[int, str, int, int]], int]:
+    """
+    Decode all complete index records in `data`. Returns the records as
+    `(position, id, offset, length)` and the number of bytes consumed.
+    """
+    records = []
+    pos = 0
+    while pos + _ID_LENGTH.size <= len(data):
+        (id_length,) = _ID_LENGTH.unpack_from(data, pos)
+        end = pos + _ID_LENGTH.size + id_length + _LOCATION.size
+        if end > len(data):
+            break
+        id = data[pos + _ID_LENGTH.size : pos + _ID_LENGTH.size + id_length].decode("utf8")
+        offset, length = _LOCATION.unpack_from(data, end - _LOCATION.size)
+        records.append((pos, id, offset, length))
+        pos = end
+    return records, pos
+
+
+class SegmentStore:
     """
-    A simple backend that saves each node as a file. Only appropriate for
-    debugging and development!
+    Append-only storage of nodes in time-partitioned segment files.
+
+    Every partition is a directory named after the unix timestamp it starts at.
+    Within a partition, nodes are sharded by id into segment files holding the
+    concatenated node payloads, each accompanied by an index file mapping ids
+    to offsets in the segment. Deletions and overwrites only append to the
+    segment and index of the current partition, later records win.
+
+    The index of all partitions is held in memory and kept up to date by
+    reading the tail of the index files that can still be written to. It is
+    read completely when the store is first used, so memory usage and
+    startup time grow with the number of nodes retained, at a few hundred
+    bytes per node. This store is meant for single host installations with
+    a bounded retention; larger ones should use another nodestore backend.
+    Segments are read through memory maps. Instances are shared by all threads
+    that use the same directory, and writes are serialized across processes
+    with file locks.
     """
 
-    def __init__(self, path=None):
-        self.path: str = ""
+    def __init__(self, path: str, partition_seconds: int, shards: int):
+        self.path = path
+        self.partition_seconds = partition_seconds
+        self.shards = shards
+
+        self._lock = threading.RLock()
+        self._index: dict[str, Location] = {}
+        self._index_positions: dict[tuple[int, int], int] = {}
+        # Partitions whose index has been read, and the subset of those that
+        # can no longer be written to and have been read completely.
+        self._partitions: set[int] = set()
+        self._sealed: set[int] = set()
+        self._last_scan = 0.0
+        self._maps: dict[tuple[int, int], mmap.mmap] = {}
+
+    def partition_for(self, timestamp: float) -> int:
+        return int(timestamp // self.partition_seconds) * self.partition_seconds
 
-        if not settings.DEBUG:
-            raise ValueError("FileSystemNodeStorage should only be used in development!")
+    def shard_for(self, id: str) -> int:
+        return zlib.crc32(id.encode("utf8")) % self.shards
+
+    def partition_path(self, partition: int) -> str:
+        return os.path.join(self.path, str(partition))
+
+    def segment_path(self, partition: int, shard: int) -> str:
+        return os.path.join(self.partition_path(partition), f"{shard:03d}{SEGMENT_SUFFIX}")
+
+    def index_path(self, partition: int, shard: int) -> str:
+        return os.path.join(self.partition_path(partition), f"{shard:03d}{INDEX_SUFFIX}")
+
+    def bootstrap(self) -> None:
+        os.makedirs(self.path, exist_ok=True)
+
+    def get(self, id: str) -> bytes | None:
+        location = self._locate(id)
+        if location is None:
+            return None
+
+        segment = self._map(location.partition, location.shard, location.offset + location.length)
+        if segment is None:
+            return None
+        return segment[location.offset : location.offset + location.length]
+
+    def set(self, id: str, data: bytes) -> None:
+        self._append(id, data)
+
+    def delete(self, id: str) -> None:
+        if self._locate(id) is not None:
+            self._append(id, None)
+
+    def _locate(self, id: str) -> Location | None:
+        # Pick up writes of other processes to the id's shard. Partitions they
+        # just created are only picked up by the next periodic scan. Forcing a
+        # scan on every miss would serialize all lookups of missing ids.
+        self.refresh(shard=self.shard_for(id), scan=False)
+
+        location = self._index.get(id)
+        if location is None or location.length == TOMBSTONE:
+            return None
+        return location
+
+    def _append(self, id: str, data: bytes | None) -> None:
+        # Validate before anything is written. Data without an index record
+        # would take up space until its partition expires.
+        if len(id.encode("utf8")) > MAX_ID_LENGTH:
+            raise ValueError(f"node id must not exceed {MAX_ID_LENGTH} bytes")
+
+        partition = self.partition_for(time.time())
+        shard = self.shard_for(id)
+        os.makedirs(self.partition_path(partition), exist_ok=True)
+
+        with open(self.segment_path(partition, shard), "ab") as segment, open(
+            self.index_path(partition, shard), "ab"
+        ) as index:
+            fcntl.flock(segment, fcntl.LOCK_EX)
+            try:
+                offset = segment.seek(0, os.SEEK_END)
+                if data is None:
+                    length = TOMBSTONE
+                else:
+                    length = len(data)
+                    segment.write(data)
+                    segment.flush()
+                record = index.seek(0, os.SEEK_END)
+                index.write(encode_index_record(id, offset, length))
+                index.flush()
+            finally:
+                fcntl.flock(segment, fcntl.LOCK_UN)
+
+        with self._lock:
+            self._update(id, Location(partition, shard, offset, length, record))
+
+    def _update(self, id: str, location: Location) -> None:
+        # Index files are not necessarily read in the order they were written,
+        # never replace a newer record with an older one.
+        current = self._index.get(id)
+        if current is None or (current.partition, current.record) <= (
+            location.partition,
+            location.record,
+        ):
+            self._index[id] = location
+
+    def refresh(self, shard: int | None = None, scan: bool = True) -> None:
+        """
+        Read index records appended to partitions that can still be written
+        to since the last refresh, only those of `shard` if given.
+
+        Scanning the directory to pick up partitions created or removed by
+        other processes happens at least every `SCAN_INTERVAL` seconds, or
+        whenever `scan` is set.
+        """
+        with self._lock:
+            now = time.time()
+            if scan or now - self._last_scan >= SCAN_INTERVAL:
+                self._scan(now)
+
+            shards = range(self.shards) if shard is None else [shard]
+            for partition in sorted(self._partitions - self._sealed):
+                self._read_partition_index(partition, shards)
+
+    def _scan(self, now: float) -> None:
+        try:
+            on_disk = {int(name) for name in os.listdir(self.path) if name.isdigit()}
+        except FileNotFoundError:
+            on_disk = set()
+
+        removed = self._partitions - on_disk
+        if removed:
+            self._forget_partitions(removed)
+
+        # Allow for writers that are slightly behind on the clock.
+        writable = self.partition_for(now) - self.partition_seconds
+        for partition in sorted(on_disk - self._sealed):
+            if partition not in self._partitions or partition < writable:
+                self._read_partition_index(partition, range(self.shards))
+                self._partitions.add(partition)
+            if partition < writable:
+                # Nothing is appended to this partition anymore and it has
+                # been read completely, never look at it again.
+                self._sealed.add(partition)
+
+        self._last_scan = now
+
+    def _read_partition_index(self, partition: int, shards: Iterable[int]) -> None:
+        for shard in shards:
+            key = (partition, shard)
+            position = self._index_positions.get(key, 0)
+            try:
+                if os.stat(self.index_path(partition, shard)).st_size <= position:
+                    continue
+                with open(self.index_path(partition, shard), "rb") as index:
+                    index.seek(position)
+                    data = index.read()
+            except FileNotFoundError:
+                continue
+
+            # A record that is still being appended is picked up by the next
+            # refresh.
+            records, consumed = decode_index_records(data)
+            for record, id, offset, length in records:
+                self._update(id, Location(partition, shard, offset, length, position + record))
+            self._index_positions[key] = position + consumed
+
+    def _forget_partitions(self, partitions: set[int]) -> None:
+        self._index = {
+            id: loc for id, loc in self._index.items() if loc.partition not in partitions
+        }
+        for key in list(self._index_positions):
+            if key[0] in partitions:
+                del self._index_positions[key]
+        for key in list(self._maps):
+            if key[0] in partitions:
+                del self._maps[key]
+        self._partitions -= partitions
+        self._sealed -= partitions
+
+    def _map(self, partition: int, shard: int, size: int) -> mmap.mmap | None:
+        key = (partition, shard)
+        segment = self._maps.get(key)
+        if segment is not None and len(segment) >= size:
+            return segment
+
+        with self._lock:
+            segment = self._maps.get(key)
+            if segment is None or len(segment) < size:
+                # Segments only grow, remap to cover data appended since the
+                # segment was last mapped. Previous maps are closed once
+                # they are no longer referenced.
+                try:
+                    with open(self.segment_path(partition, shard), "rb") as f:
+                        segment = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                except (FileNotFoundError, ValueError):
+                    return None
+                self._maps[key] = segment
+            return segment if len(segment) >= size else None
+
+    def cleanup(self, cutoff: datetime) -> None:
+        """
+        Remove every partition that ends before `cutoff`.
+        """
+        cutoff_timestamp = cutoff.timestamp()
+        try:
+            partitions = {int(name) for name in os.listdir(self.path) if name.isdigit()}
+        except FileNotFoundError:
+            return
+
+        expired = {p for p in partitions if p + self.partition_seconds <= cutoff_timestamp}
+        for partition in expired:
+            shutil.rmtree(self.partition_path(partition), ignore_errors=True)
+
+        with self._lock:
+            self._forget_partitions(expired)
+
+
+_stores: dict[tuple[str, int, int], SegmentStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_segment_store(path: str, partition_seconds: int, shards: int) -> SegmentStore:
+    key = (path, partition_seconds, shards)
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = SegmentStore(path, partition_seconds, shards)
+        return _stores[key]
+
+
+class FileSystemNodeStorage(NodeStorage):
+    """
+    A backend that stores nodes on the local disk in append-only segment
+    files, see `SegmentStore`. Lookups go through an in-memory index and
+    memory mapped segments, and `cleanup` drops whole partitions.
+
+    Nodes written as ``{id}.json`` files by earlier versions of this backend
+    are still read, deleted and cleaned up, but never written.
+
+    :param path: Directory to store segments in.
+    :param partition_seconds: Time span covered by a partition. Data is
+        retained at this granularity.
+    :param shards: Number of segment files per partition. Writes to
+        different shards do not contend for the same file lock.
+
+    >>> FileSystemNodeStorage(
+    ...     path='/var/lib/sentry/nodestore',
+    ...     partition_seconds=86400,
+    ...     shards=16,
+    ... )
+    """
+
+    def __init__(self, path=None, partition_seconds=86400, shards=16):
         if path:
-            self.path = os.path.abspath(os.path.expanduser(path))
+            path = os.path.abspath(os.path.expanduser(path))
         else:
-            self.path = os.path.abspath(os.path.join(os.path.dirname(__file__), "./nodes"))
+            path = os.path.abspath(os.path.join(os.path.dirname(__file__), "./nodes"))
+
+        self.path: str = path
+        self.store = get_segment_store(path, partition_seconds, shards)
+
+    def legacy_path(self, id: str) -> str:
+        return os.path.join(self.path, f"{id}.json")
+
+    def _get_legacy_bytes(self, id: str) -> bytes | None:
+        try:
+            with open(self.legacy_path(id), "rb") as file:
+                return file.read()
+        except FileNotFoundError:
+            return None
+
+    def _delete_legacy(self, id: str) -> None:
+        try:
+            os.remove(self.legacy_path(id))
+        except FileNotFoundError:
+            pass
 
     def _get_bytes(self, id: str):
-        with open(self.node_path(id), "rb") as file:
-            return file.read()
+        data = self.store.get(id)
+        if data is None:
+            data = self._get_legacy_bytes(id)
+        return data
 
-    def _set_bytes(self, id: str, data: bytes, ttl=0):
-        with open(self.node_path(id), "wb") as file:
-            file.write(data)
+    def _get_bytes_multi(self, id_list: list[str]) -> dict[str, bytes | None]:
+        return {id: self._get_bytes(id) for id in id_list}
+
+    def _set_bytes(self, id: str, data: bytes, ttl=None):
+        self.store.set(id, data)
 
     def delete(self, id):
-        os.remove(self.node_path(id))
+        self.store.delete(id)
+        self._delete_legacy(id)
+        self._delete_cache_item(id)
 
-    def cleanup(self, cutoff: datetime.datetime):
-        for filename in os.listdir(self.path):
-            path = os.path.join(self.path, filename)
-            creation_datetime = datetime.datetime.fromtimestamp(os.path.getctime(path)).replace(
-                tzinfo=timezone.utc
-            )
+    def delete_multi(self, id_list):
+        for id in id_list:
+            self.store.delete(id)
+            self._delete_legacy(id)
+        self._delete_cache_items(id_list)
 
-            if creation_datetime > cutoff:
-                os.remove(path)
+    def cleanup(self, cutoff: datetime):
+        self.store.cleanup(cutoff)
 
-    def bootstrap(self):
+        # Remove nodes written by earlier versions of this backend.
+        cutoff_timestamp = cutoff.timestamp()
         try:
-            os.mkdir(self.path)
-        except FileExistsError:
-            pass
+            entries = list(os.scandir(self.path))
+        except FileNotFoundError:
+            entries = []
+        for entry in entries:
+            if not entry.name.endswith(".json"):
+                continue
+            try:
+                if entry.stat().st_mtime < cutoff_timestamp:
+                    os.remove(entry.path)
+            except FileNotFoundError:
+                pass
 
-    def node_path(self, id: str):
-        return os.path.join(self.path, f"{id}.json")
+        if self.cache:
+            self.cache.clear()
+
+    def bootstrap(self):
+        self.store.bootstrap()
@@ -531,6 +531,23 @@ register(
     flags=FLAG_PRIORITIZE_DISK | FLAG_AUTOMATOR_MODIFIABLE,
 )
 
+# Cache Snuba query results with a single-flight lock per query, and serve
+# results for this many seconds past `SENTRY_SNUBA_CACHE_TTL_SECONDS` while
+# they are refreshed in the background.
+register("snuba.query-cache.single-flight.enabled", default=False, flags=FLAG_AUTOMATOR_MODIFIABLE)
+register("snuba.query-cache.stale-ttl", default=300, flags=FLAG_AUTOMATOR_MODIFIABLE)
+# Time in seconds to wait for another process running the same query before
+# running it anyway.
+register("snuba.query-cache.lock-wait-timeout", default=5.0, flags=FLAG_AUTOMATOR_MODIFIABLE)
+
+# Serve closed buckets of timeseries queries from a cache and only query
+# the remaining buckets, see `sentry.snuba.timeseries_cache`.
+register("snuba.timeseries-cache.tsdb.enabled", default=False, flags=FLAG_AUTOMATOR_MODIFIABLE)
+register("snuba.timeseries-cache.discover.enabled", default=False, flags=FLAG_AUTOMATOR_MODIFIABLE)
+# Buckets are only cached once they ended at least this many seconds ago.
+register("snuba.timeseries-cache.settle-seconds", default=300, flags=FLAG_AUTOMATOR_MODIFIABLE)
+register("snuba.timeseries-cache.ttl", default=3600, flags=FLAG_AUTOMATOR_MODIFIABLE)
+
 # Kafka Publisher
 register("kafka-publisher.raw-event-sample-rate", default=0.0, flags=FLAG_AUTOMATOR_MODIFIABLE)
 register("kafka-publisher.max-event-size", default=100000, flags=FLAG_AUTOMATOR_MODIFIABLE)
@@ -653,6 +670,10 @@ register(
     "store.nodestore-stats-sample-rate", default=0.0, flags=FLAG_AUTOMATOR_MODIFIABLE
 )  # unused
 
+# Write nodestore payloads in the binary, per-subkey compressed encoding.
+# Readers support both encodings regardless of this option.
+register("nodestore.use-binary-encoding", default=False, flags=FLAG_AUTOMATOR_MODIFIABLE)
+
 # Killswitch to stop storing any reprocessing payloads.
 register("store.reprocessing-force-disable", default=False, flags=FLAG_AUTOMATOR_MODIFIABLE)
 
@@ -792,6 +813,17 @@ register("store.background-grouping-sample-rate", default=0.0, flags=FLAG_AUTOMA
 # contents stored as separate release files.
 register("processing.release-archive-min-files", default=10, flags=FLAG_AUTOMATOR_MODIFIABLE)
 
+# Flush pending buffer keys in bulk: pop them atomically and apply them with one
+# `UPDATE` per model and column set instead of one `process_incr` task per key.
+register("buffer.bulk-flush", default=False, flags=FLAG_AUTOMATOR_MODIFIABLE)
+
+# Coalesce `buffer.incr` calls for the same model and filters in-process before
+# sending them to the buffer. Pending increments are flushed after `max-delay`
+# seconds, once `max-keys` keys are pending, on consumer commits and on exit.
+register("buffer.accumulate-incr", default=False, flags=FLAG_AUTOMATOR_MODIFIABLE)
+register("buffer.accumulate-incr.max-delay", default=1.0, flags=FLAG_AUTOMATOR_MODIFIABLE)
+register("buffer.accumulate-incr.max-keys", default=1000, flags=FLAG_AUTOMATOR_MODIFIABLE)
+
 # Whether to use `zstd` instead of `zlib` for the attachment cache.
 register("attachment-cache.use-zstd", default=False, flags=FLAG_AUTOMATOR_MODIFIABLE)
 
@@ -816,6 +848,19 @@ register("relay.transaction-metrics-org-sample-rate", default=0.0, flags=FLAG_AU
 # Relay should emit a usage metric to track total spans.
 register("relay.span-usage-metric", default=False, flags=FLAG_AUTOMATOR_MODIFIABLE)
 
+# Compress cached project configs with a dictionary trained on a sample of configs.
+register(
+    "relay.projectconfig-cache.compression-dictionary",
+    default=False,
+    flags=FLAG_AUTOMATOR_MODIFIABLE,
+)
+# Number of project keys whose cached configs are sampled to train the dictionary.
+register(
+    "relay.projectconfig-cache.dictionary-sample-size",
+    default=2000,
+    flags=FLAG_AUTOMATOR_MODIFIABLE,
+)
+
 # Killswitch for the Relay cardinality limiter, one of `enabled`, `disabled`, `passive`.
 # In `passive` mode Relay's cardinality limiter is active but it does not enforce the limits.
 #
@@ -1004,6 +1049,11 @@ register(
 
 # END ABUSE QUOTAS
 
+# Time in seconds to cache the quota configs of a project and its keys for, 0
+# disables the cache. Changes to organization and project settings invalidate
+# cached configs right away, changes to global options once they expire.
+register("quotas.config-cache.ttl", default=0, flags=FLAG_AUTOMATOR_MODIFIABLE)
+
 # Send event messages for specific project IDs to random partitions in Kafka
 # contents are a list of project IDs to message types to be randomly assigned
 # e.g. [{"project_id": 2, "message_type": "error"}, {"project_id": 3, "message_type": "transaction"}]
@@ -1097,6 +1147,14 @@ register(
     flags=FLAG_AUTOMATOR_MODIFIABLE,
 )
 
+# Option to insert strings the Postgres indexer has not seen in this process
+# right away, instead of looking them up first
+register(
+    "sentry-metrics.indexer.postgres.skip-reads-for-unseen-strings",
+    default=False,
+    flags=FLAG_AUTOMATOR_MODIFIABLE,
+)
+
 # Global and per-organization limits on the writes to the string indexer's DB.
 #
 # Format is a list of dictionaries of format {
@@ -2101,3 +2159,13 @@ register(
     default=[],
     flags=FLAG_ALLOW_EMPTY | FLAG_AUTOMATOR_MODIFIABLE,
 )
+
+# Fetch the counts of the event frequency conditions of the rules of an event
+# together, once their filters and cheaper conditions passed. See
+# `EventFrequencyQueryBatch`.
+register(
+    "rules.event-frequency.batch-queries",
+    default=False,
+    type=Bool,
+    flags=FLAG_AUTOMATOR_MODIFIABLE,
+)
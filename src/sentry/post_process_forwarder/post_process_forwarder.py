@@ -9,6 +9,7 @@ from arroyo.processing.strategies import (
     ProcessingStrategyFactory,
     RunTaskInThreads,
 )
+from arroyo.processing.strategies.batching import BatchStep, ValuesBatch
 from arroyo.types import Commit, Message, Partition
 
 from sentry.utils.arroyo import MultiprocessingPool, RunTaskWithMultiprocessing
@@ -22,6 +23,11 @@ class PostProcessForwarderStrategyFactory(ProcessingStrategyFactory[KafkaPayload
     def _dispatch_function(message: Message[KafkaPayload]) -> None:
         raise NotImplementedError()
 
+    @classmethod
+    def _dispatch_batch_function(cls, message: Message[ValuesBatch[KafkaPayload]]) -> None:
+        for value in message.payload:
+            cls._dispatch_function(Message(value))
+
     def __init__(
         self,
         mode: str,
@@ -29,7 +35,7 @@ class PostProcessForwarderStrategyFactory(ProcessingStrategyFactory[KafkaPayload
         input_block_size: int,
         output_block_size: int,
         max_batch_size: int,
-        max_batch_time: int,
+        max_batch_time: float,
         concurrency: int,
     ) -> None:
         self.mode = mode
@@ -65,6 +71,21 @@ class PostProcessForwarderStrategyFactory(ProcessingStrategyFactory[KafkaPayload
                 input_block_size=self.input_block_size,
                 output_block_size=self.output_block_size,
             )
+        elif self.mode == "batched":
+            # Up to `concurrency` batches are dispatched at the same time.
+            # Offsets are only committed once every task of a batch, and of
+            # the batches before it, has been dispatched.
+            logger.info("Starting batched post process forwarder")
+            return BatchStep(
+                max_batch_size=self.max_batch_size,
+                max_batch_time=self.max_batch_time,
+                next_step=RunTaskInThreads(
+                    processing_function=self._dispatch_batch_function,
+                    concurrency=self.concurrency,
+                    max_pending_futures=self.concurrency,
+                    next_step=CommitOffsets(commit),
+                ),
+            )
         else:
             raise ValueError(f"Invalid mode {self.mode}")
 
@@ -3,6 +3,7 @@ from __future__ import annotations
 from dataclasses import dataclass
 from enum import IntEnum, unique
 from typing import TYPE_CHECKING, Any, Literal
+from uuid import uuid4
 
 from django.conf import settings
 from django.core.cache import cache
@@ -237,6 +238,24 @@ def index_data_category(event_type: str | None, organization) -> DataCategory:
     return DataCategory.from_event_type(event_type)
 
 
+# Quota configs cached by `RedisQuota.get_quotas` are stamped with a version
+# per organization, which is replaced whenever settings of the organization,
+# its projects or its keys change.
+QUOTA_CONFIG_VERSION_TTL = 7 * 24 * 60 * 60
+
+
+def get_quota_config_version_key(organization_id: int) -> str:
+    return f"quotas:config-version:{organization_id}"
+
+
+def bump_quota_config_version(organization_id: int) -> None:
+    """
+    Invalidate the cached quota configs of all projects and keys of an
+    organization.
+    """
+    cache.set(get_quota_config_version_key(organization_id), uuid4().hex, QUOTA_CONFIG_VERSION_TTL)
+
+
 class Quota(Service):
     """
     Quotas handle tracking a project's usage and respond whether or not a
@@ -1,13 +1,26 @@
 from time import time
+from uuid import uuid4
 
 import rb
 import sentry_sdk
+from django.core.cache import cache
 from rediscluster import RedisCluster
 
+from sentry import options
 from sentry.constants import DataCategory
 from sentry.models.project import Project
 from sentry.models.projectkey import ProjectKey
-from sentry.quotas.base import NotRateLimited, Quota, QuotaConfig, QuotaScope, RateLimited
+from sentry.quotas.base import (
+    QUOTA_CONFIG_VERSION_TTL,
+    NotRateLimited,
+    Quota,
+    QuotaConfig,
+    QuotaScope,
+    RateLimited,
+    get_quota_config_version_key,
+)
+from sentry.utils import metrics
+from sentry.utils.hashlib import md5_text
 from sentry.utils.redis import (
     get_dynamic_cluster_from_options,
     is_instance_rb_cluster,
@@ -65,6 +78,39 @@ class RedisQuota(Quota):
         if key:
             key.project = project
 
+        if key and not keys:
+            keys = [key]
+        elif not keys:
+            keys = []
+
+        ttl = options.get("quotas.config-cache.ttl")
+        if not ttl:
+            return self.__compute_quotas(project, keys)
+
+        key_ids = ",".join(str(k.id) for k in keys)
+        cache_key = f"quotas:config:{project.id}:{md5_text(key_ids).hexdigest()}"
+        version_key = get_quota_config_version_key(project.organization_id)
+
+        cached = cache.get_many([version_key, cache_key])
+        version = cached.get(version_key)
+        if version is None:
+            # Never trust entries written before the version got lost.
+            version = uuid4().hex
+            if not cache.add(version_key, version, QUOTA_CONFIG_VERSION_TTL):
+                version = cache.get(version_key)
+        else:
+            entry = cached.get(cache_key)
+            if entry is not None and entry[0] == version:
+                metrics.incr("quotas.config_cache", tags={"result": "hit"})
+                return list(entry[1])
+
+        metrics.incr("quotas.config_cache", tags={"result": "miss"})
+        results = self.__compute_quotas(project, keys)
+        if version is not None:
+            cache.set(cache_key, (version, tuple(results)), ttl)
+        return results
+
+    def __compute_quotas(self, project: Project, keys: list[ProjectKey]) -> list[QuotaConfig]:
         results = [*self.get_abuse_quotas(project.organization)]
 
         with sentry_sdk.start_span(op="redis.get_quotas.get_project_quota") as span:
@@ -115,11 +161,6 @@ class RedisQuota(Quota):
                     )
                 )
 
-        if key and not keys:
-            keys = [key]
-        elif not keys:
-            keys = []
-
         for key in keys:
             with sentry_sdk.start_span(op="redis.get_quotas.get_key_quota") as span:
                 span.set_tag("key.id", key.id)
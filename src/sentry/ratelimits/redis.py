@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import logging
+from collections.abc import Sequence
 from time import time
 from typing import TYPE_CHECKING, Any
 
@@ -118,3 +119,31 @@ class RedisRateLimiter(RateLimiter):
             return False, 0, reset_time
 
         return result > limit, result, reset_time
+
+    def is_limited_many(
+        self, requests: Sequence[tuple[str, int]], window: int | None = None
+    ) -> list[bool]:
+        """
+        Checks all `(key, limit)` pairs of `requests` with a single pipeline.
+        Keys may be repeated, every occurrence counts against the limit.
+        """
+        if not requests:
+            return []
+
+        request_time = time()
+        if window is None or window == 0:
+            window = self.window
+        expiration = window - int(request_time % window)
+
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for key, _ in requests:
+                redis_key = self._construct_redis_key(key, window=window, request_time=request_time)
+                pipe.incr(redis_key)
+                pipe.expire(redis_key, expiration)
+            pipeline_result = pipe.execute()
+        except RedisError:
+            logger.exception("Failed to retrieve current value from redis")
+            return [False] * len(requests)
+
+        return [result > limit for (_, limit), result in zip(requests, pipeline_result[::2])]
@@ -1,8 +1,9 @@
+from sentry.utils import json
 from sentry.utils.services import Service
 
 
 class ProjectConfigCache(Service):
-    __all__ = ("set_many", "delete_many", "get")
+    __all__ = ("set_many", "delete_many", "get", "get_serialized", "rotate_compression_dictionary")
 
     def __init__(self, **options):
         pass
@@ -15,3 +16,20 @@ class ProjectConfigCache(Service):
 
     def get(self, public_key):
         raise NotImplementedError()
+
+    def get_serialized(self, public_key):
+        """
+        Returns the config of `public_key` serialized as JSON, or `None` if it
+        is not cached.
+        """
+        rv = self.get(public_key)
+        if rv is not None:
+            return json.dumps(rv)
+        return None
+
+    def rotate_compression_dictionary(self, configs):
+        """
+        Trains a compression dictionary for cached configs on a sample of
+        `configs`, if the backend supports it.
+        """
+        return None
@@ -1,7 +1,13 @@
 import logging
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
 
 import zstandard
+from cachetools import LRUCache, TTLCache
 
+from sentry import options
 from sentry.relay.projectconfig_cache.base import ProjectConfigCache
 from sentry.utils import json, metrics, redis
 from sentry.utils.redis import validate_dynamic_cluster
@@ -9,9 +15,29 @@ from sentry.utils.redis import validate_dynamic_cluster
 REDIS_CACHE_TIMEOUT = 3600  # 1 hr
 COMPRESSION_LEVEL = 3  # 3 is the default level of compression
 
+# Configs read through `get_serialized` are kept in memory for a few seconds, relays
+# requesting the same keys at the same time then only cost a single Redis read.
+LOCAL_CACHE_TTL = 5
+LOCAL_CACHE_SIZE = 10_000
+# Maximum time in seconds to wait for a concurrent read of the same key before
+# reading from Redis directly.
+LOCAL_PENDING_TIMEOUT = 1
+
+# Configs can be compressed with a dictionary trained on a sample of configs, see
+# `rotate_compression_dictionary`. Compressed configs reference their dictionary by id.
+DICTIONARY_SIZE = 64 * 1024
+DICTIONARY_CACHE_SIZE = 8
+# Maximum time in seconds before writers pick up a rotated dictionary.
+DICTIONARY_REFRESH_INTERVAL = 60
+CURRENT_DICTIONARY_KEY = "relayconfig-dictionary:current"
+
 logger = logging.getLogger(__name__)
 
 
+class MissingDictionary(Exception):
+    pass
+
+
 class RedisProjectConfigCache(ProjectConfigCache):
     def __init__(self, **options):
         cluster_key = options.get("cluster", "default")
@@ -20,6 +46,21 @@ class RedisProjectConfigCache(ProjectConfigCache):
         read_cluster_key = options.get("read_cluster", cluster_key)
         self.cluster_read = redis.redis_clusters.get(read_cluster_key, decode_responses=False)
 
+        # Holds the values as they are stored in Redis, a TTL of 0 disables the cache.
+        local_cache_ttl = options.get("local_cache_ttl", LOCAL_CACHE_TTL)
+        self._local_cache: TTLCache[str, bytes] | None = (
+            TTLCache(LOCAL_CACHE_SIZE, local_cache_ttl) if local_cache_ttl else None
+        )
+        self._local_lock = threading.Lock()
+        self._local_pending: dict[str, Future[bytes | None]] = {}
+
+        self._dictionary_lock = threading.Lock()
+        self._dictionaries: LRUCache[int, zstandard.ZstdCompressionDict] = LRUCache(
+            DICTIONARY_CACHE_SIZE
+        )
+        self._current_dictionary: zstandard.ZstdCompressionDict | None = None
+        self._current_dictionary_expiry = 0.0
+
         super().__init__(**options)
 
     def validate(self):
@@ -28,14 +69,22 @@ class RedisProjectConfigCache(ProjectConfigCache):
     def __get_redis_key(self, public_key):
         return f"relayconfig:{public_key}"
 
+    def __get_dictionary_key(self, dict_id):
+        return f"relayconfig-dictionary:{dict_id}"
+
     def set_many(self, configs):
         metrics.incr("relay.projectconfig_cache.write", amount=len(configs), tags={"action": "set"})
 
+        dictionary = None
+        if options.get("relay.projectconfig-cache.compression-dictionary"):
+            dictionary = self._get_current_dictionary()
+        compressor = zstandard.ZstdCompressor(level=COMPRESSION_LEVEL, dict_data=dictionary)
+
         # Note: Those are multiple pipelines, one per cluster node
         p = self.cluster.pipeline()
         for public_key, config in configs.items():
             serialized = json.dumps(config).encode()
-            compressed = zstandard.compress(serialized, level=COMPRESSION_LEVEL)
+            compressed = compressor.compress(serialized)
             metrics.distribution(
                 "relay.projectconfig_cache.uncompressed_size", len(serialized), unit="byte"
             )
@@ -44,6 +93,7 @@ class RedisProjectConfigCache(ProjectConfigCache):
             p.setex(self.__get_redis_key(public_key), REDIS_CACHE_TIMEOUT, compressed)
 
         p.execute()
+        self._evict_local(configs)
 
     def delete_many(self, public_keys):
         # Note: Those are multiple pipelines, one per cluster node
@@ -51,6 +101,7 @@ class RedisProjectConfigCache(ProjectConfigCache):
             for public_key in public_keys:
                 p.delete(self.__get_redis_key(public_key))
             return_values = p.execute()
+        self._evict_local(public_keys)
 
         metrics.incr(
             "relay.projectconfig_cache.write", amount=sum(return_values), tags={"action": "delete"}
@@ -60,9 +111,160 @@ class RedisProjectConfigCache(ProjectConfigCache):
         rv = self.cluster_read.get(self.__get_redis_key(public_key))
         if rv is not None:
             try:
-                rv = zstandard.decompress(rv).decode()
-            except (TypeError, zstandard.ZstdError):
-                # assume raw json
-                pass
-            return json.loads(rv)
+                return json.loads(self._decompress(rv))
+            except MissingDictionary:
+                return None
+        return None
+
+    def get_serialized(self, public_key):
+        """
+        Same as `get`, but returns the config as a JSON string.
+
+        Reads are served from a per-process cache holding the compressed configs for
+        `local_cache_ttl` seconds, concurrent reads of the same key that miss the cache
+        share a single Redis read. Writes and deletes of other processes may therefore
+        only be visible after the TTL.
+        """
+        rv = self._get_local(public_key)
+        if rv is not None:
+            try:
+                return self._decompress(rv)
+            except MissingDictionary:
+                return None
         return None
+
+    def _get_local(self, public_key: str) -> bytes | None:
+        if self._local_cache is None:
+            return self.cluster_read.get(self.__get_redis_key(public_key))
+
+        with self._local_lock:
+            rv = self._local_cache.get(public_key)
+            if rv is not None:
+                metrics.incr("relay.projectconfig_cache.local", tags={"result": "hit"})
+                return rv
+
+            pending = self._local_pending.get(public_key)
+            if pending is None:
+                future: Future[bytes | None] = Future()
+                self._local_pending[public_key] = future
+
+        if pending is not None:
+            try:
+                rv = pending.result(timeout=LOCAL_PENDING_TIMEOUT)
+            except FutureTimeoutError:
+                metrics.incr("relay.projectconfig_cache.local", tags={"result": "timeout"})
+                return self.cluster_read.get(self.__get_redis_key(public_key))
+            metrics.incr("relay.projectconfig_cache.local", tags={"result": "coalesced"})
+            return rv
+
+        metrics.incr("relay.projectconfig_cache.local", tags={"result": "miss"})
+        try:
+            rv = self.cluster_read.get(self.__get_redis_key(public_key))
+        except BaseException as e:
+            with self._local_lock:
+                del self._local_pending[public_key]
+            future.set_exception(e)
+            raise
+
+        with self._local_lock:
+            # Missing configs are not cached, they are about to be computed.
+            if rv is not None:
+                self._local_cache[public_key] = rv
+            del self._local_pending[public_key]
+        future.set_result(rv)
+        return rv
+
+    def _evict_local(self, public_keys) -> None:
+        if self._local_cache is None:
+            return
+
+        with self._local_lock:
+            for public_key in public_keys:
+                self._local_cache.pop(public_key, None)
+
+    def rotate_compression_dictionary(self, configs):
+        """
+        Trains a compression dictionary on a sample of `configs` and makes it the
+        dictionary new configs are compressed with.
+
+        The previous dictionary is kept until all configs compressed with it have
+        expired. Returns the id of the new dictionary, or `None` if there were
+        not enough configs to train one.
+        """
+        samples = [json.dumps(config).encode() for config in configs]
+        try:
+            dictionary = zstandard.train_dictionary(
+                DICTIONARY_SIZE, samples, level=COMPRESSION_LEVEL
+            )
+        except zstandard.ZstdError:
+            logger.warning(
+                "relay.projectconfig_cache.dictionary_training_failed",
+                extra={"samples": len(samples)},
+                exc_info=True,
+            )
+            return None
+
+        dict_id = dictionary.dict_id()
+        previous_id = self.cluster.get(CURRENT_DICTIONARY_KEY)
+
+        # Setting the dictionary clears the expiry in case it was used before.
+        self.cluster.set(self.__get_dictionary_key(dict_id), dictionary.as_bytes())
+        self.cluster.set(CURRENT_DICTIONARY_KEY, dict_id)
+        if previous_id is not None and int(previous_id) != dict_id:
+            # Writers may still be using the previous dictionary until they refresh it.
+            self.cluster.expire(
+                self.__get_dictionary_key(int(previous_id)),
+                REDIS_CACHE_TIMEOUT + DICTIONARY_REFRESH_INTERVAL,
+            )
+
+        metrics.distribution(
+            "relay.projectconfig_cache.dictionary_size", len(dictionary.as_bytes()), unit="byte"
+        )
+        return dict_id
+
+    def _get_current_dictionary(self) -> zstandard.ZstdCompressionDict | None:
+        now = time.monotonic()
+        with self._dictionary_lock:
+            if now < self._current_dictionary_expiry:
+                return self._current_dictionary
+
+        dict_id = self.cluster.get(CURRENT_DICTIONARY_KEY)
+        dictionary = self._get_dictionary(int(dict_id)) if dict_id is not None else None
+
+        with self._dictionary_lock:
+            self._current_dictionary = dictionary
+            self._current_dictionary_expiry = now + DICTIONARY_REFRESH_INTERVAL
+        return dictionary
+
+    def _get_dictionary(self, dict_id: int) -> zstandard.ZstdCompressionDict | None:
+        # Dictionaries never change, they can be cached by id indefinitely.
+        with self._dictionary_lock:
+            dictionary = self._dictionaries.get(dict_id)
+        if dictionary is not None:
+            return dictionary
+
+        data = self.cluster.get(self.__get_dictionary_key(dict_id))
+        if data is None:
+            return None
+
+        dictionary = zstandard.ZstdCompressionDict(data)
+        with self._dictionary_lock:
+            self._dictionaries[dict_id] = dictionary
+        return dictionary
+
+    def _decompress(self, value: bytes) -> str:
+        try:
+            dict_id = zstandard.get_frame_parameters(value).dict_id
+        except (TypeError, zstandard.ZstdError):
+            # assume raw json
+            return value.decode() if isinstance(value, bytes) else value
+
+        if not dict_id:
+            return zstandard.decompress(value).decode()
+
+        dictionary = self._get_dictionary(dict_id)
+        if dictionary is None:
+            # The config is treated as missing and gets recomputed.
+            metrics.incr("relay.projectconfig_cache.missing_dictionary")
+            raise MissingDictionary(dict_id)
+        return zstandard.ZstdDecompressor(dict_data=dictionary).decompress(value).decode()
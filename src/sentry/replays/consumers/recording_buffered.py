@@ -65,6 +65,7 @@ from sentry.replays.usecases.ingest import decompress, process_headers, track_in
 from sentry.replays.usecases.ingest.dom_index import (
     ReplayActionsEvent,
     emit_replay_actions,
+    iter_segment_events,
     parse_replay_actions,
 )
 from sentry.utils import json, metrics
@@ -273,7 +274,7 @@ def process_message(buffer: RecordingBuffer, message: bytes) -> None:
             decompressed_segment = decompress(recording_data)
 
         with sentry_sdk.start_span(op="replays.consumer.recording.json_loads_segment"):
-            parsed_recording_data = json.loads(decompressed_segment)
+            parsed_recording_data = list(iter_segment_events(decompressed_segment))
             parsed_replay_event = (
                 json.loads(cast_payload_bytes(decoded_message["replay_event"]))
                 if decoded_message.get("replay_event")
@@ -18,7 +18,11 @@ from sentry.replays.lib.storage import (
     make_video_filename,
     storage_kv,
 )
-from sentry.replays.usecases.ingest.dom_index import log_canvas_size, parse_and_emit_replay_actions
+from sentry.replays.usecases.ingest.dom_index import (
+    iter_segment_events,
+    log_canvas_size,
+    parse_and_emit_replay_actions,
+)
 from sentry.signals import first_replay_received
 from sentry.utils import json, metrics
 from sentry.utils.outcomes import Outcome, track_outcome
@@ -214,7 +218,7 @@ def recording_post_processor(
     try:
         with metrics.timer("replays.usecases.ingest.decompress_and_parse"):
             decompressed_segment = decompress(segment_bytes)
-            parsed_segment_data = json.loads(decompressed_segment)
+            parsed_segment_data = list(iter_segment_events(decompressed_segment))
             parsed_replay_event = json.loads(replay_event_bytes) if replay_event_bytes else None
             _report_size_metrics(len(segment_bytes), len(decompressed_segment))
 
@@ -2,9 +2,10 @@ from __future__ import annotations
 
 import logging
 import random
+import re
 import time
 import uuid
-from collections.abc import Generator
+from collections.abc import Generator, Iterator
 from hashlib import md5
 from typing import Any, Literal, TypedDict
 
@@ -19,6 +20,24 @@ logger = logging.getLogger("sentry.replays")
 
 EVENT_LIMIT = 20
 
+# Skipping over snapshots without decoding them. Possessive quantifiers keep the
+# patterns from backtracking, strings are consumed whole so brackets within them
+# are ignored.
+_STRING = rb'"[^"\\]*+(?:\\.[^"\\]*+)*+"'
+_CONTENT = rb'[^"\[\]{}]*+(?:' + _STRING + rb'[^"\[\]{}]*+)*+'
+# Containers nested at most `_CONTAINER_DEPTH` levels deep are skipped with a
+# single match, deeper ones are walked one bracket at a time.
+_CONTAINER_DEPTH = 16
+_CONTAINER = rb"[\[{]" + _CONTENT + rb"[\]}]"
+for _ in range(_CONTAINER_DEPTH):
+    _CONTAINER = rb"[\[{]" + _CONTENT + rb"(?:" + _CONTAINER + _CONTENT + rb")*+[\]}]"
+_NEXT_TOKEN = re.compile(_CONTENT + rb"(?:(" + _CONTAINER + rb")|([\[\]{}]))", re.S)
+# rrweb events start with their type, incremental snapshots continue with their source.
+_EVENT_HEADER = re.compile(
+    rb'\{\s*"type"\s*:\s*(\d+)\s*(?:,\s*"data"\s*:\s*\{\s*"source"\s*:\s*(\d+))?'
+)
+_WHITESPACE = re.compile(rb"\s*")
+
 replay_publisher: KafkaPublisher | None = None
 
 ReplayActionsEventPayloadClick = TypedDict(
@@ -50,7 +69,7 @@ class ReplayActionsEventPayload(TypedDict):
 
 
 class ReplayActionsEvent(TypedDict):
-    payload: list[int]
+    payload: bytes
     project_id: int
     replay_id: str
     retention_days: int
@@ -75,7 +94,10 @@ def parse_and_emit_replay_actions(
 
 def emit_replay_actions(action: ReplayActionsEvent) -> None:
     publisher = _initialize_publisher()
-    publisher.publish("ingest-replay-events", json.dumps(action))
+    # The ingest-replay-events schema expects the payload as an array of bytes.
+    publisher.publish(
+        "ingest-replay-events", json.dumps({**action, "payload": list(action["payload"])})
+    )
 
 
 def parse_replay_actions(
@@ -106,7 +128,7 @@ def create_replay_actions_event(
         "replay_id": replay_id,
         "project_id": project_id,
         "retention_days": retention_days,
-        "payload": list(json.dumps(payload).encode()),
+        "payload": json.dumps(payload).encode(),
     }
 
 
@@ -121,6 +143,79 @@ def create_replay_actions_payload(
     }
 
 
+def iter_segment_events(segment: bytes) -> Iterator[dict[str, Any]]:
+    """Yield the events of a decompressed recording segment that are relevant to
+    `get_user_actions` and `log_canvas_size`.
+
+    Snapshots make up most of a segment and are never looked at, so events are
+    only located in the raw bytes and decoded if their type could be of
+    interest. Events whose type can not be determined cheaply are always
+    decoded.
+
+    This keeps snapshots from being materialized as object trees, but it is not
+    reliably faster than decoding the whole segment. Snapshots of DOM trees
+    nested deeper than `_CONTAINER_DEPTH` are walked one bracket at a time and
+    take longer to skip than to decode.
+    """
+    end = len(segment)
+    pos = _WHITESPACE.match(segment).end()
+    if segment[pos : pos + 1] != b"[":
+        raise ValueError("Recording segment is not a list of events.")
+    pos = _WHITESPACE.match(segment, pos + 1).end()
+    if segment[pos : pos + 1] == b"]":
+        return
+
+    while pos < end:
+        if segment[pos : pos + 1] != b"{":
+            raise ValueError("Recording segment contains an invalid event.")
+
+        event_end = _find_object_end(segment, pos)
+        if _is_interesting_event(segment, pos):
+            yield json.loads(segment[pos:event_end], skip_trace=True)
+
+        pos = _WHITESPACE.match(segment, event_end).end()
+        separator = segment[pos : pos + 1]
+        pos = _WHITESPACE.match(segment, pos + 1).end()
+        if separator == b"]":
+            return
+        elif separator != b",":
+            raise ValueError("Recording segment is not a list of events.")
+
+    raise ValueError("Recording segment is truncated.")
+
+
+def _find_object_end(segment: bytes, pos: int) -> int:
+    depth = 0
+    while True:
+        match = _NEXT_TOKEN.match(segment, pos)
+        if match is None:
+            raise ValueError("Recording segment is truncated.")
+
+        pos = match.end()
+        bracket = match.group(2)
+        if bracket is None:
+            # A complete container was skipped.
+            if depth == 0:
+                return pos
+        elif bracket in (b"{", b"["):
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                return pos
+
+
+def _is_interesting_event(segment: bytes, pos: int) -> bool:
+    header = _EVENT_HEADER.match(segment, pos)
+    if header is None:
+        return True
+
+    event_type = int(header.group(1))
+    if event_type == 3:
+        return header.group(2) is None or int(header.group(2)) == 9
+    return event_type == 5
+
+
 def log_canvas_size(
     org_id: int,
     project_id: int,
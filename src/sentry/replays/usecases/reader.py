@@ -1,13 +1,15 @@
 from __future__ import annotations
 
-import functools
+import threading
 import uuid
 import zlib
+from collections import deque
 from collections.abc import Iterator
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
 
 import sentry_sdk
+from cachetools import TTLCache
 from django.conf import settings
 from django.db.models import Prefetch
 from sentry_sdk.tracing import Span
@@ -35,6 +37,7 @@ from sentry.replays.lib.storage import (
     storage_kv,
 )
 from sentry.replays.models import ReplayRecordingSegment
+from sentry.utils import metrics
 from sentry.utils.snuba import raw_snql_query
 
 # METADATA QUERY BEHAVIOR.
@@ -250,37 +253,94 @@ def segment_row_to_storage_meta(
 
 # BLOB DOWNLOAD BEHAVIOR.
 
+# Downloads are shared by all requests of a process.
+DOWNLOAD_WORKERS = 10
+# Number of segments a request downloads ahead of the one it is streaming.
+DOWNLOAD_PREFETCH = 4
+# Maximum size of the decompressed chunks a segment is streamed in.
+DECOMPRESS_CHUNK_SIZE = 16 * 1024
+
+# Decompressed segments of recently viewed replays. The cache is bounded by the size of
+# the segments it holds, larger segments are never cached.
+SEGMENT_CACHE_SIZE = 64 * 1024 * 1024
+SEGMENT_CACHE_MAX_ITEM_SIZE = 4 * 1024 * 1024
+SEGMENT_CACHE_TTL = 5 * 60
+
+_download_pool = ThreadPoolExecutor(
+    max_workers=DOWNLOAD_WORKERS, thread_name_prefix="replay-download"
+)
+_segment_cache: TTLCache[tuple[int, str, int], bytes] = TTLCache(
+    SEGMENT_CACHE_SIZE, SEGMENT_CACHE_TTL, getsizeof=len
+)
+_segment_cache_lock = threading.Lock()
+
 
 def download_video(segment: RecordingSegmentStorageMeta) -> bytes | None:
     return storage_kv.get(make_video_filename(segment))
 
 
 def download_segments(segments: list[RecordingSegmentStorageMeta]) -> Iterator[bytes]:
-    """Download segment data from remote storage."""
+    """Download segment data from remote storage.
+
+    Segments are streamed in order as a JSON array. Downloads run on the shared download pool
+    and at most `DOWNLOAD_PREFETCH` segments are fetched ahead of the one being streamed, which
+    is decompressed incrementally.
+    """
 
     # start a sentry transaction to pass to the thread pool workers
     with sentry_sdk.start_span(op="download_segments", description="thread_pool") as span:
-        download_segment_with_fixed_args = functools.partial(
-            download_segment,
-            span=span,
-        )
         current_hub = sentry_sdk.Hub.current
+        pending: deque[tuple[RecordingSegmentStorageMeta, bytes | None, Future | None]] = deque()
+        remaining = iter(segments)
+
+        def prefetch() -> None:
+            for segment in remaining:
+                cached = _get_cached_segment(segment)
+                if cached is None:
+                    pending.append(
+                        (
+                            segment,
+                            None,
+                            _download_pool.submit(
+                                _download_compressed_segment_in_hub, current_hub, segment, span
+                            ),
+                        )
+                    )
+                else:
+                    pending.append((segment, cached, None))
 
-        yield b"["
-        # Map all of the segments to a worker process for download.
-        with ThreadPoolExecutor(max_workers=10) as exe:
-            with sentry_sdk.Hub(current_hub):
-                results = exe.map(download_segment_with_fixed_args, segments)
+                if len(pending) >= DOWNLOAD_PREFETCH:
+                    return
 
-            for i, result in enumerate(results):
-                if result is None:
-                    yield b"[]"
-                else:
-                    yield result
+        try:
+            yield b"["
+            prefetch()
+            first = True
+            while pending:
+                segment, cached, future = pending.popleft()
+                prefetch()
 
-                if i < len(segments) - 1:
+                if not first:
                     yield b","
-        yield b"]"
+                first = False
+
+                if cached is not None:
+                    yield cached
+                    continue
+
+                assert future is not None
+                compressed = future.result()
+                if compressed is None:
+                    yield b"[]"
+                    continue
+
+                yield from _iter_decompressed_and_cache(segment, compressed)
+            yield b"]"
+        finally:
+            # The response may be abandoned before all segments were streamed.
+            for _, _, future in pending:
+                if future is not None:
+                    future.cancel()
 
 
 def download_segment(
@@ -288,6 +348,29 @@ def download_segment(
     span: Span,
 ) -> bytes | None:
     """Return the segment blob data."""
+    cached = _get_cached_segment(segment)
+    if cached is not None:
+        return cached
+
+    result = download_compressed_segment(segment, span)
+    if result is None:
+        return None
+
+    with sentry_sdk.start_span(
+        op="download_segment",
+        description="decompress",
+    ):
+        decompressed = decompress(result)
+
+    _set_cached_segment(segment, decompressed)
+    return decompressed
+
+
+def download_compressed_segment(
+    segment: RecordingSegmentStorageMeta,
+    span: Span,
+) -> bytes | None:
+    """Return the segment blob data as it was stored."""
     with span.start_child(
         op="download_segment",
         description="thread_task",
@@ -297,15 +380,77 @@ def download_segment(
             op="download_segment",
             description="download",
         ):
-            result = driver.get(segment)
-        if result is None:
-            return None
+            return driver.get(segment)
 
-        with sentry_sdk.start_span(
-            op="download_segment",
-            description="decompress",
-        ):
-            return decompress(result)
+
+def _download_compressed_segment_in_hub(
+    hub: sentry_sdk.Hub,
+    segment: RecordingSegmentStorageMeta,
+    span: Span,
+) -> bytes | None:
+    # Pool workers are shared between requests. Keep spans and errors attached to the request
+    # that submitted the download.
+    with sentry_sdk.Hub(hub):
+        return download_compressed_segment(segment, span)
+
+
+def _get_segment_cache_key(segment: RecordingSegmentStorageMeta) -> tuple[int, str, int]:
+    return (segment.project_id, segment.replay_id, segment.segment_id)
+
+
+def _get_cached_segment(segment: RecordingSegmentStorageMeta) -> bytes | None:
+    with _segment_cache_lock:
+        result = _segment_cache.get(_get_segment_cache_key(segment))
+
+    metrics.incr("replays.usecases.reader.segment_cache", tags={"hit": result is not None})
+    return result
+
+
+def _set_cached_segment(segment: RecordingSegmentStorageMeta, data: bytes) -> None:
+    if len(data) > SEGMENT_CACHE_MAX_ITEM_SIZE:
+        return
+
+    with _segment_cache_lock:
+        _segment_cache[_get_segment_cache_key(segment)] = data
+
+
+def _iter_decompressed_and_cache(
+    segment: RecordingSegmentStorageMeta, buffer: bytes
+) -> Iterator[bytes]:
+    chunks: list[bytes] | None = []
+    size = 0
+    for chunk in iter_decompressed(buffer):
+        if chunks is not None:
+            size += len(chunk)
+            if size > SEGMENT_CACHE_MAX_ITEM_SIZE:
+                chunks = None
+            else:
+                chunks.append(chunk)
+        yield chunk
+
+    if chunks is not None:
+        _set_cached_segment(segment, b"".join(chunks))
+
+
+def iter_decompressed(buffer: bytes) -> Iterator[bytes]:
+    """Yield the decompressed output in chunks, see `decompress`."""
+    if buffer.startswith(b"["):
+        yield buffer
+        return
+
+    decompressor = zlib.decompressobj(zlib.MAX_WBITS | 32)
+    data = buffer
+    while data and not decompressor.eof:
+        # Bound the output rather than the input. A small compressed chunk can expand to a
+        # large one.
+        chunk = decompressor.decompress(data, DECOMPRESS_CHUNK_SIZE)
+        if chunk:
+            yield chunk
+        data = decompressor.unconsumed_tail
+
+    chunk = decompressor.flush()
+    if chunk:
+        yield chunk
 
 
 def decompress(buffer: bytes) -> bytes:
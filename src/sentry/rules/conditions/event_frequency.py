@@ -4,9 +4,9 @@ import abc
 import contextlib
 import logging
 import re
-from collections.abc import Mapping
+from collections.abc import Mapping, Sequence
 from datetime import datetime, timedelta
-from typing import Any
+from typing import TYPE_CHECKING, Any, ClassVar
 
 from django import forms
 from django.core.cache import cache
@@ -26,6 +26,9 @@ from sentry.types.condition_activity import (
 from sentry.utils import metrics
 from sentry.utils.snuba import options_override
 
+if TYPE_CHECKING:
+    from sentry.models.group import Group
+
 standard_intervals = {
     "1m": ("one minute", timedelta(minutes=1)),
     "5m": ("5 minutes", timedelta(minutes=5)),
@@ -95,9 +98,12 @@ class EventFrequencyForm(forms.Form):
 class BaseEventFrequencyCondition(EventCondition, abc.ABC):
     intervals = standard_intervals
     form_cls = EventFrequencyForm
+    # Whether `batch_query_hook` is implemented.
+    supports_batch_queries: ClassVar[bool] = False
 
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         self.tsdb = kwargs.pop("tsdb", tsdb)
+        self.batch: EventFrequencyQueryBatch | None = kwargs.pop("batch", None)
         self.form_fields = {
             "value": {"type": "number", "placeholder": 100},
             "interval": {
@@ -186,7 +192,42 @@ class BaseEventFrequencyCondition(EventCondition, abc.ABC):
         """ """
         raise NotImplementedError  # subclass must implement
 
+    def batch_query_hook(
+        self, groups: Sequence[Group], start: datetime, end: datetime, environment_id: str
+    ) -> Mapping[int, int]:
+        """
+        Same as `query_hook`, for many groups of the same project and issue
+        category at once. Returns the count of every group by group id.
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    def get_jitter_value(groups: Sequence[Group]) -> int | None:
+        """
+        Queries for a single group are jittered by its id, which spreads the
+        bucket boundaries of different groups over time. A query for many
+        groups can only have one alignment and is not jittered. Its counts
+        can then differ from the counts of the groups queried one at a time,
+        by the events in the partial buckets at either end of the window.
+        """
+        return groups[0].id if len(groups) == 1 else None
+
+    def get_query_windows(self, interval: str, end: datetime) -> list[tuple[datetime, datetime]]:
+        """
+        Returns the `(start, end)` of the window the condition counts events
+        in, followed by the window it is compared to if comparing by percent.
+        """
+        _, duration = self.intervals[interval]
+        windows = [(end - duration, end)]
+        if self.get_option("comparisonType", COMPARISON_TYPE_COUNT) == COMPARISON_TYPE_PERCENT:
+            comparison_end = end - comparison_intervals[self.get_option("comparisonInterval")][1]
+            windows.append((comparison_end - duration, comparison_end))
+        return windows
+
     def get_rate(self, event: GroupEvent, interval: str, environment_id: str) -> int:
+        if self.batch is not None and self.supports_batch_queries:
+            return self.batch.get_rate(self, event.group, interval, environment_id)
+
         _, duration = self.intervals[interval]
         end = timezone.now()
         # For conditions with interval >= 1 hour we don't need to worry about read your writes
@@ -230,22 +271,28 @@ class BaseEventFrequencyCondition(EventCondition, abc.ABC):
 class EventFrequencyCondition(BaseEventFrequencyCondition):
     id = "sentry.rules.conditions.event_frequency.EventFrequencyCondition"
     label = "The issue is seen more than {value} times in {interval}"
+    supports_batch_queries = True
 
     def query_hook(
         self, event: GroupEvent, start: datetime, end: datetime, environment_id: str
     ) -> int:
+        return self.batch_query_hook([event.group], start, end, environment_id)[event.group_id]
+
+    def batch_query_hook(
+        self, groups: Sequence[Group], start: datetime, end: datetime, environment_id: str
+    ) -> Mapping[int, int]:
         sums: Mapping[int, int] = self.tsdb.get_sums(
-            model=get_issue_tsdb_group_model(event.group.issue_category),
-            keys=[event.group_id],
+            model=get_issue_tsdb_group_model(groups[0].issue_category),
+            keys=[group.id for group in groups],
             start=start,
             end=end,
             environment_id=environment_id,
             use_cache=True,
-            jitter_value=event.group_id,
-            tenant_ids={"organization_id": event.group.project.organization_id},
+            jitter_value=self.get_jitter_value(groups),
+            tenant_ids={"organization_id": groups[0].project.organization_id},
             referrer_suffix="alert_event_frequency",
         )
-        return sums[event.group_id]
+        return sums
 
     def get_preview_aggregate(self) -> tuple[str, str]:
         return "count", "roundedTime"
@@ -254,22 +301,28 @@ class EventFrequencyCondition(BaseEventFrequencyCondition):
 class EventUniqueUserFrequencyCondition(BaseEventFrequencyCondition):
     id = "sentry.rules.conditions.event_frequency.EventUniqueUserFrequencyCondition"
     label = "The issue is seen by more than {value} users in {interval}"
+    supports_batch_queries = True
 
     def query_hook(
         self, event: GroupEvent, start: datetime, end: datetime, environment_id: str
     ) -> int:
+        return self.batch_query_hook([event.group], start, end, environment_id)[event.group_id]
+
+    def batch_query_hook(
+        self, groups: Sequence[Group], start: datetime, end: datetime, environment_id: str
+    ) -> Mapping[int, int]:
         totals: Mapping[int, int] = self.tsdb.get_distinct_counts_totals(
-            model=get_issue_tsdb_user_group_model(event.group.issue_category),
-            keys=[event.group_id],
+            model=get_issue_tsdb_user_group_model(groups[0].issue_category),
+            keys=[group.id for group in groups],
             start=start,
             end=end,
             environment_id=environment_id,
             use_cache=True,
-            jitter_value=event.group_id,
-            tenant_ids={"organization_id": event.group.project.organization_id},
+            jitter_value=self.get_jitter_value(groups),
+            tenant_ids={"organization_id": groups[0].project.organization_id},
             referrer_suffix="alert_event_uniq_user_frequency",
         )
-        return totals[event.group_id]
+        return totals
 
     def get_preview_aggregate(self) -> tuple[str, str]:
         return "uniq", "user"
@@ -399,6 +452,107 @@ class EventFrequencyPercentCondition(BaseEventFrequencyCondition):
         raise NotImplementedError
 
 
+# `(condition class, issue category, environment id, start, end)`
+BatchQueryKey = tuple[type[BaseEventFrequencyCondition], Any, Any, datetime, datetime]
+
+
+class EventFrequencyQueryBatch:
+    """
+    Fetches the counts frequency conditions compare against for many rules
+    and groups at once.
+
+    Conditions are registered with `add` once it is known that they will be
+    evaluated. The first `get_rate` then fetches the counts of all pending
+    conditions, with a single query per condition type, issue category,
+    environment and window, no matter how many rules and groups share it.
+
+    All windows end at the time the batch was created, like they would end
+    at the current time when queried one condition at a time. A query for a
+    single group, the usual case when processing an event, is the same as
+    the one made without a batch. See `get_jitter_value` for queries of many
+    groups.
+    """
+
+    def __init__(self, now: datetime | None = None) -> None:
+        self.now = now or timezone.now()
+        self._pending: dict[
+            BatchQueryKey, tuple[BaseEventFrequencyCondition, dict[int, Group]]
+        ] = {}
+        self._results: dict[tuple[BatchQueryKey, int], int] = {}
+
+    def _get_query_keys(
+        self,
+        condition: BaseEventFrequencyCondition,
+        group: Group,
+        interval: str,
+        environment_id: Any,
+    ) -> list[BatchQueryKey]:
+        return [
+            (type(condition), group.issue_category, environment_id, start, end)
+            for start, end in condition.get_query_windows(interval, self.now)
+        ]
+
+    def _add_queries(
+        self, condition: BaseEventFrequencyCondition, group: Group, keys: list[BatchQueryKey]
+    ) -> None:
+        for key in keys:
+            if (key, group.id) not in self._results:
+                self._pending.setdefault(key, (condition, {}))[1][group.id] = group
+
+    def add(
+        self, condition: BaseEventFrequencyCondition, group: Group, environment_id: Any
+    ) -> None:
+        """
+        Register `condition` to be evaluated for `group`.
+        """
+        interval, _ = condition._get_options()
+        if not condition.supports_batch_queries or interval not in condition.intervals:
+            return
+        self._add_queries(
+            condition, group, self._get_query_keys(condition, group, interval, environment_id)
+        )
+
+    def get_rate(
+        self,
+        condition: BaseEventFrequencyCondition,
+        group: Group,
+        interval: str,
+        environment_id: Any,
+    ) -> int:
+        keys = self._get_query_keys(condition, group, interval, environment_id)
+        self._add_queries(condition, group, keys)
+        self.fetch()
+
+        result, *comparison = (self._results[key, group.id] for key in keys)
+        if comparison:
+            result = percent_increase(result, comparison[0])
+        return result
+
+    def fetch(self) -> None:
+        """
+        Fetch the counts of all pending conditions.
+        """
+        pending, self._pending = self._pending, {}
+        for key, (condition, groups) in pending.items():
+            condition_cls, _, environment_id, start, end = key
+            tags = {"condition": re.sub("(?!^)([A-Z]+)", r"_\1", condition_cls.__name__).lower()}
+
+            # For conditions with interval >= 1 hour we don't need to worry about read your writes
+            # consistency. Disable it so that we can scale to more nodes.
+            option_override_cm: contextlib.AbstractContextManager[object] = contextlib.nullcontext()
+            if end - start >= timedelta(hours=1):
+                option_override_cm = options_override({"consistent": False})
+            with option_override_cm:
+                result = condition.batch_query_hook(
+                    list(groups.values()), start, end, environment_id
+                )
+            metrics.incr("rules.conditions.queried_snuba", tags=tags)
+            metrics.distribution("rules.conditions.frequency_batch.size", len(groups), tags=tags)
+
+            for group_id in groups:
+                self._results[key, group_id] = result.get(group_id, 0)
+
+
 def bucket_count(start: datetime, end: datetime, buckets: dict[datetime, int]) -> int:
     rounded_end = round_to_five_minute(end)
     rounded_start = round_to_five_minute(start)
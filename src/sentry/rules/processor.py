@@ -1,9 +1,11 @@
 from __future__ import annotations
 
+import functools
+import itertools
 import logging
 import uuid
 from collections.abc import Callable, Collection, Mapping, MutableMapping, Sequence
-from datetime import timedelta
+from datetime import datetime, timedelta
 from random import randrange
 from typing import Any
 
@@ -19,6 +21,10 @@ from sentry.models.rulesnooze import RuleSnooze
 from sentry.rules import EventState, history, rules
 from sentry.rules.actions.base import instantiate_action
 from sentry.rules.conditions.base import EventCondition
+from sentry.rules.conditions.event_frequency import (
+    BaseEventFrequencyCondition,
+    EventFrequencyQueryBatch,
+)
 from sentry.rules.filters.base import EventFilter
 from sentry.types.rules import RuleFuture
 from sentry.utils.hashlib import hash_values
@@ -55,6 +61,7 @@ class RuleProcessor:
         is_new_group_environment: bool,
         has_reappeared: bool,
         has_escalated: bool = False,
+        frequency_batch: EventFrequencyQueryBatch | None = None,
     ) -> None:
         self.event = event
         self.group = event.group
@@ -65,6 +72,7 @@ class RuleProcessor:
         self.is_new_group_environment = is_new_group_environment
         self.has_reappeared = has_reappeared
         self.has_escalated = has_escalated
+        self.frequency_batch = frequency_batch
 
         self.grouped_futures: MutableMapping[
             str, tuple[Callable[[GroupEvent, Sequence[RuleFuture]], None], list[RuleFuture]]
@@ -144,7 +152,13 @@ class RuleProcessor:
             self.logger.warning("Unregistered condition %r", condition["id"])
             return None
 
-        condition_inst = condition_cls(self.project, data=condition, rule=rule)
+        kwargs = {}
+        if self.frequency_batch is not None and issubclass(
+            condition_cls, BaseEventFrequencyCondition
+        ):
+            kwargs["batch"] = self.frequency_batch
+
+        condition_inst = condition_cls(self.project, data=condition, rule=rule, **kwargs)
         if not isinstance(condition_inst, (EventCondition, EventFilter)):
             self.logger.warning("Unregistered condition %r", condition["id"])
             return None
@@ -174,12 +188,41 @@ class RuleProcessor:
             has_escalated=self.has_escalated,
         )
 
-    def apply_rule(self, rule: Rule, status: GroupRuleStatus) -> None:
+    def add_frequency_conditions(
+        self, rule: Rule, conditions: Sequence[Mapping[str, Any]], state: EventState
+    ) -> None:
+        """
+        Register the frequency conditions among `conditions` with
+        `self.frequency_batch`, so that their counts are fetched together
+        with those of other rules when the first of them is evaluated.
+        """
+        assert self.frequency_batch is not None
+        for condition in conditions:
+            condition_cls = rules.get(condition["id"])
+            if condition_cls is None or not issubclass(condition_cls, BaseEventFrequencyCondition):
+                continue
+
+            condition_inst = condition_cls(self.project, data=condition, rule=rule)
+            _, value = condition_inst._get_options()
+            # Mirrors `BaseEventFrequencyCondition.passes`, which does not
+            # query for new issues.
+            if value is None or (state.is_new and value > 1):
+                continue
+            self.frequency_batch.add(condition_inst, self.group, rule.environment_id)
+
+    def apply_rule(
+        self, rule: Rule, status: GroupRuleStatus, defer_slow_conditions: bool = False
+    ) -> Callable[[], None] | None:
         """
         If all conditions and filters pass, execute every action.
 
+        With `defer_slow_conditions`, slow conditions that still need to be
+        evaluated once the filters and fast conditions passed are registered
+        with `self.frequency_batch`, and a callback that evaluates them and
+        executes the actions is returned instead.
+
         :param rule: `Rule` object
-        :return: void
+        :return: the callback finishing the rule, if deferred
         """
         logging_details = {
             "rule_id": rule.id,
@@ -200,15 +243,15 @@ class RuleProcessor:
         try:
             environment = self.event.get_environment()
         except Environment.DoesNotExist:
-            return
+            return None
 
         if rule.environment_id is not None and environment.id != rule.environment_id:
-            return
+            return None
 
         now = timezone.now()
         freq_offset = now - timedelta(minutes=frequency)
         if status.last_active and status.last_active > freq_offset:
-            return
+            return None
 
         state = self.get_state()
 
@@ -229,20 +272,75 @@ class RuleProcessor:
         ):
             if not predicate_list:
                 continue
-            predicate_iter = (self.condition_matches(f, state, rule) for f in predicate_list)
             predicate_func = get_match_function(match)
-            if predicate_func:
-                if not predicate_func(predicate_iter):
-                    return
-            else:
+            if not predicate_func:
                 self.logger.error(
                     f"Unsupported {name}_match {match!r} for rule {rule.id}",
                     filter_match,
                     rule.id,
                     extra={**logging_details},
                 )
-                return
+                return None
+
+            slow_list = [f for f in predicate_list if name == "condition" and is_condition_slow(f)]
+            if not defer_slow_conditions or not slow_list:
+                predicate_iter = (self.condition_matches(f, state, rule) for f in predicate_list)
+                if not predicate_func(predicate_iter):
+                    return None
+                continue
+
+            # `all` stops at the first predicate that fails, `any` and `none`
+            # at the first one that passes.
+            stop_on = match != "all"
+            results: list[bool | None] = []
+            for f in predicate_list[: len(predicate_list) - len(slow_list)]:
+                results.append(self.condition_matches(f, state, rule))
+                if bool(results[-1]) is stop_on:
+                    break
+            else:
+                # The slow conditions decide, and must be the last predicates.
+                self.add_frequency_conditions(rule, slow_list, state)
+
+                return functools.partial(
+                    self.finish_rule,
+                    rule,
+                    status,
+                    state,
+                    predicate_func,
+                    results,
+                    slow_list,
+                    now,
+                    freq_offset,
+                )
+
+            if not predicate_func(results):
+                return None
 
+        self.fire_rule(rule, status, now, freq_offset)
+        return None
+
+    def finish_rule(
+        self,
+        rule: Rule,
+        status: GroupRuleStatus,
+        state: EventState,
+        predicate_func: Callable[..., bool],
+        results: list[bool | None],
+        slow_list: list[dict[str, Any]],
+        now: datetime,
+        freq_offset: datetime,
+    ) -> None:
+        """
+        Evaluate the slow conditions of a rule deferred by `apply_rule`, and
+        execute its actions if they pass.
+        """
+        slow_iter = (self.condition_matches(f, state, rule) for f in slow_list)
+        if predicate_func(itertools.chain(results, slow_iter)):
+            self.fire_rule(rule, status, now, freq_offset)
+
+    def fire_rule(
+        self, rule: Rule, status: GroupRuleStatus, now: datetime, freq_offset: datetime
+    ) -> None:
         updated = (
             GroupRuleStatus.objects.filter(id=status.id)
             .exclude(last_active__gt=freq_offset)
@@ -305,8 +403,17 @@ class RuleProcessor:
             "rule", flat=True
         )
         rule_statuses = self.bulk_get_rule_status(rules)
-        for rule in rules:
-            if rule.id not in snoozed_rules:
-                self.apply_rule(rule, rule_statuses[rule.id])
+        active_rules = [rule for rule in rules if rule.id not in snoozed_rules]
+        # With a frequency batch, the slow conditions of all rules that get
+        # that far are evaluated last, so their counts are fetched together.
+        deferred = []
+        for rule in active_rules:
+            finish_rule = self.apply_rule(
+                rule, rule_statuses[rule.id], defer_slow_conditions=self.frequency_batch is not None
+            )
+            if finish_rule is not None:
+                deferred.append(finish_rule)
+        for finish_rule in deferred:
+            finish_rule()
 
         return self.grouped_futures.values()
@@ -0,0 +1,23 @@
+-- Pop up to `count` keys from a pending buffer set, returning the buffered hash
+-- of every popped key and deleting it, all in one atomic step.
+-- The hashes must live on the same Redis node as the pending set.
+assert(#KEYS == 1, "provide exactly one pending key")
+assert(#ARGV == 1, "provide the maximum number of keys to pop")
+
+local pending_key = KEYS[1]
+local count = tonumber(ARGV[1])
+
+local keys = redis.call("ZRANGE", pending_key, 0, count - 1)
+if #keys == 0 then
+    return {}
+end
+
+local rv = {}
+for _, key in ipairs(keys) do
+    table.insert(rv, key)
+    table.insert(rv, redis.call("HGETALL", key))
+    redis.call("DEL", key)
+end
+redis.call("ZREM", pending_key, unpack(keys))
+
+return rv
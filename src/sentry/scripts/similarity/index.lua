@@ -607,27 +607,56 @@ end
 
 -- Command Parsing
 
+local function signature_argument_parser(configuration)
+    return object_argument_parser({
+        {"index", argument_parser(validate_value)},
+        {"frequencies", frequencies_argument_parser(configuration)},
+    })
+end
+
+local function record(configuration, key, signatures)
+    return table_imap(
+        signatures,
+        function (signature)
+            set_frequencies(configuration, signature.index, key, signature.frequencies)
+            for band, buckets in ipairs(signature.frequencies) do
+                for bucket in pairs(buckets) do
+                    get_bucket_membership_set(configuration, signature.index, band, bucket):add(key)
+                end
+            end
+        end
+    )
+end
+
 local commands = {
     RECORD = function (configuration, cursor, arguments)
         local cursor, key, signatures = multiple_argument_parser(
             argument_parser(validate_value),
-            variadic_argument_parser(
-                object_argument_parser({
-                    {"index", argument_parser(validate_value)},
-                    {"frequencies", frequencies_argument_parser(configuration)},
-                })
-            )
+            variadic_argument_parser(signature_argument_parser(configuration))
+        )(cursor, arguments)
+
+        return record(configuration, key, signatures)
+    end,
+    RECORD_MULTI = function (configuration, cursor, arguments)
+        -- Records the signatures of many items, each with its own timestamp
+        -- which takes the place of the configured one.
+        local cursor, entries = variadic_argument_parser(
+            object_argument_parser({
+                {"key", argument_parser(validate_value)},
+                {"timestamp", argument_parser(validate_number)},
+                {"signatures", repeated_argument_parser(signature_argument_parser(configuration))},
+            })
         )(cursor, arguments)
 
         return table_imap(
-            signatures,
-            function (signature)
-                set_frequencies(configuration, signature.index, key, signature.frequencies)
-                for band, buckets in ipairs(signature.frequencies) do
-                    for bucket in pairs(buckets) do
-                        get_bucket_membership_set(configuration, signature.index, band, bucket):add(key)
-                    end
+            entries,
+            function (entry)
+                local entry_configuration = {}
+                for name, value in pairs(configuration) do
+                    entry_configuration[name] = value
                 end
+                entry_configuration.timestamp = entry.timestamp
+                record(entry_configuration, entry.key, entry.signatures)
             end
         )
     end,
@@ -0,0 +1,15 @@
+-- Append spans to a segment, setting the segment's TTL when the segment is
+-- opened by this call. Returns 1 if the segment did not exist before.
+assert(#KEYS == 1, "provide exactly one segment key")
+assert(#ARGV >= 2, "provide the TTL and at least one span")
+
+local segment_key = KEYS[1]
+local ttl = tonumber(ARGV[1])
+
+local length = redis.call("RPUSH", segment_key, unpack(ARGV, 2))
+if length == #ARGV - 1 then
+    redis.call("EXPIRE", segment_key, ttl)
+    return 1
+end
+
+return 0
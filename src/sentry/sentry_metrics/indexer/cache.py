@@ -2,8 +2,13 @@ from __future__ import annotations
 
 import logging
 import random
+import sys
+import threading
+import time
+from collections import OrderedDict
 from collections.abc import Collection, Iterable, Mapping, MutableMapping, Sequence
 from datetime import datetime, timedelta
+from typing import Any
 
 from django.conf import settings
 from django.core.cache import caches
@@ -33,6 +38,8 @@ _INDEXER_CACHE_RESOLVE_CACHE_REPLENISHMENT_METRIC = (
 _INDEXER_CACHE_DOUBLE_WRITE_METRIC = "sentry_metrics.indexer.memcache.double-write"
 _INDEXER_CACHE_DOUBLE_READ_METRIC = "sentry_metrics.indexer.memcache.new-schema-read"
 _INDEXER_CACHE_STALE_KEYS_METRIC = "sentry_metrics.indexer.memcache.stale-keys"
+_INDEXER_LOCAL_CACHE_METRIC = "sentry_metrics.indexer.local_cache"
+_INDEXER_LOCAL_CACHE_EVICTED_METRIC = "sentry_metrics.indexer.local_cache.evicted"
 
 # only used to compare to the older version of the PGIndexer
 _INDEXER_CACHE_FETCH_METRIC = "sentry_metrics.indexer.memcache.fetch"
@@ -43,21 +50,146 @@ NAMESPACED_READ_FEAT_FLAG = "sentry-metrics.indexer.read-new-cache-namespace"
 
 BULK_RECORD_CACHE_NAMESPACE = "br"
 RESOLVE_CACHE_NAMESPACE = "res"
+# Only used by the local cache, reverse lookups are not stored in the shared cache.
+REVERSE_RESOLVE_CACHE_NAMESPACE = "rev"
+
+# Default size limit of the local cache, see `LocalStringIndexerCache`.
+LOCAL_CACHE_MAX_BYTES = 32 * 1024 * 1024
+# Estimated memory used by a cache entry in addition to its key and value.
+_LOCAL_CACHE_ENTRY_OVERHEAD = 100
+
+
+def randomize_ttl(cache_ttl: int) -> int:
+    # introduce jitter in the cache_ttl so that when we have large
+    # amount of new keys written into the cache, they don't expire all at once
+    jitter = random.uniform(0, 0.25) * cache_ttl
+    return int(cache_ttl + jitter)
+
+
+class LocalStringIndexerCache:
+    """
+    A bounded in-process LRU cache, kept in front of the shared cache of
+    `StringIndexerCache`.
+
+    Entries expire after `ttl` seconds with the same jitter as the entries of
+    the shared cache. Once the estimated size of all entries exceeds
+    `max_bytes` the least recently used ones are evicted.
+    """
+
+    def __init__(self, ttl: int, max_bytes: int = LOCAL_CACHE_MAX_BYTES):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.size = 0
+
+        self._lock = threading.Lock()
+        # key -> (value, expiry, size)
+        self._entries: OrderedDict[str, tuple[Any, float, int]] = OrderedDict()
+
+    def get_many(self, keys: Iterable[str]) -> dict[str, Any]:
+        """
+        Returns the values of all keys that are cached, missing and expired
+        keys are left out.
+        """
+        now = time.monotonic()
+        rv = {}
+        misses = 0
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None or entry[1] <= now:
+                    if entry is not None:
+                        self._remove(key)
+                    misses += 1
+                    continue
+                self._entries.move_to_end(key)
+                rv[key] = entry[0]
+
+        metrics.incr(_INDEXER_LOCAL_CACHE_METRIC, tags={"cache_hit": "true"}, amount=len(rv))
+        metrics.incr(_INDEXER_LOCAL_CACHE_METRIC, tags={"cache_hit": "false"}, amount=misses)
+        return rv
+
+    def set_many(self, key_values: Mapping[str, Any]) -> None:
+        now = time.monotonic()
+        evicted = 0
+        with self._lock:
+            for key, value in key_values.items():
+                self._remove(key)
+                size = sys.getsizeof(key) + sys.getsizeof(value) + _LOCAL_CACHE_ENTRY_OVERHEAD
+                if size > self.max_bytes:
+                    continue
+                self._entries[key] = (value, now + randomize_ttl(self.ttl), size)
+                self.size += size
+
+            while self.size > self.max_bytes:
+                key = next(iter(self._entries))
+                self._remove(key)
+                evicted += 1
+
+        if evicted:
+            metrics.incr(_INDEXER_LOCAL_CACHE_EVICTED_METRIC, amount=evicted)
+
+    def delete_many(self, keys: Iterable[str]) -> None:
+        with self._lock:
+            for key in keys:
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry[2]
 
 
 class StringIndexerCache:
-    def __init__(self, cache_name: str, partition_key: str):
+    """
+    Caches the ids of strings in a Django cache.
+
+    :param local_cache_ttl: Enables a `LocalStringIndexerCache` in front of
+        the shared cache when set, with entries expiring after this many
+        seconds.
+    :param local_cache_max_bytes: Size limit of the local cache.
+    """
+
+    def __init__(
+        self,
+        cache_name: str,
+        partition_key: str,
+        local_cache_ttl: int = 0,
+        local_cache_max_bytes: int = LOCAL_CACHE_MAX_BYTES,
+    ):
         self.version = 1
         self.cache = caches[cache_name]
         self.partition_key = partition_key
+        self.local_cache = (
+            LocalStringIndexerCache(local_cache_ttl, local_cache_max_bytes)
+            if local_cache_ttl
+            else None
+        )
 
     @property
     def randomized_ttl(self) -> int:
-        # introduce jitter in the cache_ttl so that when we have large
-        # amount of new keys written into the cache, they don't expire all at once
-        cache_ttl = settings.SENTRY_METRICS_INDEXER_CACHE_TTL
-        jitter = random.uniform(0, 0.25) * cache_ttl
-        return int(cache_ttl + jitter)
+        return randomize_ttl(settings.SENTRY_METRICS_INDEXER_CACHE_TTL)
+
+    def get_local_many(self, namespace: str, keys: Iterable[str]) -> dict[str, Any]:
+        if self.local_cache is None:
+            return {}
+        rv = self.local_cache.get_many(f"{namespace}:{key}" for key in keys)
+        prefix = len(namespace) + 1
+        return {local_key[prefix:]: value for local_key, value in rv.items()}
+
+    def set_local_many(self, namespace: str, key_values: Mapping[str, Any]) -> None:
+        if self.local_cache is not None:
+            self.local_cache.set_many(
+                {f"{namespace}:{key}": value for key, value in key_values.items()}
+            )
+
+    def delete_local_many(self, namespace: str, keys: Iterable[str]) -> None:
+        if self.local_cache is not None:
+            self.local_cache.delete_many(f"{namespace}:{key}" for key in keys)
 
     def _make_cache_key(self, key: str) -> str:
         use_case_id, org_id, string = key.split(":", 2)
@@ -131,15 +263,25 @@ class StringIndexerCache:
         return int(result)
 
     def get(self, namespace: str, key: str) -> int | None:
+        local_result = self.get_local_many(namespace, [key])
+        if key in local_result:
+            return local_result[key]
+
         if options.get(NAMESPACED_READ_FEAT_FLAG):
             metrics.incr(_INDEXER_CACHE_DOUBLE_READ_METRIC)
             result = self.cache.get(
                 self._make_namespaced_cache_key(namespace, key), version=self.version
             )
-            return self._validate_result(result)
-        return self.cache.get(self._make_cache_key(key), version=self.version)
+            result = self._validate_result(result)
+        else:
+            result = self.cache.get(self._make_cache_key(key), version=self.version)
+
+        if result is not None:
+            self.set_local_many(namespace, {key: result})
+        return result
 
     def set(self, namespace: str, key: str, value: int) -> None:
+        self.set_local_many(namespace, {key: value})
         self.cache.set(
             key=self._make_cache_key(key),
             value=value,
@@ -156,6 +298,19 @@ class StringIndexerCache:
             )
 
     def get_many(self, namespace: str, keys: Iterable[str]) -> MutableMapping[str, int | None]:
+        if self.local_cache is None:
+            return self._get_many(namespace, keys)
+
+        keys = list(keys)
+        local_results = self.get_local_many(namespace, keys)
+        if len(local_results) == len(keys):
+            return local_results
+
+        results = self._get_many(namespace, [key for key in keys if key not in local_results])
+        self.set_local_many(namespace, {k: v for k, v in results.items() if v is not None})
+        return {key: local_results[key] if key in local_results else results[key] for key in keys}
+
+    def _get_many(self, namespace: str, keys: Iterable[str]) -> MutableMapping[str, int | None]:
         if options.get(NAMESPACED_READ_FEAT_FLAG):
             metrics.incr(_INDEXER_CACHE_DOUBLE_READ_METRIC)
             cache_keys = {self._make_namespaced_cache_key(namespace, key): key for key in keys}
@@ -176,6 +331,7 @@ class StringIndexerCache:
             return self._format_results(keys, results)
 
     def set_many(self, namespace: str, key_values: Mapping[str, int]) -> None:
+        self.set_local_many(namespace, key_values)
         cache_key_values = {self._make_cache_key(k): v for k, v in key_values.items()}
         self.cache.set_many(cache_key_values, timeout=self.randomized_ttl, version=self.version)
         if options.get(NAMESPACED_WRITE_FEAT_FLAG):
@@ -190,12 +346,14 @@ class StringIndexerCache:
             )
 
     def delete(self, namespace: str, key: str) -> None:
+        self.delete_local_many(namespace, [key])
         self.cache.delete(self._make_cache_key(key), version=self.version)
         if options.get(NAMESPACED_WRITE_FEAT_FLAG):
             metrics.incr(_INDEXER_CACHE_DOUBLE_WRITE_METRIC)
             self.cache.delete(self._make_namespaced_cache_key(namespace, key), version=self.version)
 
     def delete_many(self, namespace: str, keys: Sequence[str]) -> None:
+        self.delete_local_many(namespace, keys)
         self.cache.delete_many([self._make_cache_key(key) for key in keys], version=self.version)
         if options.get(NAMESPACED_WRITE_FEAT_FLAG):
             metrics.incr(_INDEXER_CACHE_DOUBLE_WRITE_METRIC)
@@ -298,12 +456,39 @@ class CachingIndexer(StringIndexer):
 
     @metric_path_key_compatible_rev_resolve
     def reverse_resolve(self, use_case_id: UseCaseID, org_id: int, id: int) -> str | None:
-        return self.indexer.reverse_resolve(use_case_id, org_id, id)
+        key = f"{use_case_id.value}:{org_id}:{id}"
+        result = self.cache.get_local_many(REVERSE_RESOLVE_CACHE_NAMESPACE, [key])
+        if key in result:
+            return result[key]
+
+        string = self.indexer.reverse_resolve(use_case_id, org_id, id)
+        if string is not None:
+            self.cache.set_local_many(REVERSE_RESOLVE_CACHE_NAMESPACE, {key: string})
+        return string
 
     def bulk_reverse_resolve(
         self, use_case_id: UseCaseID, org_id: int, ids: Collection[int]
     ) -> Mapping[int, str]:
-        return self.indexer.bulk_reverse_resolve(use_case_id, org_id, ids)
+        if self.cache.local_cache is None:
+            return self.indexer.bulk_reverse_resolve(use_case_id, org_id, ids)
+
+        keys = {f"{use_case_id.value}:{org_id}:{id}": id for id in ids}
+        results = {
+            keys[key]: string
+            for key, string in self.cache.get_local_many(
+                REVERSE_RESOLVE_CACHE_NAMESPACE, keys
+            ).items()
+        }
+        missing = [id for id in ids if id not in results]
+        if not missing:
+            return results
+
+        strings = self.indexer.bulk_reverse_resolve(use_case_id, org_id, missing)
+        self.cache.set_local_many(
+            REVERSE_RESOLVE_CACHE_NAMESPACE,
+            {f"{use_case_id.value}:{org_id}:{id}": string for id, string in strings.items()},
+        )
+        return {**results, **strings}
 
     def resolve_shared_org(self, string: str) -> int | None:
         raise NotImplementedError(
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+
+
+class BloomFilter:
+    """
+    A fixed size bloom filter of strings.
+
+    Membership tests never have false negatives, but report strings that were
+    never added as present with a probability depending on the number of
+    strings added. Once `capacity` strings have been added the filter starts
+    over empty, so the false positive rate stays bounded at the cost of
+    forgetting strings.
+    """
+
+    def __init__(self, capacity: int, num_bits: int, num_hashes: int) -> None:
+        assert capacity > 0
+        assert num_bits > 0
+        assert num_hashes > 0
+        self.capacity = capacity
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+
+        self._lock = threading.Lock()
+        self._bits = bytearray((num_bits + 7) // 8)
+        self._count = 0
+
+    def _positions(self, value: str) -> list[int]:
+        # Double hashing, see Kirsch and Mitzenmacher, "Less Hashing, Same Performance".
+        digest = hashlib.blake2b(value.encode("utf8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, value: str) -> None:
+        positions = self._positions(value)
+        with self._lock:
+            if self._count >= self.capacity:
+                self._bits = bytearray(len(self._bits))
+                self._count = 0
+            for position in positions:
+                self._bits[position >> 3] |= 1 << (position & 7)
+            self._count += 1
+
+    def __contains__(self, value: str) -> bool:
+        positions = self._positions(value)
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in positions)
+
+    def __len__(self) -> int:
+        return self._count
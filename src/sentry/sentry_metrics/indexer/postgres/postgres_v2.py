@@ -1,4 +1,5 @@
-from collections.abc import Collection, Mapping, Sequence
+from collections import defaultdict
+from collections.abc import Callable, Collection, Iterable, Iterator, Mapping
 from functools import reduce
 from operator import or_
 from time import sleep
@@ -6,10 +7,13 @@ from typing import Any
 
 import sentry_sdk
 from django.conf import settings
+from django.db import connections, router
 from django.db.models import Q
+from django.utils import timezone
 from psycopg2 import OperationalError
 from psycopg2.errorcodes import DEADLOCK_DETECTED
 
+from sentry import options
 from sentry.sentry_metrics.configuration import IndexerStorage, UseCaseKey, get_ingest_config
 from sentry.sentry_metrics.indexer.base import (
     FetchType,
@@ -23,7 +27,8 @@ from sentry.sentry_metrics.indexer.base import (
 )
 from sentry.sentry_metrics.indexer.cache import CachingIndexer, StringIndexerCache
 from sentry.sentry_metrics.indexer.limiters.writes import writes_limiter_factory
-from sentry.sentry_metrics.indexer.postgres.models import TABLE_MAPPING, BaseIndexer, IndexerTable
+from sentry.sentry_metrics.indexer.postgres.bloom import BloomFilter
+from sentry.sentry_metrics.indexer.postgres.models import TABLE_MAPPING, IndexerTable
 from sentry.sentry_metrics.indexer.strings import StaticStringIndexer
 from sentry.sentry_metrics.use_case_id_registry import METRIC_PATH_MAPPING, UseCaseID
 from sentry.utils import metrics
@@ -36,6 +41,19 @@ _INDEXER_DB_METRIC = "sentry_metrics.indexer.postgres"
 
 _PARTITION_KEY = "pg"
 
+# Strings this process has resolved, see `_bulk_record`. Roughly 2MiB with a
+# false positive rate below 0.1% at capacity.
+SEEN_STRINGS_CAPACITY = 1_000_000
+SEEN_STRINGS_BITS = 2**24
+SEEN_STRINGS_HASHES = 7
+# Number of strings the filter needs to have seen before it is used to skip
+# reads. Until then most unseen strings are not actually new.
+SEEN_STRINGS_WARMUP = 10_000
+
+Key = tuple[UseCaseID, OrgId, str]
+
+seen_strings = BloomFilter(SEEN_STRINGS_CAPACITY, SEEN_STRINGS_BITS, SEEN_STRINGS_HASHES)
+
 indexer_cache = StringIndexerCache(
     **settings.SENTRY_STRING_INDEXER_CACHE_OPTIONS, partition_key=_PARTITION_KEY
 )
@@ -77,13 +95,13 @@ class PGStringIndexerV2(StringIndexer):
             reduce(or_, conditions)
         )
 
-    def _bulk_create_with_retry(
-        self, table: IndexerTable, new_records: Sequence[BaseIndexer]
-    ) -> None:
+    def _insert_with_retry(
+        self, table: IndexerTable, metric_path_key: UseCaseKey, keys: UseCaseKeyCollection
+    ) -> list[UseCaseKeyResult]:
         """
         With multiple instances of the Postgres indexer running, we found that
         rather than direct insert conflicts we were actually observing deadlocks
-        on insert. Here we surround bulk_create with a catch for the deadlock error
+        on insert. Here we surround the insert with a catch for the deadlock error
         specifically so that we don't interrupt processing or raise an error for a
         fairly normal event.
         """
@@ -92,13 +110,9 @@ class PGStringIndexerV2(StringIndexer):
         last_seen_exception: BaseException | None = None
 
         with metrics.timer("sentry_metrics.indexer.pg_bulk_create"):
-            # We use `ignore_conflicts=True` here to avoid race conditions where metric indexer
-            # records might have be created between when we queried in `bulk_record` and the
-            # attempt to create the rows down below.
             while retry_count + 1 < settings.SENTRY_POSTGRES_INDEXER_RETRY_COUNT:
                 try:
-                    table.objects.bulk_create(new_records, ignore_conflicts=True)
-                    return
+                    return self._insert(table, metric_path_key, keys)
                 except OperationalError as e:
                     sentry_sdk.capture_message(
                         f"retryable deadlock exception encountered; pgcode={e.pgcode}, pgerror={e.pgerror}"
@@ -110,54 +124,140 @@ class PGStringIndexerV2(StringIndexer):
                         last_seen_exception = e
                     else:
                         raise
-            # If we haven't returned after successful bulk create, we should re-raise the last
+            # If we haven't returned after successful insert, we should re-raise the last
             # seen exception
             assert isinstance(last_seen_exception, BaseException)
             raise last_seen_exception
 
+    def _insert(
+        self, table: IndexerTable, metric_path_key: UseCaseKey, keys: UseCaseKeyCollection
+    ) -> list[UseCaseKeyResult]:
+        """
+        Inserts all keys with a single statement and returns the records that
+        were created. We use `ON CONFLICT DO NOTHING` here to avoid race
+        conditions where records might have been created between when we
+        queried in `bulk_record` and the insert, those are not returned.
+        """
+        is_performance = metric_path_key is UseCaseKey.PERFORMANCE
+        columns = ["organization_id", "string", "date_added", "last_seen", "retention_days"]
+        if is_performance:
+            columns.append("use_case_id")
+
+        now = timezone.now()
+        retention_days = table._meta.get_field("retention_days").get_default()
+        # Rows are inserted in a stable order so that concurrent inserts take
+        # their locks in the same order.
+        rows = sorted(
+            (int(organization_id), string, now, now, retention_days)
+            + ((use_case_id.value,) if is_performance else ())
+            for use_case_id, organization_id, string in keys.as_tuples()
+        )
+
+        placeholder = "({})".format(", ".join(["%s"] * len(columns)))
+        query = "INSERT INTO {} ({}) VALUES {} ON CONFLICT DO NOTHING RETURNING {}".format(
+            table._meta.db_table,
+            ", ".join(columns),
+            ", ".join([placeholder] * len(rows)),
+            "id, organization_id, string" + (", use_case_id" if is_performance else ""),
+        )
+
+        with connections[router.db_for_write(table)].cursor() as cursor:
+            cursor.execute(query, [value for row in rows for value in row])
+            created = cursor.fetchall()
+
+        return [
+            UseCaseKeyResult(
+                use_case_id=UseCaseID(row[3]) if is_performance else UseCaseID.SESSIONS,
+                org_id=row[1],
+                string=row[2],
+                id=row[0],
+            )
+            for row in created
+        ]
+
+    def _read_records(
+        self, metric_path_key: UseCaseKey, keys: UseCaseKeyCollection
+    ) -> list[UseCaseKeyResult]:
+        if keys.size == 0:
+            return []
+
+        return [
+            UseCaseKeyResult(
+                use_case_id=(
+                    UseCaseID(db_obj.use_case_id)
+                    if metric_path_key is UseCaseKey.PERFORMANCE
+                    else UseCaseID.SESSIONS
+                ),
+                org_id=db_obj.organization_id,
+                string=db_obj.string,
+                id=db_obj.id,
+            )
+            for db_obj in self._get_db_records(keys)
+        ]
+
     def _bulk_record(
         self, strings: Mapping[UseCaseID, Mapping[OrgId, set[str]]]
     ) -> UseCaseKeyResults:
         metric_path_key = self._get_metric_path_key(strings.keys())
 
-        db_read_keys = UseCaseKeyCollection(strings)
+        # Strings this process has never seen before are most likely new. Once
+        # enough strings have been seen, those are inserted right away instead
+        # of being looked up first.
+        if (
+            options.get("sentry-metrics.indexer.postgres.skip-reads-for-unseen-strings")
+            and len(seen_strings) >= SEEN_STRINGS_WARMUP
+        ):
+            db_read_keys, unseen_keys = _partition_keys(
+                UseCaseKeyCollection(strings), lambda key: _get_seen_key(*key) in seen_strings
+            )
+        else:
+            db_read_keys, unseen_keys = UseCaseKeyCollection(strings), UseCaseKeyCollection({})
 
         db_read_key_results = UseCaseKeyResults()
         db_read_key_results.add_use_case_key_results(
-            [
-                UseCaseKeyResult(
-                    use_case_id=(
-                        UseCaseID(db_obj.use_case_id)
-                        if self._get_metric_path_key(strings.keys()) is UseCaseKey.PERFORMANCE
-                        else UseCaseID.SESSIONS
-                    ),
-                    org_id=db_obj.organization_id,
-                    string=db_obj.string,
-                    id=db_obj.id,
-                )
-                for db_obj in self._get_db_records(db_read_keys)
-            ],
-            FetchType.DB_READ,
+            self._read_records(metric_path_key, db_read_keys), FetchType.DB_READ
         )
         db_write_keys = db_read_key_results.get_unmapped_use_case_keys(db_read_keys)
+        _mark_seen(db_read_key_results)
 
-        metrics.incr(
-            _INDEXER_DB_METRIC,
-            tags={"db_hit": "true"},
-            amount=(db_read_keys.size - db_write_keys.size),
-        )
-        metrics.incr(
-            _INDEXER_DB_METRIC,
-            tags={"db_hit": "false"},
-            amount=db_write_keys.size,
-        )
+        config = get_ingest_config(metric_path_key, IndexerStorage.POSTGRES)
+        writes_limiter = writes_limiter_factory.get_ratelimiter(config)
+
+        if unseen_keys.size > 0:
+            # Strings that were not looked up might exist after all, for
+            # example after a restart. They must not use up write quota, or
+            # new strings would be rate limited in their place. They are only
+            # inserted right away if the limiter has room for all of them, and
+            # only the strings that are actually created then use up quota.
+            # Otherwise they are looked up first like any other string.
+            candidate_keys = _merge_keys(db_write_keys, unseen_keys)
+            if not writes_limiter.check_write_limits(candidate_keys).dropped_strings:
+                self._record_db_metrics(db_read_keys.size, candidate_keys.size, unseen_keys.size)
+                created_key_results, conflict_key_results = self._write(
+                    metric_path_key, candidate_keys
+                )
+                created_keys = _keys_from_tuples(_iter_mapped_keys(created_key_results))
+                if created_keys.size > 0:
+                    with writes_limiter.check_write_limits(created_keys):
+                        pass
+                return db_read_key_results.merge(created_key_results).merge(conflict_key_results)
+
+            unseen_key_results = UseCaseKeyResults()
+            unseen_key_results.add_use_case_key_results(
+                self._read_records(metric_path_key, unseen_keys), FetchType.DB_READ
+            )
+            _mark_seen(unseen_key_results)
+            db_read_key_results = db_read_key_results.merge(unseen_key_results)
+            db_read_keys = _merge_keys(db_read_keys, unseen_keys)
+            db_write_keys = _merge_keys(
+                db_write_keys, unseen_key_results.get_unmapped_use_case_keys(unseen_keys)
+            )
+
+        self._record_db_metrics(db_read_keys.size, db_write_keys.size, 0)
 
         if db_write_keys.size == 0:
             return db_read_key_results
 
-        config = get_ingest_config(metric_path_key, IndexerStorage.POSTGRES)
-        writes_limiter = writes_limiter_factory.get_ratelimiter(config)
-
         """
         Changes to writes_limiter will happen in a separate PR.
         For now, we are going to operate on the assumption that no custom use case ID
@@ -181,7 +281,6 @@ class PGStringIndexerV2(StringIndexer):
 
             rate_limited_key_results = UseCaseKeyResults()
             accepted_keys = writes_limiter_state.accepted_keys
-
             for dropped_string in writes_limiter_state.dropped_strings:
                 rate_limited_key_results.add_use_case_key_result(
                     use_case_key_result=dropped_string.use_case_key_result,
@@ -192,47 +291,56 @@ class PGStringIndexerV2(StringIndexer):
             if accepted_keys.size == 0:
                 return db_read_key_results.merge(rate_limited_key_results)
 
-            table = self._get_table_from_metric_path_key(metric_path_key)
+            created_key_results, conflict_key_results = self._write(metric_path_key, accepted_keys)
 
-            if metric_path_key is UseCaseKey.PERFORMANCE:
-                new_records = [
-                    table(
-                        organization_id=int(organization_id),
-                        string=string,
-                        use_case_id=use_case_id.value,
-                    )
-                    for use_case_id, organization_id, string in accepted_keys.as_tuples()
-                ]
-            else:
-                new_records = [
-                    table(
-                        organization_id=int(organization_id),
-                        string=string,
-                    )
-                    for _, organization_id, string in accepted_keys.as_tuples()
-                ]
+        return (
+            db_read_key_results.merge(created_key_results)
+            .merge(conflict_key_results)
+            .merge(rate_limited_key_results)
+        )
 
-            self._bulk_create_with_retry(table, new_records)
+    def _write(
+        self, metric_path_key: UseCaseKey, keys: UseCaseKeyCollection
+    ) -> tuple[UseCaseKeyResults, UseCaseKeyResults]:
+        """
+        Inserts `keys`. Returns the records that were created, and the records
+        that were created concurrently by someone else, which are looked up.
+        """
+        table = self._get_table_from_metric_path_key(metric_path_key)
+        created = self._insert_with_retry(table, metric_path_key, keys)
 
         db_write_key_results = UseCaseKeyResults()
-        db_write_key_results.add_use_case_key_results(
-            [
-                UseCaseKeyResult(
-                    use_case_id=(
-                        UseCaseID.SESSIONS
-                        if metric_path_key is UseCaseKey.RELEASE_HEALTH
-                        else UseCaseID(db_obj.use_case_id)
-                    ),
-                    org_id=db_obj.organization_id,
-                    string=db_obj.string,
-                    id=db_obj.id,
-                )
-                for db_obj in self._get_db_records(accepted_keys)
-            ],
-            fetch_type=FetchType.FIRST_SEEN,
+        db_write_key_results.add_use_case_key_results(created, fetch_type=FetchType.FIRST_SEEN)
+
+        conflict_key_results = UseCaseKeyResults()
+        conflict_key_results.add_use_case_key_results(
+            self._read_records(
+                metric_path_key, db_write_key_results.get_unmapped_use_case_keys(keys)
+            ),
+            fetch_type=FetchType.DB_READ,
         )
+        _mark_seen(db_write_key_results)
+        _mark_seen(conflict_key_results)
 
-        return db_read_key_results.merge(db_write_key_results).merge(rate_limited_key_results)
+        return db_write_key_results, conflict_key_results
+
+    @staticmethod
+    def _record_db_metrics(num_read: int, num_write: int, num_skipped: int) -> None:
+        metrics.incr(
+            _INDEXER_DB_METRIC,
+            tags={"db_hit": "true"},
+            amount=(num_read + num_skipped - num_write),
+        )
+        metrics.incr(
+            _INDEXER_DB_METRIC,
+            tags={"db_hit": "false"},
+            amount=num_write,
+        )
+        metrics.incr(
+            _INDEXER_DB_METRIC,
+            tags={"db_hit": "skipped"},
+            amount=num_skipped,
+        )
 
     def bulk_record(
         self, strings: Mapping[UseCaseID, Mapping[OrgId, set[str]]]
@@ -322,6 +430,44 @@ class PGStringIndexerV2(StringIndexer):
         )
 
 
+def _get_seen_key(use_case_id: UseCaseID, org_id: OrgId, string: str) -> str:
+    return f"{use_case_id.value}:{org_id}:{string}"
+
+
+def _iter_mapped_keys(results: UseCaseKeyResults) -> Iterator[Key]:
+    for use_case_id, org_results in results.get_mapped_results().items():
+        for org_id, strings in org_results.items():
+            for string, id in strings.items():
+                if id is not None:
+                    yield (use_case_id, org_id, string)
+
+
+def _mark_seen(results: UseCaseKeyResults) -> None:
+    for key in _iter_mapped_keys(results):
+        seen_strings.add(_get_seen_key(*key))
+
+
+def _keys_from_tuples(keys: Iterable[Key]) -> UseCaseKeyCollection:
+    mapping: dict[UseCaseID, dict[OrgId, set[str]]] = defaultdict(lambda: defaultdict(set))
+    for use_case_id, org_id, string in keys:
+        mapping[use_case_id][org_id].add(string)
+    return UseCaseKeyCollection(mapping)
+
+
+def _partition_keys(
+    keys: UseCaseKeyCollection, predicate: Callable[[Key], bool]
+) -> tuple[UseCaseKeyCollection, UseCaseKeyCollection]:
+    matching = []
+    rest = []
+    for key in keys.as_tuples():
+        (matching if predicate(key) else rest).append(key)
+    return _keys_from_tuples(matching), _keys_from_tuples(rest)
+
+
+def _merge_keys(*collections: UseCaseKeyCollection) -> UseCaseKeyCollection:
+    return _keys_from_tuples(key for keys in collections for key in keys.as_tuples())
+
+
 class PostgresIndexer(StaticStringIndexer):
     def __init__(self) -> None:
         super().__init__(CachingIndexer(indexer_cache, PGStringIndexerV2()))
@@ -14,6 +14,15 @@ class AbstractIndexBackend(metaclass=ABCMeta):
     def record(self, scope, key, items, timestamp=None):
         pass
 
+    def record_multi(self, scope, records, timestamp=None):
+        for key, items, record_timestamp in records:
+            self.record(
+                scope,
+                key,
+                items,
+                timestamp=record_timestamp if record_timestamp is not None else timestamp,
+            )
+
     @abstractmethod
     def merge(self, scope, destination, items, timestamp=None):
         pass
@@ -142,6 +142,40 @@ class RedisScriptMinHashIndexBackend(AbstractIndexBackend):
 
         return self.__index(scope, arguments)
 
+    def record_multi(self, scope, records, timestamp=None):
+        """
+        Records many keys with a single script call. `records` is a sequence
+        of `(key, items, timestamp)` tuples, where `items` is what would be
+        passed to `record` for the key.
+        """
+        records = [record for record in records if record[1]]
+        if not records:
+            return  # nothing to do
+
+        if timestamp is None:
+            timestamp = int(time.time())
+
+        arguments = [
+            "RECORD_MULTI",
+            timestamp,
+            self.namespace,
+            self.bands,
+            self.interval,
+            self.retention,
+            self.candidate_set_limit,
+            scope,
+        ]
+
+        for key, items, record_timestamp in records:
+            arguments.extend(
+                [key, record_timestamp if record_timestamp is not None else timestamp, len(items)]
+            )
+            for idx, features in items:
+                arguments.append(idx)
+                arguments.extend(self._build_signature_arguments(features))
+
+        return self.__index(scope, arguments)
+
     def merge(self, scope, destination, items, timestamp=None):
         if timestamp is None:
             timestamp = int(time.time())
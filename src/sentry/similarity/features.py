@@ -94,6 +94,23 @@ class FeatureSet:
                 )
         return results
 
+    def __encode(self, event, label, features):
+        try:
+            return [self.encoder.dumps(feature) for feature in features]
+        except Exception as error:
+            log = (
+                logger.debug
+                if isinstance(error, self.expected_encoding_errors)
+                else functools.partial(logger.warning, exc_info=True)
+            )
+            log(
+                "Could not encode features from %r for %r due to error: %r",
+                event,
+                label,
+                error,
+            )
+            return None
+
     def record(self, events):
         if not events:
             return []
@@ -120,26 +137,47 @@ class FeatureSet:
                         self.__get_key(event.group) == key
                     ), "all events must be associated with the same group"
 
-                try:
-                    features = [self.encoder.dumps(feature) for feature in features]
-                except Exception as error:
-                    log = (
-                        logger.debug
-                        if isinstance(error, self.expected_encoding_errors)
-                        else functools.partial(logger.warning, exc_info=True)
-                    )
-                    log(
-                        "Could not encode features from %r for %r due to error: %r",
-                        event,
-                        label,
-                        error,
-                    )
-                else:
-                    if features:
-                        items.append((self.aliases[label], features))
+                encoded = self.__encode(event, label, features)
+                if encoded:
+                    items.append((self.aliases[label], encoded))
 
         return self.index.record(scope, key, items, timestamp=int(to_timestamp(event.datetime)))
 
+    def record_multi(self, events):
+        """
+        Like `record`, but events may belong to different groups of the same
+        project. All of them are recorded with a single index call.
+        """
+        scope = None
+
+        records = []
+        for event in events:
+            if not event.group_id:
+                continue
+
+            items = []
+            for label, features in self.extract(event).items():
+                if scope is None:
+                    scope = self.__get_scope(event.project)
+                else:
+                    assert (
+                        self.__get_scope(event.project) == scope
+                    ), "all events must be associated with the same project"
+
+                encoded = self.__encode(event, label, features)
+                if encoded:
+                    items.append((self.aliases[label], encoded))
+
+            if items:
+                records.append(
+                    (self.__get_key(event.group), items, int(to_timestamp(event.datetime)))
+                )
+
+        if not records:
+            return []
+
+        return self.index.record_multi(scope, records)
+
     def classify(self, events, limit=None, thresholds=None):
         if not events:
             return []
@@ -160,24 +198,10 @@ class FeatureSet:
                         self.__get_scope(event.project) == scope
                     ), "all events must be associated with the same project"
 
-                try:
-                    features = [self.encoder.dumps(feature) for feature in features]
-                except Exception as error:
-                    log = (
-                        logger.debug
-                        if isinstance(error, self.expected_encoding_errors)
-                        else functools.partial(logger.warning, exc_info=True)
-                    )
-                    log(
-                        "Could not encode features from %r for %r due to error: %r",
-                        event,
-                        label,
-                        error,
-                    )
-                else:
-                    if features:
-                        items.append((self.aliases[label], thresholds.get(label, 0), features))
-                        labels.append(label)
+                encoded = self.__encode(event, label, features)
+                if encoded:
+                    items.append((self.aliases[label], thresholds.get(label, 0), encoded))
+                    labels.append(label)
 
         return [
             (int(key), dict(zip(labels, scores)))
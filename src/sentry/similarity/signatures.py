@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from collections.abc import Iterable
+from itertools import repeat
 
 import mmh3
 
@@ -10,8 +11,16 @@ class MinHashSignatureBuilder:
         self.columns = columns
         self.rows = rows
 
-    def __call__(self, features: Iterable[str]) -> list[int]:
+    def __call__(self, features: Iterable[str | bytes]) -> list[int]:
+        # Features are encoded once rather than once per column, and the
+        # hashing and reduction of each column happens without calling back
+        # into Python for every feature.
+        encoded = [
+            feature.encode("utf8") if isinstance(feature, str) else feature
+            for feature in set(features)
+        ]
+        modulo = self.rows.__rmod__
         return [
-            min(mmh3.hash(feature, column) % self.rows for feature in features)
+            min(map(modulo, map(mmh3.hash, encoded, repeat(column))))
             for column in range(self.columns)
         ]
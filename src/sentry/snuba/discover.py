@@ -11,6 +11,7 @@ import sentry_sdk
 from sentry_relay.consts import SPAN_STATUS_CODE_TO_NAME
 from snuba_sdk import Condition, Function, Op
 
+from sentry import options
 from sentry.discover.arithmetic import categorize_columns
 from sentry.exceptions import InvalidSearchQuery
 from sentry.models.group import Group
@@ -27,6 +28,7 @@ from sentry.search.events.fields import (
     is_function,
 )
 from sentry.search.events.types import HistogramParams, ParamsType, QueryBuilderConfig
+from sentry.snuba import timeseries_cache
 from sentry.snuba.dataset import Dataset
 from sentry.tagstore.base import TOP_VALUES_DEFAULT_LIMIT
 from sentry.utils.dates import to_timestamp
@@ -305,6 +307,15 @@ def timeseries_query(
     time bucket. Requires that we only pass
     allow_metric_aggregates (bool) Ignored here, only used in metric enhanced performance
     """
+    if (
+        zerofill_results
+        and not comparison_delta
+        and options.get("snuba.timeseries-cache.discover.enabled")
+    ):
+        return _timeseries_query_with_bucket_cache(
+            selected_columns, query, params, rollup, referrer, functions_acl, has_metrics
+        )
+
     with sentry_sdk.start_span(op="discover.discover", description="timeseries.filter_transform"):
         equations, columns = categorize_columns(selected_columns)
         base_builder = TimeseriesQueryBuilder(
@@ -386,6 +397,128 @@ def timeseries_query(
     )
 
 
+def _timeseries_query_with_bucket_cache(
+    selected_columns: Sequence[str],
+    query: str,
+    params: ParamsType,
+    rollup: int,
+    referrer: str | None,
+    functions_acl: list[str] | None,
+    has_metrics: bool,
+) -> SnubaTSResult:
+    """
+    Like `timeseries_query`, but serves closed buckets from the timeseries
+    cache and only queries the remaining ones.
+    """
+    equations, columns = categorize_columns(selected_columns)
+
+    start = to_naive_timestamp(naiveify_datetime(params["start"]))
+    end = to_naive_timestamp(naiveify_datetime(params["end"]))
+    first_bucket = int(start / rollup) * rollup
+    # Unless the query starts at a bucket boundary, its first bucket only
+    # covers part of the rollup and is not cached.
+    if first_bucket < start:
+        first_bucket += rollup
+    series = list(range(first_bucket, int(end / rollup) * rollup + rollup, rollup))
+
+    cache_key = timeseries_cache.get_cache_key(
+        "discover",
+        selected_columns,
+        query,
+        rollup,
+        functions_acl,
+        has_metrics,
+        sorted(
+            (key, value)
+            for key, value in params.items()
+            if key not in ("start", "end") and not key.endswith("_objects")
+        ),
+    )
+    cached, first_missing = timeseries_cache.get_cached_buckets([cache_key], series)
+
+    def at(timestamp: float) -> datetime:
+        return params["start"] + timedelta(seconds=timestamp - start)
+
+    # When every bucket is cached, e.g. for a past range within one queried
+    # before, only the partial first bucket is left to query, if any. The
+    # result meta then has to come from the cache as well.
+    meta: Any = None
+    if series and first_missing == len(series):
+        meta = timeseries_cache.get_cached_meta(cache_key)
+        if meta is None:
+            first_missing = 0
+
+    if first_missing == 0:
+        ranges = [(params["start"], params["end"])]
+    else:
+        ranges = []
+        if series[0] > start:
+            ranges.append((params["start"], at(series[0])))
+        if first_missing < len(series):
+            ranges.append((at(series[first_missing]), params["end"]))
+
+    with sentry_sdk.start_span(op="discover.discover", description="timeseries.filter_transform"):
+        builders = []
+        # Without any range to query, a builder is still needed to resolve
+        # the types of the result meta.
+        for range_start, range_end in ranges or [(params["start"], params["end"])]:
+            range_params = deepcopy(params)
+            range_params["start"] = range_start
+            range_params["end"] = range_end
+            builders.append(
+                TimeseriesQueryBuilder(
+                    Dataset.Discover,
+                    range_params,
+                    rollup,
+                    query=query,
+                    selected_columns=columns,
+                    equations=equations,
+                    config=QueryBuilderConfig(
+                        functions_acl=functions_acl,
+                        has_metrics=has_metrics,
+                    ),
+                )
+            )
+
+        query_results = (
+            bulk_snql_query([builder.get_snql_query() for builder in builders], referrer)
+            if ranges
+            else []
+        )
+
+    with sentry_sdk.start_span(op="discover.discover", description="timeseries.transform_results"):
+        rows = [row for bucket in series[:first_missing] for row in cached[cache_key][bucket]]
+        for result in query_results:
+            rows.extend(result["data"])
+        data = zerofill(rows, params["start"], params["end"], rollup, "time")
+
+        buckets: dict[int, list[dict[str, Any]]] = {}
+        for row in data:
+            buckets.setdefault(row["time"], []).append(row)
+        timeseries_cache.set_cached_buckets({cache_key: buckets}, series, rollup, end)
+        if query_results:
+            meta = query_results[-1]["meta"]
+            timeseries_cache.set_cached_meta(cache_key, meta)
+
+    base_builder = builders[-1]
+    return SnubaTSResult(
+        {
+            "data": data,
+            "meta": {
+                "fields": {
+                    value["name"]: get_json_meta_type(
+                        value["name"], value.get("type"), base_builder
+                    )
+                    for value in meta
+                }
+            },
+        },
+        params["start"],
+        params["end"],
+        rollup,
+    )
+
+
 def create_result_key(result_row, fields, issues) -> str:
     values = []
     for field in fields:
@@ -0,0 +1,94 @@
+"""
+Caching of closed rollup buckets of timeseries queries.
+
+Timeseries queries over a sliding window (e.g. "last 24 hours") never hit the
+plain Snuba query cache, as their time range changes with every request.
+Buckets that are closed, i.e. no longer receive events, are stored here under
+a key derived from the query with its time range removed. Callers then only
+need to query the buckets that are not cached or still open, and merge them
+with the cached ones.
+"""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Mapping, Sequence
+from hashlib import sha1
+from typing import Any
+
+from django.core.cache import cache
+
+from sentry import options
+from sentry.utils import json, metrics
+
+
+def get_cache_key(namespace: str, *parts: Any) -> str:
+    """
+    Builds the cache key of a timeseries from the parts that identify it,
+    which must not include the time range of the query.
+    """
+    hashable = json.dumps([namespace, *parts])
+    # tsc - timeseries cache
+    return f"tsc:{namespace}:{sha1(hashable.encode('utf-8')).hexdigest()}"
+
+
+def get_cached_buckets(
+    cache_keys: Sequence[str], series: Sequence[int]
+) -> tuple[dict[str, dict[int, Any]], int]:
+    """
+    Returns the cached buckets of every timeseries in `cache_keys`, and the
+    index of the first bucket of `series` that is not cached for all of
+    them, `len(series)` if every bucket is cached.
+    """
+    cache_data = cache.get_many(cache_keys)
+    cached = {cache_key: cache_data.get(cache_key) or {} for cache_key in cache_keys}
+
+    first_missing = len(series)
+    for index, bucket in enumerate(series):
+        if not all(bucket in buckets for buckets in cached.values()):
+            first_missing = index
+            break
+
+    metrics.incr("snuba.timeseries_cache.buckets.hit", amount=first_missing)
+    metrics.incr("snuba.timeseries_cache.buckets.miss", amount=len(series) - first_missing)
+    return cached, first_missing
+
+
+def set_cached_buckets(
+    values: Mapping[str, Mapping[int, Any]],
+    series: Sequence[int],
+    rollup: int,
+    end: int,
+) -> None:
+    """
+    Stores the closed buckets of `series` for every timeseries in `values`.
+
+    Buckets are considered closed once they end before `end` and before
+    the current time minus `snuba.timeseries-cache.settle-seconds`, which
+    leaves time for late events to arrive. Buckets outside of `series` are
+    dropped from the cache.
+    """
+    closed_before = min(end, time.time() - options.get("snuba.timeseries-cache.settle-seconds"))
+    closed = [bucket for bucket in series if bucket + rollup <= closed_before]
+    if not closed:
+        return
+
+    cache.set_many(
+        {
+            cache_key: {bucket: buckets[bucket] for bucket in closed if bucket in buckets}
+            for cache_key, buckets in values.items()
+        },
+        options.get("snuba.timeseries-cache.ttl"),
+    )
+
+
+def get_cached_meta(cache_key: str) -> Any:
+    """
+    Returns the result meta stored for the timeseries `cache_key`, which
+    callers need when every bucket of a query is served from the cache.
+    """
+    return cache.get(f"{cache_key}:meta")
+
+
+def set_cached_meta(cache_key: str, meta: Any) -> None:
+    cache.set(f"{cache_key}:meta", meta, options.get("snuba.timeseries-cache.ttl"))
@@ -1,12 +1,26 @@
 from __future__ import annotations
 
+from collections.abc import Iterable, Iterator
+
 from django.conf import settings
 from sentry_redis_tools.clients import RedisCluster, StrictRedis
 
 from sentry.utils import redis
+from sentry.utils.iterators import chunked
 
 SEGMENT_TTL = 5 * 60  # 5 min TTL in seconds
 
+# Maximum number of spans appended to a segment with a single script call.
+# Lua's `unpack` is limited in the number of values it can return.
+WRITE_CHUNK_SIZE = 1000
+
+# Number of spans fetched per LRANGE when reading a segment.
+READ_CHUNK_SIZE = 1000
+
+add_spans = redis.load_script("spans/add_spans.lua")
+
+SegmentKey = tuple[str | int, str]
+
 
 def get_redis_client() -> RedisCluster | StrictRedis:
     return redis.redis_clusters.get(settings.SENTRY_SPAN_BUFFER_CLUSTER)
@@ -21,16 +35,58 @@ class RedisSpansBuffer:
         self.client: RedisCluster | StrictRedis = get_redis_client()
 
     def read_segment(self, project_id: str | int, segment_id: str) -> list[str | bytes]:
+        return list(self.iter_segment(project_id, segment_id))
+
+    def iter_segment(
+        self, project_id: str | int, segment_id: str, chunk_size: int = READ_CHUNK_SIZE
+    ) -> Iterator[str | bytes]:
+        """
+        Yield the spans of a segment in the order they were written, fetching
+        `chunk_size` spans at a time.
+        """
         key = get_segment_key(project_id, segment_id)
 
-        return self.client.lrange(key, 0, -1) or []
+        start = 0
+        while True:
+            spans = self.client.lrange(key, start, start + chunk_size - 1) or []
+            yield from spans
+            if len(spans) < chunk_size:
+                return
+            start += chunk_size
 
     def write_span(self, project_id: str | int, segment_id: str, span: bytes) -> bool:
-        key = get_segment_key(project_id, segment_id)
-        length = self.client.rpush(key, span)
-        new_key = length == 1
+        return bool(self.batch_write_spans([(project_id, segment_id, span)]))
+
+    def batch_write_spans(self, spans: Iterable[tuple[str | int, str, bytes]]) -> list[SegmentKey]:
+        """
+        Append `(project_id, segment_id, span)` triples to their segments.
+        Spans of the same segment keep their relative order.
+
+        Returns the `(project_id, segment_id)` of every segment opened by this
+        call. The TTL of a segment is set atomically with its first span.
+        """
+        segments: dict[SegmentKey, list[bytes]] = {}
+        for project_id, segment_id, span in spans:
+            segments.setdefault((project_id, segment_id), []).append(span)
+
+        calls = [
+            (segment, [SEGMENT_TTL, *chunk])
+            for segment, segment_spans in segments.items()
+            for chunk in chunked(segment_spans, WRITE_CHUNK_SIZE)
+        ]
+        if not calls:
+            return []
 
-        if new_key:
-            self.client.expire(key, SEGMENT_TTL)
+        if isinstance(self.client, RedisCluster):
+            # Scripts can not be pipelined in cluster mode, every segment
+            # still only costs a single round trip.
+            results = [
+                add_spans(self.client, [get_segment_key(*segment)], args) for segment, args in calls
+            ]
+        else:
+            with self.client.pipeline(transaction=False) as pipe:
+                for segment, args in calls:
+                    add_spans(pipe, [get_segment_key(*segment)], args)
+                results = pipe.execute()
 
-        return new_key
+        return [segment for (segment, _), new in zip(calls, results) if new]
@@ -4,6 +4,7 @@ from typing import Any
 
 from arroyo.backends.kafka.consumer import KafkaPayload
 from arroyo.processing.strategies.abstract import ProcessingStrategy, ProcessingStrategyFactory
+from arroyo.processing.strategies.batching import BatchStep, ValuesBatch
 from arroyo.processing.strategies.commit import CommitOffsets
 from arroyo.processing.strategies.run_task import RunTask
 from arroyo.types import BrokerValue, Commit, Message, Partition
@@ -24,19 +25,26 @@ def _deserialize_span(value: bytes) -> Mapping[str, Any]:
     return SPAN_SCHEMA.decode(value)
 
 
-def process_message(message: Message[KafkaPayload]):
-    assert isinstance(message.value, BrokerValue)
-    try:
-        span = _deserialize_span(message.payload.value)
-        segment_id = span["segment_id"]
-        project_id = span["project_id"]
-    except Exception:
-        logger.exception("Failed to process span payload")
-        return
+def process_batch(message: Message[ValuesBatch[KafkaPayload]]):
+    """
+    Writes a batch of spans to the segment buffer in a single round trip and
+    schedules processing of every segment opened by the batch.
+    """
+    spans = []
+    for item in message.payload:
+        assert isinstance(item, BrokerValue)
+        try:
+            span = _deserialize_span(item.payload.value)
+            segment_id = span["segment_id"]
+            project_id = span["project_id"]
+        except Exception:
+            logger.exception("Failed to process span payload")
+            continue
+
+        spans.append((project_id, segment_id, item.payload.value))
 
     client = RedisSpansBuffer()
-    new_segment = client.write_span(project_id, segment_id, message.payload.value)
-    if new_segment:
+    for project_id, segment_id in client.batch_write_spans(spans):
         # This function currently does nothing.
         process_segment.apply_async(
             args=[project_id, segment_id],
@@ -45,12 +53,20 @@ def process_message(message: Message[KafkaPayload]):
 
 
 class ProcessSpansStrategyFactory(ProcessingStrategyFactory[KafkaPayload]):
+    def __init__(self, max_batch_size: int = 100, max_batch_time: int = 1) -> None:
+        self.max_batch_size = max_batch_size
+        self.max_batch_time = max_batch_time
+
     def create_with_partitions(
         self,
         commit: Commit,
         partitions: Mapping[Partition, int],
     ) -> ProcessingStrategy[KafkaPayload]:
-        return RunTask(
-            function=process_message,
-            next_step=CommitOffsets(commit),
+        return BatchStep(
+            max_batch_size=self.max_batch_size,
+            max_batch_time=self.max_batch_time,
+            next_step=RunTask(
+                function=process_batch,
+                next_step=CommitOffsets(commit),
+            ),
         )
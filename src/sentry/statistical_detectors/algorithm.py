@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import logging
 from abc import ABC, abstractmethod
-from collections.abc import Callable, Mapping, MutableMapping
+from collections.abc import Callable, Mapping, MutableMapping, Sequence
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import Any
@@ -91,15 +91,29 @@ class MovingAverageDetectorState(DetectorState):
         )
 
 
+RawState = Mapping[str | bytes, bytes | float | int | str]
+DetectorResult = tuple[TrendType, float, DetectorState | None]
+
+
 class DetectorAlgorithm(ABC):
     @abstractmethod
     def update(
         self,
-        raw: Mapping[str | bytes, bytes | float | int | str],
+        raw: RawState,
         payload: DetectorPayload,
-    ) -> tuple[TrendType, float, DetectorState | None]:
+    ) -> DetectorResult:
         ...
 
+    def bulk_update(
+        self,
+        raw_states: Sequence[RawState],
+        payloads: Sequence[DetectorPayload],
+    ) -> list[DetectorResult]:
+        """
+        Same as calling `update` with every payload and its state, in order.
+        """
+        return [self.update(raw, payload) for raw, payload in zip(raw_states, payloads)]
+
 
 class MovingAverageRelativeChangeDetector(DetectorAlgorithm):
     def __init__(
@@ -120,78 +134,109 @@ class MovingAverageRelativeChangeDetector(DetectorAlgorithm):
 
     def update(
         self,
-        raw_state: Mapping[str | bytes, bytes | float | int | str],
+        raw_state: RawState,
         payload: DetectorPayload,
-    ) -> tuple[TrendType, float, DetectorState | None]:
-        try:
-            old = MovingAverageDetectorState.from_redis_dict(raw_state)
-        except Exception as e:
-            old = MovingAverageDetectorState.empty()
-
-            if raw_state:
-                # empty raw state implies that there was no
-                # previous state so no need to capture an exception
-                sentry_sdk.capture_exception(e)
-
-        if old.timestamp is not None and old.timestamp > payload.timestamp:
-            # In the event that the timestamp is before the payload's timestamps,
-            # we do not want to process this payload.
-            #
-            # This should not happen other than in some error state.
-            logger.warning(
-                "Trend detection out of order. Processing %s, but last processed was %s",
-                payload.timestamp.isoformat(),
-                old.timestamp.isoformat(),
-            )
-            return TrendType.Skipped, 0, None
-
-        moving_avg_short = self.moving_avg_short_factory()
-        moving_avg_long = self.moving_avg_long_factory()
-
-        new = MovingAverageDetectorState(
-            timestamp=payload.timestamp,
-            count=old.count + 1,
-            moving_avg_short=moving_avg_short.update(
-                old.count, old.moving_avg_short, payload.value
-            ),
-            moving_avg_long=moving_avg_long.update(old.count, old.moving_avg_long, payload.value),
-        )
-
-        # The heuristic isn't stable initially, so ensure we have a minimum
-        # number of data points before looking for a regression.
-        stablized = new.count > self.min_data_points
-
-        score = abs(new.moving_avg_short - new.moving_avg_long)
+    ) -> DetectorResult:
+        return self.bulk_update([raw_state], [payload])[0]
 
-        try:
-            relative_change_old = (old.moving_avg_short - old.moving_avg_long) / abs(
-                old.moving_avg_long
+    def bulk_update(
+        self,
+        raw_states: Sequence[RawState],
+        payloads: Sequence[DetectorPayload],
+    ) -> list[DetectorResult]:
+        """
+        Updates the states of a whole chunk of payloads. The states are read
+        into columns, and the moving averages, relative changes and trends
+        are computed a column at a time. Only the new states are built as
+        objects.
+        """
+        results: list[DetectorResult] = [(TrendType.Skipped, 0, None)] * len(payloads)
+
+        indices: list[int] = []
+        counts: list[int] = []
+        old_shorts: list[float] = []
+        old_longs: list[float] = []
+        values: list[float] = []
+        for i, (raw_state, payload) in enumerate(zip(raw_states, payloads)):
+            try:
+                ts = raw_state.get(MovingAverageDetectorState.FIELD_TIMESTAMP)
+                timestamp = None if ts is None else int(ts)
+                count = int(raw_state[MovingAverageDetectorState.FIELD_COUNT])
+                old_short = float(raw_state[MovingAverageDetectorState.FIELD_MOVING_AVG_SHORT])
+                old_long = float(raw_state[MovingAverageDetectorState.FIELD_MOVING_AVG_LONG])
+            except Exception as e:
+                timestamp, count, old_short, old_long = None, 0, 0, 0
+
+                if raw_state:
+                    # empty raw state implies that there was no
+                    # previous state so no need to capture an exception
+                    sentry_sdk.capture_exception(e)
+
+            if timestamp is not None and timestamp > payload.timestamp.timestamp():
+                # In the event that the timestamp is before the payload's timestamps,
+                # we do not want to process this payload.
+                #
+                # This should not happen other than in some error state.
+                logger.warning(
+                    "Trend detection out of order. Processing %s, but last processed was %s",
+                    payload.timestamp.isoformat(),
+                    datetime.fromtimestamp(timestamp, timezone.utc).isoformat(),
+                )
+                continue
+
+            indices.append(i)
+            counts.append(count)
+            old_shorts.append(old_short)
+            old_longs.append(old_long)
+            values.append(payload.value)
+
+        new_shorts = self.moving_avg_short_factory().bulk_update(counts, old_shorts, values)
+        new_longs = self.moving_avg_long_factory().bulk_update(counts, old_longs, values)
+
+        scores = [abs(short - long) for short, long in zip(new_shorts, new_longs)]
+        # The relative changes are 0 for both the old and new averages if
+        # either long average is 0.
+        relative_changes = [
+            (
+                (old_short - old_long) / abs(old_long),
+                (new_short - new_long) / abs(new_long),
             )
-            relative_change_new = (new.moving_avg_short - new.moving_avg_long) / abs(
-                new.moving_avg_long
+            if old_long and new_long
+            else None
+            for old_short, old_long, new_short, new_long in zip(
+                old_shorts, old_longs, new_shorts, new_longs
             )
+        ]
 
-            metrics.distribution(
-                "statistical_detectors.rel_change",
-                relative_change_new,
-                tags={"source": self.source, "kind": self.kind},
-            )
-        except ZeroDivisionError:
-            relative_change_old = 0
-            relative_change_new = 0
-
-        if (
-            stablized
-            and relative_change_old < self.threshold
-            and relative_change_new > self.threshold
-        ):
-            return TrendType.Regressed, score, new
+        tags = {"source": self.source, "kind": self.kind}
+        for relative_change in relative_changes:
+            if relative_change is not None:
+                metrics.distribution(
+                    "statistical_detectors.rel_change", relative_change[1], tags=tags
+                )
 
-        elif (
-            stablized
-            and relative_change_old > -self.threshold
-            and relative_change_new < -self.threshold
+        # The heuristic isn't stable initially, so ensure we have a minimum
+        # number of data points before looking for a regression.
+        min_count = self.min_data_points
+        threshold = self.threshold
+        for i, count, new_short, new_long, score, relative_change in zip(
+            indices, counts, new_shorts, new_longs, scores, relative_changes
         ):
-            return TrendType.Improved, score, new
+            new = MovingAverageDetectorState(
+                timestamp=payloads[i].timestamp,
+                count=count + 1,
+                moving_avg_short=new_short,
+                moving_avg_long=new_long,
+            )
 
-        return TrendType.Unchanged, score, new
+            relative_change_old, relative_change_new = relative_change or (0, 0)
+            if count < min_count:
+                results[i] = TrendType.Unchanged, score, new
+            elif relative_change_old < threshold and relative_change_new > threshold:
+                results[i] = TrendType.Regressed, score, new
+            elif relative_change_old > -threshold and relative_change_new < -threshold:
+                results[i] = TrendType.Improved, score, new
+            else:
+                results[i] = TrendType.Unchanged, score, new
+
+        return results
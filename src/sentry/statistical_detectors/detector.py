@@ -116,10 +116,10 @@ class RegressionDetector(ABC):
 
             states = []
 
-            for raw_state, payload in zip(raw_states, payloads):
-                unique_project_ids.add(payload.project_id)
+            results = algorithm.bulk_update(raw_states, payloads)
 
-                trend_type, score, new_state = algorithm.update(raw_state, payload)
+            for (trend_type, score, new_state), payload in zip(results, payloads):
+                unique_project_ids.add(payload.project_id)
 
                 if trend_type == TrendType.Regressed:
                     regressed_count += 1
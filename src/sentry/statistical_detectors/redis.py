@@ -36,7 +36,7 @@ class RedisDetectorStore(DetectorStore):
     def bulk_read_states(
         self, payloads: list[DetectorPayload]
     ) -> list[Mapping[str | bytes, bytes | float | int | str]]:
-        with self.client.pipeline() as pipeline:
+        with self.client.pipeline(transaction=False) as pipeline:
             for payload in payloads:
                 key = self.make_key(payload)
                 pipeline.hgetall(key)
@@ -50,7 +50,7 @@ class RedisDetectorStore(DetectorStore):
         # the number of new states must match the number of payloads
         assert len(states) == len(payloads)
 
-        with self.client.pipeline() as pipeline:
+        with self.client.pipeline(transaction=False) as pipeline:
             for state, payload in zip(states, payloads):
                 if state is None:
                     continue
@@ -13,7 +13,7 @@ from django.db.models.signals import post_save
 from django.utils import timezone
 from google.api_core.exceptions import ServiceUnavailable
 
-from sentry import features
+from sentry import features, options
 from sentry.exceptions import PluginError
 from sentry.issues.grouptype import GroupCategory
 from sentry.issues.issue_occurrence import IssueOccurrence
@@ -44,6 +44,7 @@ if TYPE_CHECKING:
     from sentry.models.project import Project
     from sentry.models.team import Team
     from sentry.ownership.grammar import Rule
+    from sentry.rules.conditions.event_frequency import EventFrequencyQueryBatch
     from sentry.services.hybrid_cloud.user import RpcUser
 
 logger = logging.getLogger(__name__)
@@ -61,6 +62,7 @@ class PostProcessJob(TypedDict, total=False):
     has_reappeared: bool
     has_alert: bool
     has_escalated: bool
+    frequency_batch: EventFrequencyQueryBatch | None
 
 
 def _get_service_hooks(project_id):
@@ -724,6 +726,13 @@ def post_process_group(
                     if associated_event:
                         multi_groups.append((associated_event, gs))
 
+        frequency_batch = None
+        if options.get("rules.event-frequency.batch-queries"):
+            from sentry.rules.conditions.event_frequency import EventFrequencyQueryBatch
+
+            # Shared by the rules of all groups of the event.
+            frequency_batch = EventFrequencyQueryBatch()
+
         group_jobs: Sequence[PostProcessJob] = [
             {
                 "event": ge,
@@ -732,6 +741,7 @@ def post_process_group(
                 "has_reappeared": bool(not gs["is_new"]),
                 "has_alert": False,
                 "has_escalated": False,
+                "frequency_batch": frequency_batch,
             }
             for ge, gs in multi_groups
         ]
@@ -1101,6 +1111,7 @@ def process_rules(job: PostProcessJob) -> None:
             is_new_group_environment,
             has_reappeared,
             has_escalated,
+            frequency_batch=job.get("frequency_batch"),
         )
         with sentry_sdk.start_span(op="tasks.post_process_group.rule_processor_callbacks"):
             # TODO(dcramer): ideally this would fanout, but serializing giant
@@ -64,9 +64,16 @@ def buffer_incr(model, *args, **kwargs):
 def buffer_incr_task(app_label, model_name, args, kwargs):
     """
     Call `buffer.incr`, resolving the model first.
+
+    Increments are coalesced in-process first if the `buffer.accumulate-incr`
+    option is enabled.
     """
     from sentry import buffer
+    from sentry.buffer.accumulator import get_accumulator
 
     sentry_sdk.set_tag("model", model_name)
 
-    buffer.incr(apps.get_model(app_label=app_label, model_name=model_name), *args, **kwargs)
+    accumulator = get_accumulator()
+    (accumulator or buffer).incr(
+        apps.get_model(app_label=app_label, model_name=model_name), *args, **kwargs
+    )
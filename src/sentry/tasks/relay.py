@@ -1,9 +1,11 @@
 import logging
+import random
 import time
 
 import sentry_sdk
 from django.db import router, transaction
 
+from sentry import options
 from sentry.models.organization import Organization
 from sentry.relay import projectconfig_cache, projectconfig_debounce_cache
 from sentry.silo import SiloMode
@@ -245,6 +247,43 @@ def invalidate_project_config(
     projectconfig_cache.backend.set_many(updated_configs)
 
 
+@instrumented_task(
+    name="sentry.tasks.relay.rotate_projectconfig_compression_dictionary",
+    queue="relay_config_bulk",
+    soft_time_limit=10 * 60,
+    time_limit=10 * 60 + 5,
+    silo_mode=SiloMode.REGION,
+)
+def rotate_projectconfig_compression_dictionary(**kwargs):
+    """Train a new compression dictionary for the project config cache.
+
+    The dictionary is trained on the cached configs of a random sample of
+    project keys, keys whose config is not cached are skipped.
+    """
+    if not options.get("relay.projectconfig-cache.compression-dictionary"):
+        return
+
+    from sentry.models.projectkey import ProjectKey
+
+    max_id = ProjectKey.objects.order_by("-id").values_list("id", flat=True).first()
+    if max_id is None:
+        return
+
+    sample_size = options.get("relay.projectconfig-cache.dictionary-sample-size")
+    ids = random.sample(range(1, max_id + 1), min(sample_size, max_id))
+    configs = []
+    for public_key in ProjectKey.objects.filter(id__in=ids).values_list("public_key", flat=True):
+        config = projectconfig_cache.backend.get(public_key)
+        if config is not None:
+            configs.append(config)
+
+    dict_id = projectconfig_cache.backend.rotate_compression_dictionary(configs)
+    metrics.incr(
+        "relay.projectconfig_cache.dictionary_rotated",
+        tags={"success": dict_id is not None},
+    )
+
+
 def schedule_invalidate_project_config(
     *,
     trigger,
@@ -326,6 +365,7 @@ def _schedule_invalidate_project_config(
     """For param docs, see :func:`schedule_invalidate_project_config`."""
     from sentry.models.project import Project
     from sentry.models.projectkey import ProjectKey
+    from sentry.quotas.base import bump_quota_config_version
 
     validate_args(organization_id, project_id, public_key)
 
@@ -356,6 +396,11 @@ def _schedule_invalidate_project_config(
         else:
             check_debounce_keys["organization_id"] = org_id
 
+    if check_debounce_keys["organization_id"] is not None:
+        # Settings affecting quotas might have changed, this has to happen
+        # even if the invalidation itself is debounced.
+        bump_quota_config_version(check_debounce_keys["organization_id"])
+
     if projectconfig_debounce_cache.invalidation.is_debounced(**check_debounce_keys):
         # If this task is already in the queue, do not schedule another task.
         metrics.incr(
@@ -8,6 +8,7 @@ from copy import deepcopy
 from datetime import datetime
 from typing import Any
 
+from django.utils import timezone
 from snuba_sdk import (
     Column,
     Direction,
@@ -24,9 +25,11 @@ from snuba_sdk.entity import get_required_time_column
 from snuba_sdk.legacy import is_condition, parse_condition
 from snuba_sdk.query import SelectableExpression
 
+from sentry import options
 from sentry.constants import DataCategory
 from sentry.ingest.inbound_filters import FILTER_STAT_KEYS_TO_VALUES
 from sentry.issues.query import manual_group_on_time_aggregation
+from sentry.snuba import timeseries_cache
 from sentry.snuba.dataset import Dataset
 from sentry.tsdb.base import BaseTSDB, TSDBModel
 from sentry.utils import outcomes, snuba
@@ -725,13 +728,11 @@ class SnubaTSDB(BaseTSDB):
         else:
             aggregate_function = "count()"
 
-        result = self.get_data(
+        get_data = functools.partial(
+            self.get_data,
             model,
             keys,
-            start,
-            end,
-            rollup,
-            environment_ids,
+            environment_ids=environment_ids,
             aggregation=aggregate_function,
             group_on_time=True,
             conditions=conditions,
@@ -740,12 +741,99 @@ class SnubaTSDB(BaseTSDB):
             tenant_ids=tenant_ids,
             referrer_suffix=referrer_suffix,
         )
+
+        if (
+            options.get("snuba.timeseries-cache.tsdb.enabled")
+            and model_query_settings.groupby is not None
+            and isinstance(keys, (list, tuple, set, frozenset))
+        ):
+            result = self.__get_range_with_bucket_cache(
+                get_data, model, keys, start, end, rollup, environment_ids, conditions, jitter_value
+            )
+        else:
+            result = get_data(start, end, rollup)
+
         # convert
         #    {group:{timestamp:count, ...}}
         # into
         #    {group: [(timestamp, count), ...]}
         return {k: sorted(result[k].items()) for k in result}
 
+    def __get_range_with_bucket_cache(
+        self,
+        get_data,
+        model,
+        keys,
+        start,
+        end,
+        rollup,
+        environment_ids,
+        conditions,
+        jitter_value,
+    ):
+        """
+        Like `get_data` with `group_on_time`, but only queries the buckets of
+        the series that are not in the timeseries cache.
+        """
+        if end is None:
+            end = timezone.now()
+
+        rollup, series = self.get_optimal_rollup_series(start, end, rollup)
+        series = self._add_jitter_to_series(series, start, rollup, jitter_value)
+        if not series:
+            return get_data(start, end, rollup)
+
+        cache_keys = {
+            key: timeseries_cache.get_cache_key(
+                "tsdb",
+                model.value,
+                key,
+                rollup,
+                # Jitter shifts all buckets by the same offset.
+                series[0] % rollup,
+                sorted(environment_ids) if environment_ids is not None else None,
+                conditions,
+            )
+            for key in keys
+        }
+        cached, first_missing = timeseries_cache.get_cached_buckets(
+            list(cache_keys.values()), series
+        )
+
+        if first_missing == len(series):
+            return {
+                key: {bucket: cached[cache_key][bucket] for bucket in series}
+                for key, cache_key in cache_keys.items()
+            }
+
+        query_start = start
+        if first_missing > 0:
+            # Only query the buckets from the first missing one on, provided
+            # the series of that query lines up with the original one. With
+            # jitter, it may extend by a bucket past the original series.
+            query_start = to_datetime(series[first_missing])
+            _, query_series = self.get_optimal_rollup_series(query_start, end, rollup)
+            query_series = self._add_jitter_to_series(
+                query_series, query_start, rollup, jitter_value
+            )
+            if query_series[: len(series) - first_missing] != series[first_missing:]:
+                first_missing = 0
+                query_start = start
+
+        queried = get_data(query_start, end, rollup)
+        result = {}
+        for key, cache_key in cache_keys.items():
+            buckets = {**cached[cache_key], **queried.get(key, {})}
+            result[key] = {bucket: buckets.get(bucket, 0) for bucket in series}
+
+        timeseries_cache.set_cached_buckets(
+            {cache_key: result[key] for key, cache_key in cache_keys.items()},
+            series,
+            rollup,
+            series[-1] + rollup,
+        )
+        return result
+
     def get_distinct_counts_series(
         self, model, keys, start, end=None, rollup=None, environment_id=None, tenant_ids=None
     ):
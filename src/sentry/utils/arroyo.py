@@ -113,6 +113,12 @@ def _initialize_arroyo_subprocess(initializer: Callable[[], None] | None, tags:
 
     configure()
 
+    from sentry.buffer.accumulator import disable as disable_buffer_accumulator
+
+    # The parent process commits the offsets of the messages processed here,
+    # and can only flush increments it accumulated itself.
+    disable_buffer_accumulator()
+
     if initializer:
         initializer()
 
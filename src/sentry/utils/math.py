@@ -1,5 +1,6 @@
 import math
 from abc import ABC, abstractmethod
+from collections.abc import Sequence
 
 
 def mean(values):
@@ -51,6 +52,14 @@ class MovingAverage(ABC):
     def update(self, n: int, avg: float, value: float) -> float:
         raise NotImplementedError
 
+    def bulk_update(
+        self, ns: Sequence[int], avgs: Sequence[float], values: Sequence[float]
+    ) -> list[float]:
+        """
+        Same as `update`, for many independent averages at once.
+        """
+        return [self.update(n, avg, value) for n, avg, value in zip(ns, avgs, values)]
+
 
 class ExponentialMovingAverage(MovingAverage):
     def __init__(self, weight: float):
@@ -62,3 +71,13 @@ class ExponentialMovingAverage(MovingAverage):
         if n == 0:
             return value
         return value * self.weight + avg * (1 - self.weight)
+
+    def bulk_update(
+        self, ns: Sequence[int], avgs: Sequence[float], values: Sequence[float]
+    ) -> list[float]:
+        weight = self.weight
+        decay = 1 - weight
+        return [
+            value if n == 0 else value * weight + avg * decay
+            for n, avg, value in zip(ns, avgs, values)
+        ]
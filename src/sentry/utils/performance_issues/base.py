@@ -4,6 +4,9 @@ import hashlib
 import random
 import re
 from abc import ABC, abstractmethod
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import timedelta
 from enum import Enum
 from typing import Any, ClassVar, cast
@@ -172,12 +175,70 @@ def does_overlap_previous_span(previous_span: Span, current_span: Span):
     return previous_span_ends > current_span_begins
 
 
-def get_span_duration(span: Span) -> timedelta:
+def _get_span_duration(span: Span) -> timedelta:
     return timedelta(seconds=span.get("timestamp", 0)) - timedelta(
         seconds=span.get("start_timestamp", 0)
     )
 
 
+class SpanRecords:
+    """
+    Values of the spans of an event that are looked at by several detectors,
+    computed once while all detectors walk the event, see
+    `run_detectors_on_data`.
+    """
+
+    __slots__ = ("spans", "durations", "_positions", "_positions_by_id")
+
+    def __init__(self, spans: Sequence[Span]) -> None:
+        self.spans = spans
+        self.durations = [_get_span_duration(span) for span in spans]
+        # Spans are looked up by identity, they are not hashable.
+        self._positions = {id(span): position for position, span in enumerate(spans)}
+        self._positions_by_id: dict[str, int] = {}
+        for position, span in enumerate(spans):
+            self._positions_by_id.setdefault(span.get("span_id"), position)
+
+    def get_duration(self, span: Span) -> timedelta | None:
+        position = self._positions.get(id(span))
+        return None if position is None else self.durations[position]
+
+    def get_span(self, span_id: str) -> Span | None:
+        """
+        Returns the first span with the given id.
+        """
+        position = self._positions_by_id.get(span_id)
+        return None if position is None else self.spans[position]
+
+
+_span_records: ContextVar[SpanRecords | None] = ContextVar("span_records", default=None)
+
+
+@contextmanager
+def use_span_records(records: SpanRecords) -> Iterator[None]:
+    token = _span_records.set(records)
+    try:
+        yield
+    finally:
+        _span_records.reset(token)
+
+
+def get_span_records() -> SpanRecords | None:
+    """
+    Returns the records of the spans of the event being walked, if any.
+    """
+    return _span_records.get()
+
+
+def get_span_duration(span: Span) -> timedelta:
+    records = _span_records.get()
+    if records is not None:
+        duration = records.get_duration(span)
+        if duration is not None:
+            return duration
+    return _get_span_duration(span)
+
+
 def get_duration_between_spans(first_span: Span, second_span: Span):
     first_span_ends = first_span.get("timestamp", 0)
     second_span_begins = second_span.get("start_timestamp", 0)
@@ -21,6 +21,7 @@ from ..base import (
     PerformanceDetector,
     get_notification_attachment_body,
     get_span_evidence_value,
+    get_span_records,
     total_span_time,
 )
 from ..performance_problem import PerformanceProblem
@@ -229,6 +230,10 @@ class ContinuingMNPlusOne(MNPlusOneState):
                 return None
 
         all_spans = self.event.get("spans") or []
+        records = get_span_records()
+        if records is not None and records.spans is all_spans:
+            return records.get_span(parent_span_id)
+
         for span in all_spans:
             if span.get("span_id") == parent_span_id:
                 return span
@@ -19,7 +19,7 @@ from sentry.utils.event import is_event_from_browser_javascript_sdk
 from sentry.utils.event_frames import get_sdk_name
 from sentry.utils.safe import get_path
 
-from .base import DetectorType, PerformanceDetector
+from .base import DetectorType, PerformanceDetector, SpanRecords, use_span_records
 from .detectors.consecutive_db_detector import ConsecutiveDBSpanDetector
 from .detectors.consecutive_http_detector import ConsecutiveHTTPSpanDetector
 from .detectors.http_overhead_detector import HTTPOverheadDetector
@@ -340,8 +340,7 @@ def _detect_performance_problems(
         if detector_class.is_detector_enabled()
     ]
 
-    for detector in detectors:
-        run_detector_on_data(detector, data)
+    run_detectors_on_data(detectors, data)
 
     # Metrics reporting only for detection, not created issues.
     report_metrics_for_detectors(
@@ -390,14 +389,28 @@ def _detect_performance_problems(
 
 
 def run_detector_on_data(detector, data):
-    if not detector.is_event_eligible(data):
+    run_detectors_on_data([detector], data)
+
+
+def run_detectors_on_data(detectors: Sequence[PerformanceDetector], data: dict[str, Any]) -> None:
+    """
+    Walks the spans of the event once, visiting every span with all eligible
+    detectors in turn. Values several detectors need are computed only once
+    per span, see `SpanRecords`.
+    """
+    eligible = [detector for detector in detectors if detector.is_event_eligible(data)]
+    if not eligible:
         return
 
     spans = data.get("spans", [])
-    for span in spans:
-        detector.visit_span(span)
-
-    detector.on_complete()
+    visitors = [detector.visit_span for detector in eligible]
+    with use_span_records(SpanRecords(spans)):
+        for span in spans:
+            for visit_span in visitors:
+                visit_span(span)
+
+        for detector in eligible:
+            detector.on_complete()
 
 
 # Reports metrics and creates spans for detection
@@ -5,16 +5,18 @@ import logging
 import os
 import re
 import time
+import zlib
 from collections import namedtuple
 from collections.abc import Callable, Collection, Mapping, MutableMapping, Sequence
 from concurrent.futures import ThreadPoolExecutor
-from contextlib import contextmanager
+from contextlib import ExitStack, contextmanager
 from copy import deepcopy
 from datetime import datetime, timedelta, timezone
 from hashlib import sha1
 from typing import Any, Union
 from urllib.parse import urlparse
 
+import msgpack
 import sentry_sdk
 import urllib3
 from dateutil.parser import parse as parse_datetime
@@ -24,6 +26,8 @@ from sentry_sdk import Hub
 from snuba_sdk import MetricsQuery, Request
 from snuba_sdk.legacy import json_to_snql
 
+from sentry import options
+from sentry.locks import locks
 from sentry.models.environment import Environment
 from sentry.models.group import Group
 from sentry.models.grouprelease import GroupRelease
@@ -38,6 +42,7 @@ from sentry.snuba.events import Columns
 from sentry.snuba.referrer import validate_referrer
 from sentry.utils import json, metrics
 from sentry.utils.dates import outside_retention_with_modified_start, to_timestamp
+from sentry.utils.locking import UnableToAcquireLock
 
 logger = logging.getLogger(__name__)
 
@@ -452,6 +457,8 @@ _snuba_pool = connection_from_url(
     maxsize=10,
 )
 _query_thread_pool = ThreadPoolExecutor(max_workers=10)
+# Refreshes stale query cache entries, see `_apply_single_flight_cache`.
+_query_cache_refresh_pool = ThreadPoolExecutor(max_workers=4)
 
 
 epoch_naive = datetime(1970, 1, 1, tzinfo=None)
@@ -928,6 +935,11 @@ def _apply_cache_and_build_results(
 
     results = []
 
+    if use_cache and options.get("snuba.query-cache.single-flight.enabled"):
+        results = _apply_single_flight_cache(query_param_list, headers, referrer)
+        results.sort()
+        return [result[1] for result in results]
+
     if use_cache:
         cache_keys = [get_cache_key(query_params[0]) for _, query_params in query_param_list]
         cache_data = cache.get_many(cache_keys)
@@ -959,6 +971,142 @@ def _apply_cache_and_build_results(
     return [result[1] for result in results]
 
 
+# How long a process may hold the lock for refreshing a cached query.
+QUERY_CACHE_LOCK_DURATION = 30
+
+# Polling interval in seconds while waiting for another process to cache the
+# result of a query.
+QUERY_CACHE_POLL_INTERVAL = 0.05
+
+
+def _get_single_flight_cache_key(query: SnubaQuery) -> str:
+    # Entries are stored in a different format than those of the plain cache.
+    return f"{get_cache_key(query)}:sf"
+
+
+def _get_query_cache_lock(cache_key: str):
+    return locks.get(
+        f"{cache_key}:lock", duration=QUERY_CACHE_LOCK_DURATION, name="snuba_query_cache"
+    )
+
+
+def _set_cached_result(cache_key: str, result: Mapping[str, Any]) -> None:
+    fresh_ttl = settings.SENTRY_SNUBA_CACHE_TTL_SECONDS
+    stale_ttl = options.get("snuba.query-cache.stale-ttl")
+    value = zlib.compress(msgpack.packb([time.time() + fresh_ttl, result]))
+    cache.set(cache_key, value, fresh_ttl + stale_ttl)
+
+
+def _get_cached_result(value: bytes) -> tuple[float, Any]:
+    fresh_until, result = msgpack.unpackb(zlib.decompress(value), strict_map_key=False)
+    return fresh_until, result
+
+
+def _refresh_cached_result(
+    releaser, query_params: RequestQueryBody, cache_key: str, headers: Mapping[str, str]
+) -> None:
+    with releaser:
+        try:
+            result = _bulk_snuba_query([query_params], headers)[0]
+        except Exception:
+            logger.warning("snuba.query_cache.refresh_failed", exc_info=True)
+        else:
+            _set_cached_result(cache_key, result)
+
+
+def _apply_single_flight_cache(
+    query_param_list: list[tuple[int, RequestQueryBody]],
+    headers: Mapping[str, str],
+    referrer: str | None,
+) -> list[tuple[int, Any]]:
+    """
+    Serve queries from the cache, running every query that is not cached at
+    most once across all processes at a time.
+
+    Results are fresh for `SENTRY_SNUBA_CACHE_TTL_SECONDS`, and are served
+    stale for another `snuba.query-cache.stale-ttl` seconds while a single
+    process refreshes them in the background. On a miss, the process that
+    gets the lock for a query runs it, all others wait for its result to
+    show up in the cache.
+    """
+    metric_tags = {"referrer": referrer} if referrer else None
+    cache_keys = [_get_single_flight_cache_key(params[0]) for _, params in query_param_list]
+    cache_data = cache.get_many(cache_keys)
+    now = time.time()
+
+    results: list[tuple[int, Any]] = []
+    to_query: list[tuple[int, RequestQueryBody, str]] = []
+    for (query_pos, query_params), cache_key in zip(query_param_list, cache_keys):
+        cached_value = cache_data.get(cache_key)
+        if cached_value is None:
+            metrics.incr("snuba.query_cache.miss", tags=metric_tags)
+            to_query.append((query_pos, query_params, cache_key))
+            continue
+
+        fresh_until, result = _get_cached_result(cached_value)
+        results.append((query_pos, result))
+        if now < fresh_until:
+            metrics.incr("snuba.query_cache.hit", tags=metric_tags)
+            continue
+
+        metrics.incr("snuba.query_cache.stale", tags=metric_tags)
+        try:
+            releaser = _get_query_cache_lock(cache_key).acquire()
+        except UnableToAcquireLock:
+            # Another process is refreshing the result already.
+            continue
+        _query_cache_refresh_pool.submit(
+            _refresh_cached_result, releaser, query_params, cache_key, headers
+        )
+
+    if not to_query:
+        return results
+
+    waiting: list[tuple[int, RequestQueryBody, str]] = []
+    with ExitStack() as stack:
+        locked = []
+        for item in to_query:
+            try:
+                stack.enter_context(_get_query_cache_lock(item[2]).acquire())
+            except UnableToAcquireLock:
+                waiting.append(item)
+            else:
+                locked.append(item)
+
+        if locked:
+            query_results = _bulk_snuba_query([item[1] for item in locked], headers)
+            for result, (query_pos, _, cache_key) in zip(query_results, locked):
+                _set_cached_result(cache_key, result)
+                results.append((query_pos, result))
+
+    deadline = time.monotonic() + options.get("snuba.query-cache.lock-wait-timeout")
+    while waiting:
+        cache_data = cache.get_many([item[2] for item in waiting])
+        still_waiting = []
+        for item in waiting:
+            cached_value = cache_data.get(item[2])
+            if cached_value is None:
+                still_waiting.append(item)
+            else:
+                results.append((item[0], _get_cached_result(cached_value)[1]))
+        waiting = still_waiting
+
+        if waiting and time.monotonic() + QUERY_CACHE_POLL_INTERVAL > deadline:
+            # The process holding the lock is slow or gone, run the remaining
+            # queries without waiting any longer.
+            metrics.incr("snuba.query_cache.lock_wait_timeout", tags=metric_tags)
+            query_results = _bulk_snuba_query([item[1] for item in waiting], headers)
+            for result, (query_pos, _, cache_key) in zip(query_results, waiting):
+                _set_cached_result(cache_key, result)
+                results.append((query_pos, result))
+            break
+
+        if waiting:
+            time.sleep(QUERY_CACHE_POLL_INTERVAL)
+
+    return results
+
+
 def _bulk_snuba_query(
     snuba_param_list: Sequence[RequestQueryBody],
     headers: Mapping[str, str],
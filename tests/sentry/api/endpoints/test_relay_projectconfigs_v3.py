@@ -49,8 +49,8 @@ def call_endpoint(client, relay, private_key, default_projectkey):
 @pytest.fixture
 def projectconfig_cache_get_mock_config(monkeypatch):
     monkeypatch.setattr(
-        "sentry.relay.projectconfig_cache.backend.get",
-        lambda *args, **kwargs: {"is_mock_config": True},
+        "sentry.relay.projectconfig_cache.backend.get_serialized",
+        lambda *args, **kwargs: json.dumps({"is_mock_config": True}),
     )
 
 
@@ -58,10 +58,10 @@ def projectconfig_cache_get_mock_config(monkeypatch):
 def single_mock_proj_cached(monkeypatch):
     def cache_get(*args, **kwargs):
         if args[0] == "must_exist":
-            return {"is_mock_config": True}
+            return json.dumps({"is_mock_config": True})
         return None
 
-    monkeypatch.setattr("sentry.relay.projectconfig_cache.backend.get", cache_get)
+    monkeypatch.setattr("sentry.relay.projectconfig_cache.backend.get_serialized", cache_get)
 
 
 @pytest.fixture
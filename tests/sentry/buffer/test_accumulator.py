@@ -0,0 +1,75 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.utils import timezone
+
+from sentry.buffer.accumulator import IncrAccumulator, get_accumulator
+from sentry.models.group import Group
+from sentry.models.project import Project
+from sentry.testutils.helpers.options import override_options
+from sentry.utils.arroyo import _initialize_arroyo_subprocess
+
+
+@mock.patch("sentry.buffer.backend")
+def test_coalesces_increments(backend):
+    accumulator = IncrAccumulator(max_delay=60, max_keys=10)
+    now = timezone.now()
+
+    accumulator.incr(Group, {"times_seen": 1}, {"id": 1}, {"last_seen": now})
+    accumulator.incr(Group, {"times_seen": 2}, {"id": 1}, {"last_seen": now + timedelta(1)})
+    accumulator.incr(Group, {"times_seen": 1}, {"id": 2})
+    accumulator.incr(Project, {}, {"id": 1}, signal_only=True)
+    assert backend.incr.call_count == 0
+
+    accumulator.flush()
+    assert backend.incr.mock_calls == [
+        mock.call(
+            Group,
+            {"times_seen": 3},
+            {"id": 1},
+            extra={"last_seen": now + timedelta(1)},
+            signal_only=None,
+        ),
+        mock.call(Group, {"times_seen": 1}, {"id": 2}, extra=None, signal_only=None),
+        mock.call(Project, {}, {"id": 1}, extra=None, signal_only=True),
+    ]
+
+    backend.incr.reset_mock()
+    accumulator.flush()
+    assert backend.incr.call_count == 0
+
+
+@mock.patch("sentry.buffer.backend")
+def test_flushes_when_full(backend):
+    accumulator = IncrAccumulator(max_delay=60, max_keys=2)
+
+    accumulator.incr(Group, {"times_seen": 1}, {"id": 1})
+    accumulator.incr(Group, {"times_seen": 1}, {"id": 1})
+    assert backend.incr.call_count == 0
+
+    accumulator.incr(Group, {"times_seen": 1}, {"id": 2})
+    assert backend.incr.call_count == 2
+
+
+@mock.patch("sentry.buffer.backend")
+def test_flushes_after_delay(backend):
+    accumulator = IncrAccumulator(max_delay=0.1, max_keys=10)
+
+    accumulator.incr(Group, {"times_seen": 1}, {"id": 1})
+    timer = accumulator._timer
+    assert timer is not None
+    timer.join()
+
+    backend.incr.assert_called_once_with(
+        Group, {"times_seen": 1}, {"id": 1}, extra=None, signal_only=None
+    )
+
+
+@override_options({"buffer.accumulate-incr": True})
+@mock.patch("sentry.buffer.accumulator._disabled", False)
+@mock.patch("sentry.runner.configure")
+def test_disabled_in_multiprocessing_workers(configure):
+    assert get_accumulator() is not None
+
+    _initialize_arroyo_subprocess(initializer=None, tags={})
+    assert get_accumulator() is None
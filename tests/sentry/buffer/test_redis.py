@@ -10,6 +10,7 @@ from sentry.buffer.redis import RedisBuffer
 from sentry.models.group import Group
 from sentry.models.project import Project
 from sentry.testutils.helpers.datetime import freeze_time
+from sentry.testutils.helpers.options import override_options
 from sentry.testutils.pytest.fixtures import django_db_all
 from sentry.utils import json
 from sentry.utils.redis import (
@@ -125,6 +126,82 @@ class TestRedisBuffer:
         group = Group.objects.get_from_cache(id=default_group.id)
         assert group.times_seen == orig_times_seen + times_seen_incr
 
+    @django_db_all
+    @freeze_time()
+    def test_process_pending_bulk(self, default_group, default_project):
+        orig_times_seen = Group.objects.get_from_cache(id=default_group.id).times_seen
+        other_group = Group.objects.create(project=default_project)
+        last_seen = timezone.now()
+
+        self.buf.incr(Group, {"times_seen": 2}, {"id": default_group.id}, {"last_seen": last_seen})
+        self.buf.incr(Group, {"times_seen": 3}, {"id": default_group.id}, {"last_seen": last_seen})
+        self.buf.incr(Group, {"times_seen": 1}, {"id": other_group.id}, {"last_seen": last_seen})
+        # Missing groups are skipped
+        self.buf.incr(Group, {"times_seen": 1}, {"id": other_group.id + 1000})
+
+        with override_options({"buffer.bulk-flush": True}), mock.patch(
+            "sentry.buffer.redis.process_incr"
+        ) as process_incr:
+            self.buf.process_pending()
+
+        assert process_incr.apply_async.call_count == 0
+        # The group cache is updated as well
+        group = Group.objects.get_from_cache(id=default_group.id)
+        assert group.times_seen == orig_times_seen + 5
+        assert group.last_seen == last_seen
+        assert Group.objects.get(id=other_group.id).times_seen == other_group.times_seen + 1
+
+        client = get_cluster_routing_client(self.buf.cluster, self.buf.is_redis_cluster)
+        assert client.zrange("b:p", 0, -1) == []
+        assert not client.exists(self.buf._make_key(Group, {"id": default_group.id}))
+
+    @django_db_all
+    def test_process_pending_bulk_id_and_pk(self, default_group):
+        orig_times_seen = Group.objects.get(id=default_group.id).times_seen
+
+        # Both spellings end up in separate buffer keys for the same row
+        self.buf.incr(Group, {"times_seen": 2}, {"id": default_group.id})
+        self.buf.incr(Group, {"times_seen": 3}, {"pk": default_group.id})
+
+        with override_options({"buffer.bulk-flush": True}):
+            self.buf.process_pending()
+
+        assert Group.objects.get(id=default_group.id).times_seen == orig_times_seen + 5
+
+    @django_db_all
+    def test_process_pending_bulk_requeues_failures(self, default_group):
+        self.buf.incr(Group, {"times_seen": 2}, {"id": default_group.id})
+
+        with override_options({"buffer.bulk-flush": True}), mock.patch.object(
+            self.buf, "_bulk_update", side_effect=Exception("boom")
+        ):
+            self.buf.process_pending()
+
+        # The increment is buffered again instead of being lost
+        key = self.buf._make_key(Group, {"id": default_group.id})
+        client = get_cluster_routing_client(self.buf.cluster, self.buf.is_redis_cluster)
+        pending = client.zrange("b:p", 0, -1)
+        if self.buf.is_redis_cluster:
+            assert client.hget(key, "i+times_seen") == "2"
+            assert pending == [key]
+        else:
+            assert client.hget(key, "i+times_seen") == b"2"
+            assert pending == [key.encode("utf-8")]
+
+    @django_db_all
+    @mock.patch("sentry.buffer.base.Buffer.process")
+    def test_process_pending_bulk_falls_back(self, process):
+        model = mock.Mock()
+        model.__name__ = "Mock"
+        self.buf.incr(model, {"times_seen": 1}, {"project_id": 1, "release_id": 2})
+
+        with override_options({"buffer.bulk-flush": True}):
+            self.buf.process_pending()
+
+        process.assert_called_once_with(
+            self.buf, mock.ANY, {"times_seen": 1}, {"project_id": 1, "release_id": 2}, {}, None
+        )
+
     def test_get(self):
         model = mock.Mock()
         model.__name__ = "Mock"
@@ -17,3 +17,13 @@ def test_all_importable(consumer_def, settings):
 
     topic = defn["topic"]
     assert topic.value in settings.KAFKA_TOPIC_TO_CLUSTER
+
+
+def test_post_process_forwarder_batch_time_keeps_fractions():
+    (option,) = (
+        option
+        for option in consumers._POST_PROCESS_FORWARDER_OPTIONS
+        if option.name == "max_batch_time"
+    )
+    assert option.callback is not None
+    assert option.callback(None, option, 250) == 0.25
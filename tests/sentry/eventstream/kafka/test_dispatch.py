@@ -4,9 +4,12 @@ from unittest.mock import Mock, patch
 
 import pytest
 from arroyo.backends.kafka import KafkaPayload
-from arroyo.types import BrokerValue, Message, Partition, Topic
+from arroyo.types import BrokerValue, Message, Partition, Topic, Value
 
-from sentry.eventstream.kafka.dispatch import _get_task_kwargs_and_dispatch
+from sentry.eventstream.kafka.dispatch import (
+    _get_task_kwargs_and_dispatch,
+    _get_task_kwargs_and_dispatch_batch,
+)
 from sentry.utils import json
 
 
@@ -127,3 +130,29 @@ def test_dispatch_task_with_occurrence(mock_post_process_group: Mock) -> None:
         },
         "queue": "post_process_issue_platform",
     }
+
+
+@pytest.mark.django_db
+@patch("sentry.eventstream.kafka.dispatch.post_process_group")
+def test_dispatch_batch(mock_post_process_group: Mock) -> None:
+    partition = Partition(Topic("test"), 0)
+    producer = mock_post_process_group.app.producer_or_acquire.return_value.__enter__.return_value
+
+    message = Message(
+        Value(
+            [
+                BrokerValue(get_kafka_payload(), partition, 1, datetime.now()),
+                BrokerValue(get_occurrence_kafka_payload(), partition, 2, datetime.now()),
+            ],
+            {partition: 3},
+        )
+    )
+    _get_task_kwargs_and_dispatch_batch(message)
+
+    # Both tasks are published with the same producer.
+    assert mock_post_process_group.app.producer_or_acquire.call_count == 1
+    assert mock_post_process_group.apply_async.call_count == 2
+    assert [
+        (call.kwargs["kwargs"]["group_id"], call.kwargs["queue"], call.kwargs["producer"])
+        for call in mock_post_process_group.apply_async.call_args_list
+    ] == [(43, "post_process_errors", producer), (44, "post_process_issue_platform", producer)]
@@ -71,7 +71,7 @@ class FingerprintInput:
         with open(os.path.join(_fingerprint_fixture_path, self.filename)) as f:
             return json.load(f)
 
-    def create_event(self, grouping_config=None):
+    def normalize(self, grouping_config=None):
         input = dict(self.data)
 
         config = FingerprintingRules.from_json(
@@ -82,6 +82,10 @@ class FingerprintInput:
         data = mgr.get_data()
 
         data.setdefault("fingerprint", ["{{ default }}"])
+        return config, data
+
+    def create_event(self, grouping_config=None):
+        config, data = self.normalize(grouping_config)
         apply_server_fingerprinting(data, config)
         event_type = get_event_type(data)
         event_metadata = event_type.get_metadata(data)
@@ -0,0 +1,51 @@
+from sentry.grouping.api import (
+    get_default_grouping_config_dict,
+    get_fingerprinting_config_for_project,
+    get_grouping_config_dict_for_project,
+    load_grouping_config,
+)
+from sentry.testutils.pytest.fixtures import django_db_all
+
+
+def test_load_grouping_config_is_shared():
+    config_dict = get_default_grouping_config_dict()
+
+    config = load_grouping_config(config_dict)
+    assert load_grouping_config(dict(config_dict)) is config
+    assert config.id == config_dict["id"]
+
+    other_id = "legacy:2019-03-12"
+    assert load_grouping_config({**config_dict, "id": other_id}).id == other_id
+
+
+@django_db_all
+def test_fingerprinting_config_follows_project_option(default_project):
+    assert get_fingerprinting_config_for_project(default_project).rules == []
+
+    default_project.update_option(
+        "sentry:fingerprinting_rules", "type:DatabaseUnavailable -> dbunavail"
+    )
+    rules = get_fingerprinting_config_for_project(default_project).rules
+    assert [rule.fingerprint for rule in rules] == [["dbunavail"]]
+    assert get_fingerprinting_config_for_project(default_project).rules is rules
+
+    default_project.update_option("sentry:fingerprinting_rules", "")
+    assert get_fingerprinting_config_for_project(default_project).rules == []
+
+
+@django_db_all
+def test_grouping_enhancements_follow_project_option(default_project):
+    before = get_grouping_config_dict_for_project(default_project)["enhancements"]
+
+    default_project.update_option("sentry:grouping_enhancements", "function:foo -app")
+    after = get_grouping_config_dict_for_project(default_project)["enhancements"]
+
+    assert after != before
+    assert (
+        load_grouping_config(
+            {"id": get_default_grouping_config_dict()["id"], "enhancements": after}
+        )
+        .enhancements.rules[0]
+        .matcher_description
+        == "function:foo -app"
+    )
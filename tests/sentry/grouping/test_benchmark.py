@@ -1,7 +1,27 @@
+"""
+Benchmarks of grouping, run with `pytest-benchmark`:
+
+    pytest tests/sentry/grouping/test_benchmark.py --benchmark-only --benchmark-save=before
+    pytest tests/sentry/grouping/test_benchmark.py --benchmark-only --benchmark-compare
+
+Percentiles of single rounds can be shown with `--benchmark-columns=min,median,max,iqr`, and
+profiles are collected with `--benchmark-cprofile=tottime`. The peak memory allocated by a
+round is stored as `peak_kib` in the extra info of saved runs.
+"""
+
+import copy
+import tracemalloc
+
 import pytest
 
-from sentry.grouping.api import get_default_grouping_config_dict
+from sentry.grouping.api import (
+    apply_server_fingerprinting,
+    get_default_grouping_config_dict,
+    get_grouping_variants_for_event,
+    load_grouping_config,
+)
 from sentry.grouping.strategies.configurations import CONFIGURATIONS
+from tests.sentry.grouping import fingerprint_input as fingerprint_inputs
 from tests.sentry.grouping import grouping_input as grouping_inputs
 
 CONFIGS = {key: get_default_grouping_config_dict(key) for key in sorted(CONFIGURATIONS.keys())}
@@ -16,10 +36,25 @@ def benchmark_available() -> bool:
         return True
 
 
-@pytest.mark.skipif(not benchmark_available(), reason="requires pytest-benchmark")
-@pytest.mark.parametrize(
+requires_benchmark = pytest.mark.skipif(
+    not benchmark_available(), reason="requires pytest-benchmark"
+)
+with_config_name = pytest.mark.parametrize(
     "config_name", sorted(CONFIGURATIONS.keys()), ids=lambda x: x.replace("-", "_")
 )
+
+
+def record_peak_allocations(benchmark, func, *args):
+    tracemalloc.start()
+    try:
+        func(*args)
+        benchmark.extra_info["peak_kib"] = tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+@requires_benchmark
+@with_config_name
 def test_benchmark_grouping(config_name, benchmark):
     config = CONFIGS[config_name]
     input_iter = iter(grouping_inputs)
@@ -28,6 +63,7 @@ def test_benchmark_grouping(config_name, benchmark):
         return (next(input_iter), config), {}
 
     benchmark.pedantic(run_configuration, setup=setup, rounds=len(grouping_inputs))
+    record_peak_allocations(benchmark, run_configuration, grouping_inputs[0], config)
 
 
 def run_configuration(grouping_input, config):
@@ -37,3 +73,40 @@ def run_configuration(grouping_input, config):
     event.project = None
 
     event.get_hashes()
+
+
+@requires_benchmark
+@with_config_name
+def test_benchmark_load_grouping_config(config_name, benchmark):
+    benchmark(load_grouping_config, CONFIGS[config_name])
+
+
+@requires_benchmark
+@with_config_name
+def test_benchmark_grouping_variants(config_name, benchmark):
+    # Events are normalized up front, only computing the variants is measured.
+    events = []
+    for grouping_input in grouping_inputs:
+        config = copy.deepcopy(CONFIGS[config_name])
+        event = grouping_input.create_event(config)
+        event.project = None
+        events.append((event, load_grouping_config(config)))
+    events_iter = iter(events)
+
+    def setup():
+        return next(events_iter), {}
+
+    benchmark.pedantic(get_grouping_variants_for_event, setup=setup, rounds=len(events))
+    record_peak_allocations(benchmark, get_grouping_variants_for_event, *events[0])
+
+
+@requires_benchmark
+def test_benchmark_fingerprinting(benchmark):
+    inputs = [fingerprint_input.normalize() for fingerprint_input in fingerprint_inputs]
+    inputs_iter = iter(inputs)
+
+    def setup():
+        rules, data = next(inputs_iter)
+        return (copy.deepcopy(data), rules), {}
+
+    benchmark.pedantic(apply_server_fingerprinting, setup=setup, rounds=len(inputs))
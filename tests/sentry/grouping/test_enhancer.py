@@ -6,6 +6,7 @@ import pytest
 
 from sentry.grouping.component import GroupingComponent
 from sentry.grouping.enhancer import Enhancements
+from sentry.grouping.enhancer.compiled import CompiledRules
 from sentry.grouping.enhancer.exceptions import InvalidEnhancerConfig
 from sentry.grouping.enhancer.matchers import create_match_frame
 from sentry.testutils.pytest.fixtures import django_db_all
@@ -489,3 +490,62 @@ def test_app_no_matches(frame):
     enhancements = Enhancements.from_config_string("app:no +app")
     enhancements.apply_modifications_to_frame([frame], "native", {})
     assert frame.get("in_app")
+
+
+def test_compiled_rules_match_like_rules():
+    enhancements = Enhancements.from_config_string(
+        """
+        function:foo                        +group
+        function:foo module:bar             -group
+        function:b*                         ^-group
+        !function:foo path:**/src/*.py      +prefix
+        [ function:foo ] | function:baz     +sentinel
+        function:baz | [ function:qux ]     -sentinel
+        family:native error.type:*Error     v+group
+        """
+    )
+    compiled = CompiledRules(enhancements.rules)
+
+    frames = [
+        {"function": "foo", "module": "bar"},
+        {"function": "baz", "abs_path": "/app/src/baz.py"},
+        {"function": "qux"},
+        {"function": "foo", "platform": "native"},
+    ]
+    match_frames = [create_match_frame(frame, "python") for frame in frames]
+
+    for exception_data in [{}, {"type": "ValueError"}]:
+        expected = [
+            (rule, positions)
+            for rule in enhancements.rules
+            if (
+                positions := sorted(
+                    {
+                        idx
+                        for idx, _ in rule.get_matching_frame_actions(
+                            match_frames, exception_data, {}
+                        )
+                    }
+                )
+            )
+        ]
+        assert list(compiled.iter_matches(match_frames, exception_data, {})) == expected
+        # Frames are matched from the frame cache the second time around.
+        assert list(compiled.iter_matches(match_frames, exception_data, {})) == expected
+
+
+def test_compiled_rules_see_previous_modifications():
+    enhancements = Enhancements.from_config_string(
+        """
+        function:foo    +app
+        app:yes         category=bar
+        category:bar    -app
+        """
+    )
+
+    frames: list[dict[str, Any]] = [{"function": "foo"}, {"function": "other"}]
+    enhancements.apply_modifications_to_frame(frames, "python", {})
+
+    assert frames[0]["in_app"] is False
+    assert frames[0]["data"]["category"] == "bar"
+    assert not frames[1].get("in_app")
@@ -1,11 +1,12 @@
 import uuid
+from concurrent.futures import Future
 from datetime import datetime, timedelta
 from typing import Any
 from unittest import mock
 
 import msgpack
 from arroyo.backends.kafka import KafkaPayload
-from arroyo.types import BrokerValue, Message, Partition, Topic
+from arroyo.types import BrokerValue, Message, Partition, Topic, Value
 from django.conf import settings
 from django.test.utils import override_settings
 
@@ -14,7 +15,11 @@ from sentry.constants import ObjectStatus
 from sentry.db.models import BoundedPositiveIntegerField
 from sentry.models.environment import Environment
 from sentry.monitors.constants import TIMEOUT, PermitCheckInStatus
-from sentry.monitors.consumers.monitor_consumer import StoreMonitorCheckInStrategyFactory
+from sentry.monitors.consumers import monitor_consumer
+from sentry.monitors.consumers.monitor_consumer import (
+    StoreMonitorCheckInStrategyFactory,
+    process_batch,
+)
 from sentry.monitors.models import (
     CheckInStatus,
     Monitor,
@@ -30,6 +35,15 @@ from sentry.utils.locking.manager import LockManager
 from sentry.utils.outcomes import Outcome
 from sentry.utils.services import build_instance_from_options
 
+
+def _submit_inline(fn, *args):
+    # Check-in groups are processed in this thread, others can not see the
+    # data of the test.
+    future: Future = Future()
+    future.set_result(fn(*args))
+    return future
+
+
 locks = LockManager(build_instance_from_options(settings.SENTRY_POST_PROCESS_LOCKS_BACKEND_OPTIONS))
 
 
@@ -48,13 +62,14 @@ class MonitorConsumerTest(TestCase):
             **kwargs,
         )
 
-    def send_checkin(
+    def make_checkin_value(
         self,
         monitor_slug: str,
         guid: str | None = None,
         ts: datetime | None = None,
+        offset: int = 1,
         **overrides: Any,
-    ) -> None:
+    ) -> BrokerValue[KafkaPayload]:
         if ts is None:
             ts = datetime.now()
 
@@ -79,19 +94,27 @@ class MonitorConsumerTest(TestCase):
             "sdk": "test/1.0",
         }
 
-        commit = mock.Mock()
-        partition = Partition(Topic("test"), 0)
-        StoreMonitorCheckInStrategyFactory().create_with_partitions(commit, {partition: 0}).submit(
-            Message(
-                BrokerValue(
-                    KafkaPayload(b"fake-key", msgpack.packb(wrapper), []),
-                    partition,
-                    1,
-                    ts,
-                )
-            )
+        return BrokerValue(
+            KafkaPayload(b"fake-key", msgpack.packb(wrapper), []),
+            Partition(Topic("test"), 0),
+            offset,
+            ts,
         )
 
+    def send_checkin(
+        self,
+        monitor_slug: str,
+        guid: str | None = None,
+        ts: datetime | None = None,
+        **overrides: Any,
+    ) -> None:
+        value = self.make_checkin_value(monitor_slug, guid, ts, **overrides)
+
+        commit = mock.Mock()
+        StoreMonitorCheckInStrategyFactory().create_with_partitions(
+            commit, {value.partition: 0}
+        ).submit(Message(value))
+
     def send_clock_pulse(
         self,
         ts: datetime | None = None,
@@ -407,6 +430,78 @@ class MonitorConsumerTest(TestCase):
             checkins = MonitorCheckIn.objects.filter(monitor_id=monitor.id)
             assert len(checkins) == 3
 
+    @mock.patch.object(monitor_consumer._checkin_worker, "submit", side_effect=_submit_inline)
+    @mock.patch("sentry.monitors.consumers.monitor_consumer.try_monitor_tasks_trigger")
+    def test_process_batch(self, try_monitor_tasks_trigger, submit):
+        now = datetime.now().replace(second=0, microsecond=0)
+        monitor = self._create_monitor(slug="my-monitor")
+        other_monitor = self._create_monitor(slug="other-monitor")
+        MonitorEnvironment.objects.ensure_environment(self.project, monitor, "production")
+
+        values = [
+            self.make_checkin_value("my-monitor", ts=now, offset=1),
+            self.make_checkin_value(
+                "my-monitor", ts=now + timedelta(seconds=1), offset=2, status="in_progress"
+            ),
+            self.make_checkin_value("my-monitor", ts=now + timedelta(seconds=2), offset=3),
+            self.make_checkin_value(
+                "other-monitor", ts=now + timedelta(seconds=3), offset=4, environment="dev"
+            ),
+        ]
+
+        with mock.patch(
+            "sentry.monitors.consumers.monitor_consumer.CHECKIN_QUOTA_LIMIT", 2
+        ), mock.patch(
+            "sentry.ratelimits.backend.is_limited_many",
+            wraps=monitor_consumer.ratelimits.backend.is_limited_many,
+        ) as is_limited_many:
+            process_batch(Message(Value(values, {})))
+
+        # Rate limits were checked in a single call, the third check-in of
+        # my-monitor was dropped.
+        assert is_limited_many.call_count == 1
+        checkins = MonitorCheckIn.objects.filter(monitor_id=monitor.id).order_by("date_added")
+        assert [checkin.status for checkin in checkins] == [
+            CheckInStatus.OK,
+            CheckInStatus.IN_PROGRESS,
+        ]
+        assert MonitorEnvironment.objects.filter(monitor=monitor).count() == 1
+
+        other_checkin = MonitorCheckIn.objects.get(monitor_id=other_monitor.id)
+        assert other_checkin.monitor_environment.get_environment().name == "dev"
+
+        monitor_environment = MonitorEnvironment.objects.get(monitor=monitor)
+        assert monitor_environment.status == MonitorStatus.OK
+        assert monitor_environment.last_checkin == checkins[1].date_added
+
+        try_monitor_tasks_trigger.assert_called_once_with(values[-1].timestamp, 0)
+
+    @mock.patch.object(monitor_consumer._checkin_worker, "submit", side_effect=_submit_inline)
+    @mock.patch("sentry.monitors.consumers.monitor_consumer.try_monitor_tasks_trigger")
+    def test_process_batch_monitor_prefetch_fails(self, try_monitor_tasks_trigger, submit):
+        now = datetime.now().replace(second=0, microsecond=0)
+        monitor = self._create_monitor(slug="my-monitor")
+        values = [
+            self.make_checkin_value("my-monitor", ts=now + timedelta(seconds=i), offset=i + 1)
+            for i in range(3)
+        ]
+
+        with mock.patch(
+            "sentry.monitors.consumers.monitor_consumer.CHECKIN_QUOTA_LIMIT", 2
+        ), mock.patch(
+            "sentry.monitors.consumers.monitor_consumer._prefetch_monitors",
+            side_effect=Exception("boom"),
+        ), mock.patch(
+            "sentry.ratelimits.backend.is_limited",
+            wraps=monitor_consumer.ratelimits.backend.is_limited,
+        ) as is_limited:
+            process_batch(Message(Value(values, {})))
+
+        # The rate limits of the batch are kept, check-ins are not counted
+        # a second time.
+        assert is_limited.call_count == 0
+        assert MonitorCheckIn.objects.filter(monitor_id=monitor.id).count() == 2
+
     def test_invalid_guid_environment_match(self):
         monitor = self._create_monitor(slug="my-monitor")
         self.send_checkin(monitor.slug, status="in_progress")
@@ -1,3 +1,4 @@
+import base64
 import pickle
 from datetime import timedelta
 from unittest import mock
@@ -8,6 +9,8 @@ from django.utils import timezone
 from sentry.nodestore.base import json_dumps
 from sentry.nodestore.django.backend import DjangoNodeStorage
 from sentry.nodestore.django.models import Node
+from sentry.nodestore.encoding import is_encoded_node
+from sentry.testutils.helpers.options import override_options
 from sentry.testutils.pytest.fixtures import django_db_all
 from sentry.testutils.silo import region_silo_test
 from sentry.utils.strings import compress
@@ -56,6 +59,21 @@ class TestDjangoNodeStorage:
             b'{"foo":"bar"}'
         )
 
+    @region_silo_test
+    def test_set_binary_encoding(self):
+        with override_options({"nodestore.use-binary-encoding": True}):
+            self.ns.set("d2502ebbd7df41ceba8d3275595cac33", {"foo": "bar"})
+
+        # Binary encoded nodes are compressed already and only base64 encoded.
+        data = Node.objects.get(id="d2502ebbd7df41ceba8d3275595cac33").data
+        assert is_encoded_node(base64.b64decode(data))
+
+        self.ns._delete_cache_item("d2502ebbd7df41ceba8d3275595cac33")
+        assert self.ns.get("d2502ebbd7df41ceba8d3275595cac33") == {"foo": "bar"}
+        assert self.ns.get_multi(["d2502ebbd7df41ceba8d3275595cac33"]) == {
+            "d2502ebbd7df41ceba8d3275595cac33": {"foo": "bar"}
+        }
+
     @region_silo_test
     def test_delete(self):
         node = Node.objects.create(id="d2502ebbd7df41ceba8d3275595cac33", data=b'{"foo": "bar"}')
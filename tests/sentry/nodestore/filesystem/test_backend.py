@@ -0,0 +1,115 @@
+import os
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+import pytest
+
+from sentry.nodestore.filesystem.backend import (
+    FileSystemNodeStorage,
+    SegmentStore,
+    decode_index_records,
+    encode_index_record,
+)
+
+
+@pytest.fixture
+def ns(tmp_path):
+    ns = FileSystemNodeStorage(path=str(tmp_path), partition_seconds=3600, shards=4)
+    ns.bootstrap()
+    return ns
+
+
+def test_index_records():
+    data = encode_index_record("a" * 32, 10, 20) + encode_index_record("b" * 32, 30, 40)
+
+    records, consumed = decode_index_records(data)
+    assert [r[1:] for r in records] == [("a" * 32, 10, 20), ("b" * 32, 30, 40)]
+    assert consumed == len(data)
+
+    # Incomplete records are left for later
+    records, consumed = decode_index_records(data[:-1])
+    assert [r[1:] for r in records] == [("a" * 32, 10, 20)]
+    assert consumed == len(data) // 2
+
+
+def test_overwrite_and_delete(ns):
+    ns.set("node_1", {"foo": "a"})
+    ns.set("node_1", {"foo": "b"})
+    assert ns.get("node_1") == {"foo": "b"}
+
+    ns.delete("node_1")
+    assert ns.get("node_1") is None
+
+
+def test_writes_from_other_processes(ns):
+    other = SegmentStore(ns.path, partition_seconds=3600, shards=4)
+
+    ns.set("node_1", {"foo": "a"})
+    assert other.get("node_1") == b'{"foo":"a"}'
+
+    other.set("node_1", b'{"foo":"b"}')
+    other.set("node_2", b'{"foo":"c"}')
+    assert ns.get("node_1") == {"foo": "b"}
+    assert ns.get("node_2") == {"foo": "c"}
+
+    other.delete("node_2")
+    assert ns.get("node_2") is None
+
+
+def test_cleanup_drops_partitions(ns):
+    now = datetime.now(timezone.utc)
+
+    with mock.patch("time.time", return_value=(now - timedelta(hours=3)).timestamp()):
+        ns.set("old", {"foo": "a"})
+    ns.set("new", {"foo": "b"})
+    assert len(os.listdir(ns.path)) == 2
+
+    ns.cleanup(now - timedelta(hours=1))
+
+    assert len(os.listdir(ns.path)) == 1
+    assert ns.get("old") is None
+    assert ns.get("new") == {"foo": "b"}
+
+
+def test_id_too_long(ns):
+    with pytest.raises(ValueError):
+        ns.set("a" * 256, {"foo": "a"})
+
+    # Nothing is written for the rejected node
+    assert os.listdir(ns.path) == []
+
+    ns.set("a" * 255, {"foo": "a"})
+    assert ns.get("a" * 255) == {"foo": "a"}
+
+
+def test_misses_do_not_scan(ns):
+    ns.set("node_1", {"foo": "a"})
+    ns.get("node_1")
+
+    with mock.patch.object(ns.store, "_scan") as scan:
+        assert ns.get("missing_1") is None
+        assert ns.get("missing_2") is None
+    assert scan.call_count == 0
+
+
+def test_legacy_nodes(ns):
+    with open(ns.legacy_path("legacy_1"), "wb") as f:
+        f.write(b'{"foo":"a"}')
+    with open(ns.legacy_path("legacy_2"), "wb") as f:
+        f.write(b'{"foo":"b"}')
+    ns.set("node_1", {"foo": "c"})
+
+    assert ns.get("legacy_1") == {"foo": "a"}
+    assert ns.get_multi(["legacy_2", "node_1", "missing"]) == {
+        "legacy_2": {"foo": "b"},
+        "node_1": {"foo": "c"},
+        "missing": None,
+    }
+
+    ns.delete("legacy_1")
+    assert ns.get("legacy_1") is None
+    assert not os.path.exists(ns.legacy_path("legacy_1"))
+
+    ns.cleanup(datetime.now(timezone.utc) + timedelta(seconds=1))
+    assert not os.path.exists(ns.legacy_path("legacy_2"))
+    assert ns.get("legacy_2") is None
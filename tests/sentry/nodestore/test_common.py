@@ -3,10 +3,14 @@ Testsuite of backend-independent nodestore tests. Add your backend to the
 `ns` fixture to have it tested.
 """
 from contextlib import nullcontext
+from unittest import mock
 
 import pytest
 
 from sentry.nodestore.django.backend import DjangoNodeStorage
+from sentry.nodestore.encoding import is_encoded_node
+from sentry.nodestore.filesystem.backend import FileSystemNodeStorage
+from sentry.testutils.helpers.options import override_options
 from sentry.testutils.silo import region_silo_test
 from tests.sentry.nodestore.bigtable.test_backend import (
     MockedBigtableNodeStorage,
@@ -15,14 +19,20 @@ from tests.sentry.nodestore.bigtable.test_backend import (
 
 
 @pytest.fixture(
-    params=["bigtable-mocked", "bigtable-real", pytest.param("django", marks=pytest.mark.django_db)]
+    params=[
+        "bigtable-mocked",
+        "bigtable-real",
+        pytest.param("django", marks=pytest.mark.django_db),
+        "filesystem",
+    ]
 )
-def ns(request):
+def ns(request, tmp_path):
     # backends are returned from context managers to support teardown when required
     backends = {
         "bigtable-mocked": lambda: nullcontext(MockedBigtableNodeStorage(project="test")),
         "bigtable-real": lambda: get_temporary_bigtable_nodestorage(),
         "django": lambda: nullcontext(DjangoNodeStorage()),
+        "filesystem": lambda: nullcontext(FileSystemNodeStorage(path=str(tmp_path))),
     }
 
     ctx = backends[request.param]()
@@ -42,6 +52,36 @@ def test_get_multi(ns):
     assert result == {n[0]: n[1] for n in nodes}
 
 
+@region_silo_test
+def test_get_multi_iter(ns):
+    nodes = {f"node_{i}": {"foo": i} for i in range(5)}
+    for node_id, data in nodes.items():
+        ns.set(node_id, data)
+
+    ns.set_subkeys("node_0", {None: {"foo": 0}, "other": {"foo": "b"}})
+
+    result = ns.get_multi_iter([*nodes, "missing"], chunk_size=2)
+    assert {node_id: data for node_id, data in result if data is not None} == nodes
+
+    result = ns.get_multi_iter(["node_0", "node_1"], subkey="other", chunk_size=1)
+    assert {node_id: data for node_id, data in result if data is not None} == {
+        "node_0": {"foo": "b"}
+    }
+
+
+@region_silo_test
+def test_get_multi_decodes_without_instance(ns):
+    nodes = {f"node_{i}": {"foo": i} for i in range(5)}
+    for node_id, data in nodes.items():
+        ns.set(node_id, data)
+    ns._delete_cache_items(list(nodes))
+
+    # Backends are thread local, accessing them from a decoding thread would
+    # initialize them again.
+    with mock.patch.object(type(ns), "__init__", side_effect=AssertionError):
+        assert ns.get_multi(list(nodes)) == nodes
+
+
 @region_silo_test
 def test_set(ns):
     node_id = "d2502ebbd7df41ceba8d3275595cac33"
@@ -97,3 +137,23 @@ def test_set_subkeys(ns):
     ns.delete("node_1")
     assert ns.get("node_1") is None
     assert ns.get("node_1", subkey="other") is None
+
+
+@region_silo_test
+def test_binary_encoding(ns):
+    ns.set_subkeys("node_1", {None: {"foo": "a"}, "other": {"foo": "b"}})
+
+    with override_options({"nodestore.use-binary-encoding": True}):
+        ns.set_subkeys("node_2", {None: {"foo": "c"}, "other": {"foo": "d"}})
+        assert is_encoded_node(ns.get_bytes("node_2"))
+
+        # Nodes written in the legacy encoding remain readable
+        assert ns.get("node_1", subkey="other") == {"foo": "b"}
+
+    assert ns.get("node_2") == {"foo": "c"}
+    assert ns.get("node_2", subkey="other") == {"foo": "d"}
+    assert ns.get("node_2", subkey="missing") is None
+    assert ns.get_multi(["node_1", "node_2"], subkey="other") == {
+        "node_1": {"foo": "b"},
+        "node_2": {"foo": "d"},
+    }
@@ -0,0 +1,72 @@
+import pytest
+import zstandard
+
+from sentry.nodestore.encoding import (
+    MAGIC,
+    NodeEncodingError,
+    decode_node,
+    encode_node,
+    is_encoded_node,
+    read_section_table,
+)
+from sentry.utils import json
+
+
+def test_roundtrip():
+    value = encode_node({None: {"foo": "a"}, "unprocessed": {"foo": "b"}})
+
+    assert is_encoded_node(value)
+    assert decode_node(value) == {"foo": "a"}
+    assert decode_node(value, subkey="unprocessed") == {"foo": "b"}
+    assert decode_node(value, subkey="missing") is None
+
+
+def test_legacy_payloads_are_not_encoded_nodes():
+    assert not is_encoded_node(b'{"foo":"bar"}')
+    assert not is_encoded_node(b"\x80\x03}q\x00.")
+    assert not is_encoded_node(b"")
+
+
+def test_section_table():
+    value = encode_node({None: {"foo": "a"}, "unprocessed": {"foo": "b"}})
+    table, start = read_section_table(value)
+
+    assert set(table) == {b"", b"unprocessed"}
+    dict_id, offset, length = table[b"unprocessed"]
+    assert dict_id == 0
+    section = value[start + offset : start + offset + length]
+    assert json.loads(zstandard.decompress(section)) == {"foo": "b"}
+
+
+def test_default_subkey_required():
+    with pytest.raises(NodeEncodingError):
+        encode_node({"unprocessed": {}})
+
+
+def test_truncated():
+    value = encode_node({None: {"foo": "a"}})
+
+    with pytest.raises(NodeEncodingError):
+        decode_node(MAGIC)
+
+    with pytest.raises(NodeEncodingError):
+        decode_node(value[:-1])
+
+
+def test_dictionary():
+    samples = [
+        json.dumps(
+            {"event_id": f"{i:032x}", "platform": "python", "tags": [["level", "error"]]}
+        ).encode("utf8")
+        for i in range(1000)
+    ]
+    dictionary = zstandard.train_dictionary(1024, samples)
+    value = encode_node({None: {"platform": "python"}}, dictionary=dictionary)
+
+    assert read_section_table(value)[0][b""][0] == dictionary.dict_id()
+    assert decode_node(value, dictionaries={dictionary.dict_id(): dictionary}) == {
+        "platform": "python"
+    }
+
+    with pytest.raises(NodeEncodingError):
+        decode_node(value)
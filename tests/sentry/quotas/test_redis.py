@@ -5,9 +5,10 @@ from unittest import mock
 import pytest
 
 from sentry.constants import DataCategory
-from sentry.quotas.base import QuotaConfig, QuotaScope
+from sentry.quotas.base import QuotaConfig, QuotaScope, bump_quota_config_version
 from sentry.quotas.redis import RedisQuota, is_rate_limited
 from sentry.testutils.cases import TestCase
+from sentry.testutils.helpers.options import override_options
 from sentry.testutils.silo import region_silo_test
 from sentry.utils.redis import clusters
 
@@ -322,6 +323,28 @@ class RedisQuotaTest(TestCase):
         assert quotas[2].limit == 15
         assert quotas[2].window == 60
 
+    @override_options({"quotas.config-cache.ttl": 60})
+    def test_config_cache(self):
+        self.get_project_quota.return_value = (200, 60)
+        self.get_organization_quota.return_value = (300, 60)
+        key = self.create_project_key(project=self.project)
+
+        quotas = self.quota.get_quotas(self.project, keys=[key])
+        assert [quota.to_json() for quota in self.quota.get_quotas(self.project, keys=[key])] == [
+            quota.to_json() for quota in quotas
+        ]
+        assert self.get_project_quota.call_count == 1
+
+        # Other keys of the project are cached separately.
+        self.quota.get_quotas(self.project)
+        assert self.get_project_quota.call_count == 2
+
+        self.get_project_quota.return_value = (100, 60)
+        bump_quota_config_version(self.organization.id)
+        quotas = self.quota.get_quotas(self.project, keys=[key])
+        assert self.get_project_quota.call_count == 3
+        assert quotas[0].limit == 100
+
     @mock.patch("sentry.quotas.redis.is_rate_limited")
     @mock.patch.object(RedisQuota, "get_quotas", return_value=[])
     def test_bails_immediately_without_any_quota(self, get_quotas, is_rate_limited):
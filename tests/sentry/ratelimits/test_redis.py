@@ -21,6 +21,21 @@ class RedisRateLimiterTest(TestCase):
             assert not self.backend.is_limited("foo", 1)
             assert self.backend.is_limited("foo", 1)
 
+    def test_is_limited_many(self):
+        with freeze_time("2000-01-01"):
+            assert self.backend.is_limited_many([("foo", 1), ("bar", 2), ("foo", 1)]) == [
+                False,
+                False,
+                True,
+            ]
+            assert self.backend.is_limited_many([("bar", 2), ("bar", 2)], window=60) == [
+                False,
+                True,
+            ]
+            assert not self.backend.is_limited("foo", 5)
+            assert self.backend.current_value("foo") == 3
+            assert self.backend.is_limited_many([]) == []
+
     def test_correct_current_value(self):
         """Ensure that current_value get the correct value after the counter in incremented"""
 
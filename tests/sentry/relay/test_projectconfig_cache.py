@@ -1,8 +1,13 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from unittest import mock
 
+import zstandard
+
 from sentry.relay.projectconfig_cache import redis
+from sentry.testutils.helpers.options import override_options
 from sentry.testutils.pytest.fixtures import django_db_all
-from sentry.utils import metrics
+from sentry.utils import json, metrics
 
 
 def test_delete_count(monkeypatch):
@@ -24,3 +29,122 @@ def test_read_write():
     my_key = "fake-dsn-1"
     cache.set_many({my_key: "my-value"})
     assert cache.get(my_key) == "my-value"
+
+
+@django_db_all
+def test_get_serialized():
+    cache = redis.RedisProjectConfigCache()
+    cache.set_many({"a": {"version": 1}})
+
+    with mock.patch.object(cache.cluster_read, "get", wraps=cache.cluster_read.get) as get:
+        assert json.loads(cache.get_serialized("a")) == {"version": 1}
+        assert json.loads(cache.get_serialized("a")) == {"version": 1}
+        assert cache.get_serialized("b") is None
+        assert cache.get_serialized("b") is None
+        # Configs are cached locally, missing ones are not.
+        assert get.call_count == 3
+
+        # Writes and deletes of the same process are visible immediately.
+        cache.set_many({"a": {"version": 2}})
+        assert json.loads(cache.get_serialized("a")) == {"version": 2}
+        cache.delete_many(["a"])
+        assert cache.get_serialized("a") is None
+
+
+@django_db_all
+def test_get_serialized_coalesces_reads():
+    cache = redis.RedisProjectConfigCache()
+    cache.set_many({"a": {"version": 1}})
+
+    read = cache.cluster_read.get
+    release = threading.Event()
+
+    def blocking_read(key):
+        release.wait()
+        return read(key)
+
+    with mock.patch.object(
+        cache.cluster_read, "get", side_effect=blocking_read
+    ) as get, ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(cache.get_serialized, "a") for _ in range(4)]
+        release.set()
+        assert [json.loads(future.result()) for future in futures] == [{"version": 1}] * 4
+
+    assert get.call_count == 1
+
+
+@django_db_all
+def test_get_serialized_pending_read_timeout():
+    cache = redis.RedisProjectConfigCache()
+    cache.set_many({"a": {"version": 1}})
+
+    # A concurrent read of the same key that never completes.
+    cache._local_pending["a"] = Future()
+
+    with mock.patch.object(redis, "LOCAL_PENDING_TIMEOUT", 0.01), mock.patch.object(
+        cache.cluster_read, "get", wraps=cache.cluster_read.get
+    ) as get:
+        assert json.loads(cache.get_serialized("a")) == {"version": 1}
+        assert get.call_count == 1
+
+
+@django_db_all
+def test_get_serialized_without_local_cache():
+    cache = redis.RedisProjectConfigCache(local_cache_ttl=0)
+    cache.set_many({"a": {"version": 1}})
+
+    with mock.patch.object(cache.cluster_read, "get", wraps=cache.cluster_read.get) as get:
+        assert json.loads(cache.get_serialized("a")) == {"version": 1}
+        assert json.loads(cache.get_serialized("a")) == {"version": 1}
+        assert get.call_count == 2
+
+
+def _make_configs(count):
+    return {
+        f"key-{i}": {
+            "projectId": i,
+            "disabled": False,
+            "config": {
+                "allowedDomains": ["*"],
+                "filterSettings": {"browserExtensions": {"isEnabled": i % 2 == 0}},
+                "quotas": [{"id": f"quota-{i}", "limit": i * 10, "window": 60}],
+            },
+        }
+        for i in range(count)
+    }
+
+
+@django_db_all
+def test_compression_dictionary():
+    cache = redis.RedisProjectConfigCache(local_cache_ttl=0)
+    configs = _make_configs(500)
+    cache.set_many({"plain": configs["key-1"]})
+
+    dict_id = cache.rotate_compression_dictionary(configs.values())
+    assert dict_id is not None
+
+    with override_options({"relay.projectconfig-cache.compression-dictionary": True}):
+        cache.set_many(configs)
+
+    # Configs compressed with and without the dictionary can be read.
+    raw = cache.cluster.get("relayconfig:key-1")
+    assert zstandard.get_frame_parameters(raw).dict_id == dict_id
+    assert cache.get("key-1") == configs["key-1"]
+    assert json.loads(cache.get_serialized("key-1")) == configs["key-1"]
+    assert cache.get("plain") == configs["key-1"]
+
+    # The previous dictionary is kept around for configs that were compressed with it.
+    new_dict_id = cache.rotate_compression_dictionary(list(configs.values())[:400])
+    assert new_dict_id not in (None, dict_id)
+    assert cache.cluster.ttl(f"relayconfig-dictionary:{dict_id}") > 0
+    assert cache.get("key-1") == configs["key-1"]
+
+    # Configs are treated as missing if their dictionary expired.
+    cache.cluster.delete(f"relayconfig-dictionary:{dict_id}")
+    assert redis.RedisProjectConfigCache().get("key-1") is None
+
+
+@django_db_all
+def test_compression_dictionary_not_enough_samples():
+    cache = redis.RedisProjectConfigCache()
+    assert cache.rotate_compression_dictionary([{"a": 1}]) is None
@@ -12,6 +12,7 @@ from sentry.replays.usecases.ingest.dom_index import (
     _parse_classes,
     encode_as_uuid,
     get_user_actions,
+    iter_segment_events,
     log_canvas_size,
     parse_replay_actions,
 )
@@ -240,9 +241,9 @@ def test_parse_replay_actions():
     assert replay_actions["replay_id"] == "1"
     assert replay_actions["project_id"] == 1
     assert replay_actions["retention_days"] == 30
-    assert isinstance(replay_actions["payload"], list)
+    assert isinstance(replay_actions["payload"], bytes)
 
-    payload = json.loads(bytes(replay_actions["payload"]))
+    payload = json.loads(replay_actions["payload"])
     assert payload["type"] == "replay_actions"
     assert payload["replay_id"] == "1"
     assert len(payload["clicks"]) == 1
@@ -391,9 +392,9 @@ def test_parse_replay_dead_click_actions(patch_rage_click_issue_with_replay_even
     assert replay_actions["replay_id"] == "1"
     assert replay_actions["project_id"] == default_project.id
     assert replay_actions["retention_days"] == 30
-    assert isinstance(replay_actions["payload"], list)
+    assert isinstance(replay_actions["payload"], bytes)
 
-    payload = json.loads(bytes(replay_actions["payload"]))
+    payload = json.loads(replay_actions["payload"])
     assert payload["type"] == "replay_actions"
     assert payload["replay_id"] == "1"
     assert len(payload["clicks"]) == 3
@@ -519,9 +520,9 @@ def test_parse_replay_rage_click_actions(default_project):
     assert replay_actions["replay_id"] == "1"
     assert replay_actions["project_id"] == default_project.id
     assert replay_actions["retention_days"] == 30
-    assert isinstance(replay_actions["payload"], list)
+    assert isinstance(replay_actions["payload"], bytes)
 
-    payload = json.loads(bytes(replay_actions["payload"]))
+    payload = json.loads(replay_actions["payload"])
     assert payload["type"] == "replay_actions"
     assert payload["replay_id"] == "1"
     assert len(payload["clicks"]) == 1
@@ -837,7 +838,7 @@ def test_parse_replay_rage_clicks_with_replay_event(
     assert replay_actions["replay_id"] == "1"
     assert replay_actions["project_id"] == default_project.id
     assert replay_actions["retention_days"] == 30
-    assert isinstance(replay_actions["payload"], list)
+    assert isinstance(replay_actions["payload"], bytes)
 
 
 def test_log_sdk_options():
@@ -977,3 +978,43 @@ def test_log_canvas_size():
 
     # No events.
     log_canvas_size(1, 1, "a", [])
+
+
+def test_iter_segment_events():
+    events = [
+        {"type": 4, "data": {"href": "https://sentry.io"}, "timestamp": 1},
+        {
+            "type": 2,
+            "data": {
+                "node": {
+                    "type": 0,
+                    "childNodes": [
+                        {"type": 5, "textContent": '"]}{["', "id": 2},
+                        {"type": 2, "tagName": "div", "attributes": {"id": "a"}, "id": 3},
+                    ],
+                    "id": 1,
+                },
+            },
+            "timestamp": 2,
+        },
+        {"type": 3, "data": {"source": 0, "adds": [{"type": 5}]}, "timestamp": 3},
+        {"type": 3, "data": {"source": 9, "id": 4, "commands": []}, "timestamp": 4},
+        {"type": 5, "data": {"tag": "breadcrumb", "payload": {"message": '\\"'}}, "timestamp": 5},
+        {"timestamp": 6, "type": 2, "data": {}},
+    ]
+
+    # Snapshots are skipped unless their type could not be determined.
+    expected = [events[3], events[4], events[5]]
+    assert list(iter_segment_events(json.dumps(events).encode())) == expected
+    assert list(iter_segment_events(json.dumps(events, indent=2).encode())) == expected
+
+    assert list(iter_segment_events(b" [ ] ")) == []
+
+
+@pytest.mark.parametrize(
+    "segment",
+    [b"", b"{}", b"[1]", b'[{"type": 5}', b'[{"type": 5},', b'[{"type": 5} {"type": 5}]'],
+)
+def test_iter_segment_events_invalid(segment):
+    with pytest.raises(ValueError):
+        list(iter_segment_events(segment))
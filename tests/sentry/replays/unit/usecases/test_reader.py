@@ -0,0 +1,85 @@
+import uuid
+import zlib
+from unittest import mock
+
+import pytest
+
+from sentry.replays.lib.storage import RecordingSegmentStorageMeta
+from sentry.replays.usecases import reader
+from sentry.replays.usecases.reader import decompress, download_segments, iter_decompressed
+from sentry.utils import json
+
+
+@pytest.fixture(autouse=True)
+def clear_segment_cache():
+    reader._segment_cache.clear()
+    yield
+    reader._segment_cache.clear()
+
+
+def _make_segment(segment_id: int) -> RecordingSegmentStorageMeta:
+    return RecordingSegmentStorageMeta(
+        project_id=1,
+        replay_id=uuid.uuid4().hex,
+        segment_id=segment_id,
+        retention_days=30,
+    )
+
+
+def test_iter_decompressed():
+    data = json.dumps([{"type": 2, "data": str(i)} for i in range(10000)]).encode()
+
+    compressed = zlib.compress(data)
+    chunks = list(iter_decompressed(compressed))
+    assert len(chunks) > 1
+    assert b"".join(chunks) == decompress(compressed) == data
+
+    # Highly compressible segments are still streamed in bounded chunks.
+    data = b"[" + b" " * (10 * reader.DECOMPRESS_CHUNK_SIZE) + b"]"
+    chunks = list(iter_decompressed(zlib.compress(data)))
+    assert max(len(chunk) for chunk in chunks) <= reader.DECOMPRESS_CHUNK_SIZE
+    assert b"".join(chunks) == data
+
+    # Uncompressed segments are returned as is.
+    assert list(iter_decompressed(data)) == [data]
+
+
+def test_download_segments():
+    segments = [_make_segment(i) for i in range(10)]
+    stored = {
+        segment.segment_id: zlib.compress(json.dumps([{"segment_id": segment.segment_id}]).encode())
+        for segment in segments
+    }
+    # Missing segments are returned as an empty list.
+    stored.pop(5)
+
+    with mock.patch.object(
+        reader,
+        "download_compressed_segment",
+        side_effect=lambda segment, span: stored.get(segment.segment_id),
+    ) as download:
+        response = b"".join(download_segments(segments))
+        assert download.call_count == 10
+
+        expected = [[] if i == 5 else [{"segment_id": i}] for i in range(10)]
+        assert json.loads(response) == expected
+
+        # Decompressed segments are served from the cache.
+        assert b"".join(download_segments(segments)) == response
+        assert download.call_count == 11
+
+
+def test_download_segments_bounded_prefetch():
+    segments = [_make_segment(i) for i in range(10)]
+
+    with mock.patch.object(reader, "download_compressed_segment", return_value=b"[]") as download:
+        stream = download_segments(segments)
+        assert next(stream) == b"["
+        assert next(stream) == b"[]"
+        assert download.call_count <= reader.DOWNLOAD_PREFETCH + 1
+
+        # Segments that were not downloaded yet are dropped with the stream.
+        stream.close()
+        assert download.call_count <= reader.DOWNLOAD_PREFETCH + 1
+
+    assert b"".join(download_segments([])) == b"[]"
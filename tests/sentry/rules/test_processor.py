@@ -16,6 +16,7 @@ from sentry.models.rulefirehistory import RuleFireHistory
 from sentry.notifications.types import ActionTargetType
 from sentry.rules import init_registry
 from sentry.rules.conditions import EventCondition
+from sentry.rules.conditions.event_frequency import EventFrequencyQueryBatch
 from sentry.rules.filters.base import EventFilter
 from sentry.rules.processor import RuleProcessor
 from sentry.testutils.cases import TestCase
@@ -457,6 +458,62 @@ class RuleProcessorTestFilters(TestCase):
             results = list(rp.apply())
             assert len(results) == 0
 
+    @patch(
+        "sentry.constants._SENTRY_RULES",
+        MOCK_SENTRY_RULES_WITH_FILTERS
+        + ("sentry.rules.conditions.event_frequency.EventFrequencyCondition",),
+    )
+    def test_filter_fails_skips_frequency_batch(self):
+        frequency_data = {
+            "id": "sentry.rules.conditions.event_frequency.EventFrequencyCondition",
+            "value": 1,
+            "interval": "1h",
+        }
+        Rule.objects.filter(project=self.group_event.project).delete()
+        ProjectOwnership.objects.create(project_id=self.project.id, fallthrough=True)
+        rejected_rule = Rule.objects.create(
+            project=self.group_event.project,
+            data={
+                "conditions": [
+                    frequency_data,
+                    {"id": "tests.sentry.rules.test_processor.MockFilterFalse"},
+                ],
+                "actions": [EMAIL_ACTION_DATA],
+            },
+        )
+        passing_rule = Rule.objects.create(
+            project=self.group_event.project,
+            data={
+                "conditions": [
+                    {**frequency_data, "interval": "1d"},
+                    {"id": "tests.sentry.rules.test_processor.MockFilterTrue"},
+                ],
+                "actions": [EMAIL_ACTION_DATA],
+            },
+        )
+        with patch("sentry.rules.processor.rules", init_registry()), patch(
+            "sentry.rules.conditions.event_frequency.EventFrequencyCondition.batch_query_hook",
+            return_value={self.group_event.group.id: 5},
+        ) as batch_query_hook:
+            rp = RuleProcessor(
+                self.group_event,
+                is_new=False,
+                is_regression=True,
+                is_new_group_environment=True,
+                has_reappeared=True,
+                frequency_batch=EventFrequencyQueryBatch(),
+            )
+            results = list(rp.apply())
+
+        assert len(results) == 1
+        _, futures = results[0]
+        assert [future.rule for future in futures] == [passing_rule]
+        # Only the window of the rule that passed its filter is queried.
+        (call,) = batch_query_hook.call_args_list
+        _, start, end, _ = call.args
+        assert end - start == timedelta(days=1)
+        assert not RuleFireHistory.objects.filter(rule=rejected_rule).exists()
+
     def test_no_filters(self):
         # setup an alert rule with 1 conditions and no filters that passes
         Rule.objects.filter(project=self.group_event.project).delete()
@@ -14,7 +14,7 @@ from sentry.sentry_metrics.configuration import (
     GENERIC_METRICS_SCHEMA_VALIDATION_RULES_OPTION_NAME,
     RELEASE_HEALTH_SCHEMA_VALIDATION_RULES_OPTION_NAME,
 )
-from sentry.sentry_metrics.consumers.indexer.batch import IndexerBatch
+from sentry.sentry_metrics.consumers.indexer.batch import IndexerBatch, StepTimer
 from sentry.sentry_metrics.consumers.indexer.common import BrokerMeta
 from sentry.sentry_metrics.consumers.indexer.processing import INGEST_CODEC
 from sentry.sentry_metrics.consumers.indexer.schema_validator import MetricsSchemaValidator
@@ -2065,3 +2065,33 @@ def test_cardinality_limiter(caplog, settings):
             ],
         )
     ]
+
+
+def test_step_timer():
+    timer = StepTimer("metrics_consumer.step")
+    with patch("sentry.sentry_metrics.consumers.indexer.batch.metrics.timing") as timing, patch(
+        "sentry.sentry_metrics.consumers.indexer.batch.time.monotonic", side_effect=[1, 2, 5, 7]
+    ):
+        for _ in range(2):
+            with timer():
+                pass
+        timer.report()
+
+    timing.assert_called_once_with(
+        "metrics_consumer.step.batch_total", 3.0, tags={"result": "success"}
+    )
+
+
+def test_step_timer_failure():
+    timer = StepTimer("metrics_consumer.step")
+    with patch("sentry.sentry_metrics.consumers.indexer.batch.metrics.timing") as timing, patch(
+        "sentry.sentry_metrics.consumers.indexer.batch.time.monotonic", side_effect=[1, 2, 5, 7]
+    ):
+        with timer():
+            pass
+        with pytest.raises(ValueError), timer():
+            raise ValueError
+
+    timing.assert_called_once_with(
+        "metrics_consumer.step.batch_total", 3.0, tags={"result": "failure"}
+    )
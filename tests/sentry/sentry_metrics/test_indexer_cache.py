@@ -1,9 +1,14 @@
 from datetime import datetime, timedelta
+from unittest import mock
 
 import pytest
 from django.conf import settings
 
-from sentry.sentry_metrics.indexer.cache import StringIndexerCache
+from sentry.sentry_metrics.indexer.cache import (
+    CachingIndexer,
+    LocalStringIndexerCache,
+    StringIndexerCache,
+)
 from sentry.sentry_metrics.use_case_id_registry import UseCaseID
 from sentry.testutils.helpers.options import override_options
 from sentry.utils.cache import cache
@@ -239,3 +244,93 @@ def test_is_valid_timestamp() -> None:
 
     assert not indexer_cache._is_valid_timestamp(str(stale_ts))
     assert indexer_cache._is_valid_timestamp(str(new_ts))
+
+
+def test_local_cache_lru() -> None:
+    local_cache = LocalStringIndexerCache(ttl=60, max_bytes=1000)
+    local_cache.set_many({f"sessions:1:{i}": i for i in range(3)})
+    assert local_cache.get_many(["sessions:1:0", "sessions:1:3"]) == {"sessions:1:0": 0}
+
+    # Least recently used entries are evicted once the size limit is exceeded.
+    local_cache.set_many({f"sessions:1:{i}": i for i in range(3, 10)})
+    assert local_cache.size <= 1000
+    results = local_cache.get_many([f"sessions:1:{i}" for i in range(10)])
+    assert "sessions:1:1" not in results
+    assert "sessions:1:9" in results
+
+    with mock.patch("time.monotonic", return_value=10**10):
+        assert local_cache.get_many(["sessions:1:9"]) == {}
+    assert local_cache.size < 1000
+
+    local_cache.clear()
+    assert local_cache.size == 0
+
+
+def test_cache_local_cache(use_case_id: str) -> None:
+    local_indexer_cache = StringIndexerCache(
+        **settings.SENTRY_STRING_INDEXER_CACHE_OPTIONS,
+        partition_key=_PARTITION_KEY,
+        local_cache_ttl=60,
+    )
+    with override_options(
+        {
+            "sentry-metrics.indexer.read-new-cache-namespace": False,
+            "sentry-metrics.indexer.write-new-cache-namespace": False,
+        }
+    ):
+        cache.clear()
+        namespace = "test"
+        values = {f"{use_case_id}:100:hello": 2, f"{use_case_id}:100:bye": 3}
+        local_indexer_cache.set_many(namespace, values)
+
+        # Served from the local cache without hitting the shared cache.
+        cache.clear()
+        assert local_indexer_cache.get_many(namespace, values.keys()) == values
+        assert local_indexer_cache.get(namespace, f"{use_case_id}:100:hello") == 2
+        assert local_indexer_cache.get("other", f"{use_case_id}:100:hello") is None
+
+        # Hits of the shared cache are kept locally.
+        indexer_cache.set(namespace, f"{use_case_id}:100:hey", 4)
+        assert local_indexer_cache.get_many(namespace, [f"{use_case_id}:100:hey"]) == {
+            f"{use_case_id}:100:hey": 4
+        }
+        cache.clear()
+        assert local_indexer_cache.get(namespace, f"{use_case_id}:100:hey") == 4
+
+        local_indexer_cache.delete_many(namespace, list(values.keys()))
+        assert local_indexer_cache.get_many(namespace, values.keys()) == {
+            f"{use_case_id}:100:hello": None,
+            f"{use_case_id}:100:bye": None,
+        }
+
+
+def test_caching_indexer_reverse_resolve() -> None:
+    local_indexer_cache = StringIndexerCache(
+        **settings.SENTRY_STRING_INDEXER_CACHE_OPTIONS,
+        partition_key=_PARTITION_KEY,
+        local_cache_ttl=60,
+    )
+    indexer = mock.Mock()
+    indexer.reverse_resolve.return_value = "hello"
+    indexer.bulk_reverse_resolve.side_effect = lambda use_case_id, org_id, ids: {
+        id: f"string-{id}" for id in ids if id != 3
+    }
+    caching_indexer = CachingIndexer(local_indexer_cache, indexer)
+
+    for _ in range(2):
+        assert caching_indexer.reverse_resolve(UseCaseID.SESSIONS, 1, 1) == "hello"
+    assert indexer.reverse_resolve.call_count == 1
+
+    assert caching_indexer.bulk_reverse_resolve(UseCaseID.SESSIONS, 1, [1, 2, 3]) == {
+        1: "hello",
+        2: "string-2",
+    }
+    indexer.bulk_reverse_resolve.assert_called_once_with(UseCaseID.SESSIONS, 1, [2, 3])
+
+    assert caching_indexer.bulk_reverse_resolve(UseCaseID.SESSIONS, 1, [1, 2]) == {
+        1: "hello",
+        2: "string-2",
+    }
+    assert indexer.bulk_reverse_resolve.call_count == 1
+    assert caching_indexer.reverse_resolve(UseCaseID.SESSIONS, 2, 1) == "hello"
+    assert indexer.reverse_resolve.call_count == 2
@@ -1,11 +1,16 @@
 from collections.abc import Mapping
+from unittest import mock
 
 from sentry.sentry_metrics.configuration import UseCaseKey
 from sentry.sentry_metrics.indexer.base import FetchType, Metadata, UseCaseKeyCollection
 from sentry.sentry_metrics.indexer.cache import CachingIndexer
+from sentry.sentry_metrics.indexer.postgres import postgres_v2
+from sentry.sentry_metrics.indexer.postgres.bloom import BloomFilter
+from sentry.sentry_metrics.indexer.postgres.models import StringIndexer
 from sentry.sentry_metrics.indexer.postgres.postgres_v2 import PGStringIndexerV2, indexer_cache
 from sentry.sentry_metrics.use_case_id_registry import UseCaseID
 from sentry.testutils.cases import TestCase
+from sentry.testutils.helpers.options import override_options
 from sentry.utils.cache import cache
 
 
@@ -41,3 +46,91 @@ class PostgresIndexerV2Test(TestCase):
         )
 
         assert indexer_cache.get("br", key) is None
+
+    @override_options({"sentry-metrics.indexer.postgres.skip-reads-for-unseen-strings": True})
+    def test_bulk_record_skip_reads_for_unseen_strings(self):
+        indexer = PGStringIndexerV2()
+        org_id = self.org2.id
+        indexer.bulk_record({self.use_case_id: {org_id: {"hello"}}})
+
+        seen_strings = BloomFilter(100, 2**10, 3)
+        with mock.patch.object(postgres_v2, "seen_strings", seen_strings), mock.patch.object(
+            postgres_v2, "SEEN_STRINGS_WARMUP", 0
+        ), mock.patch.object(indexer, "_get_db_records", wraps=indexer._get_db_records) as reads:
+            results = indexer.bulk_record({self.use_case_id: {org_id: {"hello", "hey"}}})
+            # Both strings are unseen, "hello" is only read after conflicting.
+            assert reads.call_count == 1
+
+            meta = results.get_fetch_metadata()[self.use_case_id][org_id]
+            assert meta["hello"].fetch_type == FetchType.DB_READ
+            assert meta["hey"].fetch_type == FetchType.FIRST_SEEN
+            assert results[self.use_case_id][org_id]["hello"] == indexer.resolve(
+                self.use_case_id, org_id, "hello"
+            )
+
+            # Seen strings are read before inserting.
+            reads.reset_mock()
+            results = indexer.bulk_record({self.use_case_id: {org_id: {"hello", "hey"}}})
+            assert reads.call_count == 1
+            meta = results.get_fetch_metadata()[self.use_case_id][org_id]
+            assert_fetch_type_for_tag_string_set(meta, FetchType.DB_READ, {"hello", "hey"})
+
+    @override_options(
+        {
+            "sentry-metrics.indexer.postgres.skip-reads-for-unseen-strings": True,
+            "sentry-metrics.writes-limiter.limits.releasehealth.per-org": [
+                {"window_seconds": 3600, "granularity_seconds": 60, "limit": 3}
+            ],
+        }
+    )
+    def test_bulk_record_unseen_strings_do_not_use_write_quota(self):
+        indexer = PGStringIndexerV2()
+        org_id = self.org2.id
+        for string in ("hello", "hey", "hej"):
+            StringIndexer.objects.create(organization_id=org_id, string=string)
+
+        def bulk_record(strings):
+            results = indexer.bulk_record({self.use_case_id: {org_id: strings}})
+            return results.get_fetch_metadata()[self.use_case_id][org_id]
+
+        with mock.patch.object(postgres_v2, "SEEN_STRINGS_WARMUP", 0):
+            with mock.patch.object(postgres_v2, "seen_strings", BloomFilter(100, 2**10, 3)):
+                # Without room for all unseen strings, they are read first,
+                # and only the new one is subject to the limit.
+                meta = bulk_record({"hello", "hey", "hej", "hi"})
+                assert_fetch_type_for_tag_string_set(
+                    meta, FetchType.DB_READ, {"hello", "hey", "hej"}
+                )
+                assert meta["hi"].fetch_type == FetchType.FIRST_SEEN
+
+            with mock.patch.object(postgres_v2, "seen_strings", BloomFilter(100, 2**10, 3)):
+                # With room for all of them, they are inserted right away,
+                # and only the one that is created uses up quota.
+                meta = bulk_record({"hello", "howdy"})
+                assert meta["hello"].fetch_type == FetchType.DB_READ
+                assert meta["howdy"].fetch_type == FetchType.FIRST_SEEN
+
+                meta = bulk_record({"hey", "hola"})
+                assert meta["hey"].fetch_type == FetchType.DB_READ
+                assert meta["hola"].fetch_type == FetchType.FIRST_SEEN
+
+                # "hi", "howdy" and "hola" used up the quota.
+                meta = bulk_record({"hallo"})
+                assert meta["hallo"].fetch_type == FetchType.RATE_LIMITED
+
+
+def test_bloom_filter():
+    bloom = BloomFilter(capacity=3, num_bits=2**10, num_hashes=3)
+    bloom.add("a")
+    bloom.add("b")
+    assert "a" in bloom
+    assert "b" in bloom
+    assert "c" not in bloom
+    assert len(bloom) == 2
+
+    # The filter starts over once it is full.
+    bloom.add("c")
+    bloom.add("d")
+    assert "d" in bloom
+    assert "a" not in bloom
+    assert len(bloom) == 1
@@ -45,6 +45,29 @@ class RedisScriptMinHashIndexBackendTestCase(TestCase):
         result = self.index.export("example", [("index", 2)], timestamp=timestamp)
         assert len(result) == 1
 
+    def test_record_multi(self):
+        timestamp = int(time.time())
+        self.index.record("example", "1", [("index", "hello world")], timestamp=timestamp)
+        self.index.record_multi(
+            "example",
+            [
+                ("2", [("index", "hello world")], timestamp),
+                ("3", [("index", "pizza world")], timestamp - 60),
+                ("4", [], timestamp),
+            ],
+            timestamp=timestamp,
+        )
+
+        results = self.index.compare("example", "1", [("index", 0)], timestamp=timestamp)
+        assert [key for key, _ in results] == ["1", "2", "3"]
+        assert results[1] == ("2", [1.0])
+
+        # Records are exported the same way as if they were recorded one by one.
+        self.index.record("example", "5", [("index", "pizza world")], timestamp=timestamp - 60)
+        r3 = msgpack.unpackb(self.index.export("example", [("index", 3)], timestamp=timestamp)[0])
+        r5 = msgpack.unpackb(self.index.export("example", [("index", 5)], timestamp=timestamp)[0])
+        assert r3[0] == r5[0]
+
     def test_basic(self):
         self.index.record("example", "1", [("index", "hello world")])
         self.index.record("example", "2", [("index", "hello world")])
@@ -24,3 +24,12 @@ def test_signatures() -> None:
     estimation = results[True] / float(sum(results.values()))
 
     assert similarity == pytest.approx(estimation, 0.1)
+
+
+def test_signatures_bytes_and_duplicates() -> None:
+    get_signature = MinHashSignatureBuilder(16, 0xFFFF)
+    features = ["foo", "bar", "baz"]
+    expected = get_signature(features)
+    assert get_signature([f.encode("utf8") for f in features]) == expected
+    assert get_signature(features * 3) == expected
+    assert get_signature(reversed(features)) == expected
@@ -9,6 +9,7 @@ from sentry.snuba import discover
 from sentry.snuba.dataset import Dataset
 from sentry.testutils.cases import SnubaTestCase, TestCase
 from sentry.testutils.helpers.datetime import before_now, iso_format
+from sentry.testutils.helpers.options import override_options
 from sentry.utils.samples import load_data
 
 ARRAY_COLUMNS = ["measurements", "span_op_breakdowns"]
@@ -89,6 +90,65 @@ class TimeseriesQueryTest(TimeseriesBase):
                 rollup=1800,
             )
 
+    @override_options({"snuba.timeseries-cache.discover.enabled": True})
+    def test_bucket_cache(self):
+        def timeseries_query():
+            return discover.timeseries_query(
+                selected_columns=["count()"],
+                query="",
+                referrer="test_discover_query",
+                params={
+                    "start": self.day_ago - timedelta(minutes=30),
+                    "end": before_now(),
+                    "project_id": [self.project.id],
+                },
+                rollup=3600,
+            )
+
+        with override_options({"snuba.timeseries-cache.discover.enabled": False}):
+            expected = timeseries_query().data["data"]
+
+        assert timeseries_query().data["data"] == expected
+        with patch(
+            "sentry.snuba.discover.bulk_snql_query", wraps=discover.bulk_snql_query
+        ) as query:
+            # Only the partial first bucket and the buckets that are not
+            # closed yet are queried.
+            assert timeseries_query().data["data"] == expected
+            (requests, _), _ = query.call_args
+            assert len(requests) == 2
+
+    @override_options({"snuba.timeseries-cache.discover.enabled": True})
+    def test_bucket_cache_all_cached(self):
+        def timeseries_query(start, end):
+            return discover.timeseries_query(
+                selected_columns=["count()"],
+                query="",
+                referrer="test_discover_query",
+                params={"start": start, "end": end, "project_id": [self.project.id]},
+                rollup=3600,
+            )
+
+        timeseries_query(self.day_ago - timedelta(hours=1), before_now())
+
+        # A past range within the one above only needs its partial first
+        # bucket queried, and nothing at all if it starts on a bucket.
+        for start, requests in (
+            (self.day_ago - timedelta(minutes=30), 1),
+            (self.day_ago, 0),
+        ):
+            end = self.day_ago + timedelta(hours=3)
+            with override_options({"snuba.timeseries-cache.discover.enabled": False}):
+                expected = timeseries_query(start, end).data
+
+            with patch(
+                "sentry.snuba.discover.bulk_snql_query", wraps=discover.bulk_snql_query
+            ) as query:
+                result = timeseries_query(start, end).data
+                assert result["data"] == expected["data"]
+                assert result["meta"] == expected["meta"]
+                assert sum(len(args[0]) for args, _ in query.call_args_list) == requests
+
     def test_field_alias(self):
         result = discover.timeseries_query(
             selected_columns=["p95()"],
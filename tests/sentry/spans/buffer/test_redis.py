@@ -1,22 +1,40 @@
-from unittest import mock
-
 from sentry.spans.buffer.redis import RedisSpansBuffer, get_redis_client
 
 
 class TestRedisSpansBuffer:
-    def test_first_span_in_segment_calls_expire(self):
+    def test_first_span_in_segment_sets_ttl(self):
         buffer = RedisSpansBuffer()
-        with mock.patch.object(buffer, "client", new=get_redis_client()) as mock_client:
-            mock_client.expire = mock.Mock()
-
-            buffer.write_span("bar", "foo", b"span data")
-            mock_client.expire.assert_called_once_with("segment:foo:bar:process-segment", 300)
+        assert buffer.write_span("bar", "foo", b"span data")
+        assert 0 < get_redis_client().ttl("segment:foo:bar:process-segment") <= 300
 
     def test_ttl_not_set_repeatedly(self):
         buffer = RedisSpansBuffer()
+        client = get_redis_client()
         buffer.write_span("bar", "foo", b"span data")
-        with mock.patch.object(buffer, "client", new=get_redis_client()) as mock_client:
-            mock_client.expire = mock.Mock()
-            buffer.write_span("bar", "foo", b"other span data")
+        client.expire("segment:foo:bar:process-segment", 100)
+
+        assert not buffer.write_span("bar", "foo", b"other span data")
+        assert client.ttl("segment:foo:bar:process-segment") <= 100
+
+    def test_batch_write_spans(self):
+        buffer = RedisSpansBuffer()
+        buffer.write_span(1, "a", b"a1")
+
+        new_segments = buffer.batch_write_spans(
+            [(1, "a", b"a2"), (1, "b", b"b1"), (2, "a", b"a1"), (1, "b", b"b2")]
+        )
+
+        assert new_segments == [(1, "b"), (2, "a")]
+        assert buffer.read_segment(1, "a") == ["a1", "a2"]
+        assert buffer.read_segment(1, "b") == ["b1", "b2"]
+        assert buffer.read_segment(2, "a") == ["a1"]
+        assert buffer.batch_write_spans([]) == []
+
+    def test_iter_segment_in_chunks(self):
+        buffer = RedisSpansBuffer()
+        spans = [str(i) for i in range(7)]
+        buffer.batch_write_spans([(1, "foo", span.encode()) for span in spans])
 
-            mock_client.expire.assert_not_called
+        assert list(buffer.iter_segment(1, "foo", chunk_size=3)) == spans
+        assert list(buffer.iter_segment(1, "foo", chunk_size=7)) == spans
+        assert list(buffer.iter_segment(1, "missing", chunk_size=3)) == []
@@ -324,3 +324,61 @@ def test_moving_average_relative_change_detector(
 
     assert all_regressed == [payloads[i] for i in regressed_indices]
     assert all_improved == [payloads[i] for i in improved_indices]
+
+
+def test_moving_average_relative_change_detector_bulk_update():
+    now = datetime(2023, 8, 31, 11, 28, 52, tzinfo=timezone.utc)
+
+    detector = MovingAverageRelativeChangeDetector(
+        "transaction",
+        "endpoint",
+        min_data_points=6,
+        moving_avg_short_factory=lambda: ExponentialMovingAverage(2 / 21),
+        moving_avg_long_factory=lambda: ExponentialMovingAverage(2 / 41),
+        threshold=0.1,
+    )
+
+    series = [
+        [1 for _ in range(10)] + [2 for _ in range(10)],
+        [2 for _ in range(10)] + [1 for _ in range(10)],
+        [(i / 10) ** 2 for i in range(-10, 10)],
+    ]
+    raw_states: list[Mapping[str | bytes, bytes | float | int | str]] = [{} for _ in series]
+    # states that can not be parsed or are newer than the payload are ignored
+    raw_states.append({MovingAverageDetectorState.FIELD_COUNT: "invalid"})
+    raw_states.append(
+        MovingAverageDetectorState(
+            timestamp=now + timedelta(days=1), count=1, moving_avg_short=1, moving_avg_long=1
+        ).to_redis_dict()
+    )
+    series.extend([[3 for _ in range(20)], [4 for _ in range(20)]])
+
+    expected_states = list(raw_states)
+
+    for hour in range(20):
+        payloads = [
+            DetectorPayload(
+                project_id=1,
+                group=i,
+                fingerprint=str(i),
+                count=hour + 1,
+                value=values[hour],
+                timestamp=now + timedelta(hours=hour + 1),
+            )
+            for i, values in enumerate(series)
+        ]
+
+        results = detector.bulk_update(raw_states, payloads)
+        for i, payload in enumerate(payloads):
+            expected = detector.update(expected_states[i], payload)
+            assert results[i] == expected
+
+            state = expected[2]
+            if state is not None:
+                expected_states[i] = state.to_redis_dict()
+        raw_states = [
+            raw_state if state is None else state.to_redis_dict()
+            for raw_state, (_, _, state) in zip(raw_states, results)
+        ]
+
+    assert results[4] == (TrendType.Skipped, 0, None)
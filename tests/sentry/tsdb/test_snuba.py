@@ -1,7 +1,9 @@
 from datetime import datetime, timedelta, timezone
+from unittest import mock
 
 from sentry.constants import DataCategory
 from sentry.testutils.cases import OutcomesSnubaTest
+from sentry.testutils.helpers.options import override_options
 from sentry.tsdb.base import TSDBModel
 from sentry.tsdb.snuba import SnubaTSDB
 from sentry.utils.dates import to_timestamp
@@ -332,6 +334,42 @@ class SnubaTSDBTest(OutcomesSnubaTest):
                 if time not in [floor_func(self.start_time), floor_func(self.one_day_later)]:
                     assert count == 0
 
+    @override_options({"snuba.timeseries-cache.tsdb.enabled": True})
+    def test_project_outcomes_bucket_cache(self):
+        for timestamp in (self.start_time, self.one_day_later, self.now):
+            self.store_outcomes(
+                {
+                    "org_id": self.organization.id,
+                    "project_id": self.project.id,
+                    "outcome": Outcome.ACCEPTED.value,
+                    "category": DataCategory.ERROR,
+                    "timestamp": timestamp,
+                },
+                2,
+            )
+
+        def get_range():
+            return self.db.get_range(
+                TSDBModel.project_total_received,
+                [self.project.id],
+                self.start_time,
+                self.now,
+                3600,
+                tenant_ids={"referrer": "tests", "organization_id": 1},
+            )
+
+        with override_options({"snuba.timeseries-cache.tsdb.enabled": False}):
+            expected = get_range()
+
+        assert get_range() == expected
+        with mock.patch.object(self.db, "get_data", wraps=self.db.get_data) as get_data:
+            # Closed buckets are served from the cache.
+            assert get_range() == expected
+            # `get_data` is bound to the model and keys, and called with
+            # the start, end and rollup of the range to query.
+            (_, _, start, _, _), _ = get_data.call_args
+            assert start > self.one_day_later
+
     def test_key_outcomes(self):
         project_key = self.create_project_key(project=self.project)
         other_project = self.create_project(organization=self.organization)
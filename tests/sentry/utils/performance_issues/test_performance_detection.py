@@ -14,21 +14,26 @@ from sentry.issues.grouptype import (
 )
 from sentry.testutils.cases import TestCase
 from sentry.testutils.helpers import override_options
-from sentry.testutils.performance_issues.event_generators import get_event
+from sentry.testutils.performance_issues.event_generators import EVENTS, get_event
 from sentry.testutils.silo import no_silo_test, region_silo_test
 from sentry.utils.performance_issues.base import (
     DETECTOR_TYPE_TO_GROUP_TYPE,
     DetectorType,
+    SpanRecords,
+    get_span_duration,
     total_span_time,
+    use_span_records,
 )
 from sentry.utils.performance_issues.detectors.n_plus_one_db_span_detector import (
     NPlusOneDBSpanDetector,
 )
 from sentry.utils.performance_issues.performance_detection import (
+    DETECTOR_CLASSES,
     EventPerformanceProblem,
     _detect_performance_problems,
     detect_performance_problems,
     get_detection_settings,
+    run_detectors_on_data,
 )
 from sentry.utils.performance_issues.performance_problem import PerformanceProblem
 
@@ -493,6 +498,41 @@ class PerformanceDetectionTest(TestCase):
         pre_checked_keys = ["sdk_name", "is_early_adopter", "browser_name", "uncompressed_assets"]
         assert not any([v for k, v in tags.items() if k not in pre_checked_keys])
 
+    def test_single_walk_matches_walking_per_detector(self):
+        settings = get_detection_settings(self.project.id)
+        for event_name in EVENTS:
+            event = get_event(event_name)
+            detectors = [detector_class(settings, event) for detector_class in DETECTOR_CLASSES]
+            run_detectors_on_data(detectors, event)
+
+            for detector in detectors:
+                expected = type(detector)(settings, event)
+                if expected.is_event_eligible(event):
+                    for span in event.get("spans", []):
+                        expected.visit_span(span)
+                    expected.on_complete()
+                assert detector.stored_problems == expected.stored_problems, event_name
+
+
+@no_silo_test
+class SpanRecordsTest(unittest.TestCase):
+    def test_span_records(self):
+        spans = [
+            {"span_id": "a", "start_timestamp": 1, "timestamp": 1.5},
+            {"span_id": "b", "start_timestamp": 1, "timestamp": 3},
+            {"span_id": "a", "start_timestamp": 2, "timestamp": 2},
+        ]
+        records = SpanRecords(spans)
+        assert records.get_span("a") is spans[0]
+        assert records.get_span("c") is None
+
+        with use_span_records(records):
+            assert get_span_duration(spans[1]).total_seconds() == 2
+            # Spans of other events are not part of the records.
+            assert get_span_duration({"start_timestamp": 1, "timestamp": 4}).total_seconds() == 3
+
+        assert records.durations[0].total_seconds() == 0.5
+
 
 @no_silo_test
 class DetectorTypeToGroupTypeTest(unittest.TestCase):
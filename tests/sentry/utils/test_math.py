@@ -69,3 +69,13 @@ def test_exponential_moving_average(sequence, expected):
     for i, x in enumerate(sequence):
         t = avg.update(i, t, x)
     assert t == pytest.approx(expected, abs=1e-3)
+
+
+def test_exponential_moving_average_bulk_update():
+    avg = ExponentialMovingAverage(2 / 11)
+    ns = [0, 1, 5, 0]
+    avgs = [0.0, 1.0, 3.5, 2.0]
+    values = [4.0, 2.0, 1.5, 7.0]
+    assert avg.bulk_update(ns, avgs, values) == [
+        avg.update(n, a, value) for n, a, value in zip(ns, avgs, values)
+    ]
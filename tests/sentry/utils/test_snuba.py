@@ -1,8 +1,11 @@
+import time
 import unittest
 from datetime import datetime, timedelta, timezone
 from unittest import mock
 
 import pytest
+from django.conf import settings
+from django.core.cache import cache
 from django.utils import timezone as django_timezone
 from urllib3 import HTTPConnectionPool
 from urllib3.exceptions import HTTPError, ReadTimeoutError
@@ -12,11 +15,15 @@ from sentry.models.project import Project
 from sentry.models.release import Release
 from sentry.snuba.dataset import Dataset
 from sentry.testutils.cases import TestCase
+from sentry.testutils.helpers.options import override_options
 from sentry.utils.snuba import (
     ROUND_UP,
     RetrySkipTimeout,
     SnubaQueryParams,
     UnqualifiedQueryError,
+    _apply_cache_and_build_results,
+    _get_query_cache_lock,
+    _get_single_flight_cache_key,
     _prepare_query_params,
     get_json_type,
     get_query_params_to_update_for_projects,
@@ -440,3 +447,56 @@ def test_retries():
         snuba_pool.urlopen("POST", "/query", body="{}")
 
     assert connection_mock.request.call_count == 1
+
+
+@override_options({"snuba.query-cache.single-flight.enabled": True})
+class SingleFlightQueryCacheTest(TestCase):
+    query = {"dataset": "events", "query": "single-flight"}
+
+    def setUp(self):
+        super().setUp()
+        self.cache_key = _get_single_flight_cache_key(self.query)
+        cache.delete(self.cache_key)
+
+    def run_query(self):
+        return _apply_cache_and_build_results(
+            [(self.query, lambda x: x, lambda x: x)], use_cache=True
+        )
+
+    @mock.patch("sentry.utils.snuba._bulk_snuba_query", return_value=[{"data": [{"count": 1}]}])
+    def test_miss_and_hit(self, bulk_query):
+        assert self.run_query() == [{"data": [{"count": 1}]}]
+        assert self.run_query() == [{"data": [{"count": 1}]}]
+        assert bulk_query.call_count == 1
+
+    @mock.patch("sentry.utils.snuba._query_cache_refresh_pool")
+    @mock.patch("sentry.utils.snuba._bulk_snuba_query")
+    def test_stale_while_revalidate(self, bulk_query, refresh_pool):
+        refresh_pool.submit.side_effect = lambda func, *args: func(*args)
+        bulk_query.return_value = [{"data": [{"count": 1}]}]
+        assert self.run_query() == [{"data": [{"count": 1}]}]
+
+        bulk_query.return_value = [{"data": [{"count": 2}]}]
+        with mock.patch(
+            "sentry.utils.snuba.time.time",
+            return_value=time.time() + settings.SENTRY_SNUBA_CACHE_TTL_SECONDS + 1,
+        ):
+            # The stale result is served, and refreshed once.
+            assert self.run_query() == [{"data": [{"count": 1}]}]
+        assert refresh_pool.submit.call_count == 1
+        assert bulk_query.call_count == 2
+
+        assert self.run_query() == [{"data": [{"count": 2}]}]
+        assert bulk_query.call_count == 2
+
+    @override_options({"snuba.query-cache.lock-wait-timeout": 0.0})
+    @mock.patch("sentry.utils.snuba._bulk_snuba_query", return_value=[{"data": []}])
+    def test_locked_by_another_process(self, bulk_query):
+        with _get_query_cache_lock(self.cache_key).acquire():
+            # Nobody fills the cache, the query is run after waiting.
+            assert self.run_query() == [{"data": []}]
+        assert bulk_query.call_count == 1
+
+        # The result is served from the cache written by the waiting process.
+        assert self.run_query() == [{"data": []}]
+        assert bulk_query.call_count == 1
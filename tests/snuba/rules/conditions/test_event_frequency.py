@@ -1,7 +1,7 @@
 import time
 from copy import deepcopy
 from datetime import timedelta, timezone
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 from uuid import uuid4
 
 import pytest
@@ -12,10 +12,11 @@ from sentry.models.rule import Rule
 from sentry.rules.conditions.event_frequency import (
     EventFrequencyCondition,
     EventFrequencyPercentCondition,
+    EventFrequencyQueryBatch,
     EventUniqueUserFrequencyCondition,
 )
 from sentry.testutils.abstract import Abstract
-from sentry.testutils.cases import PerformanceIssueTestCase, RuleTestCase, SnubaTestCase
+from sentry.testutils.cases import PerformanceIssueTestCase, RuleTestCase, SnubaTestCase, TestCase
 from sentry.testutils.helpers.datetime import before_now, freeze_time, iso_format
 from sentry.testutils.silo import region_silo_test
 from sentry.testutils.skips import requires_snuba
@@ -506,3 +507,90 @@ class PerfIssuePlatformIssueEventFrequencyPercentConditionTestCase(
     EventFrequencyPercentConditionTestCase,
 ):
     pass
+
+
+@freeze_time((now() - timedelta(days=2)).replace(hour=12, minute=42, second=0, microsecond=0))
+@region_silo_test
+class EventFrequencyQueryBatchTest(TestCase):
+    def setUp(self):
+        self.tsdb = MagicMock()
+        self.tsdb.get_sums.side_effect = lambda keys, **kwargs: {key: key for key in keys}
+        self.groups = [self.create_group(project=self.project) for _ in range(2)]
+
+    def get_condition(self, batch, **data):
+        return EventFrequencyCondition(
+            self.project, data={"value": 1, **data}, rule=Rule(), tsdb=self.tsdb, batch=batch
+        )
+
+    def test_single_query_per_window(self):
+        batch = EventFrequencyQueryBatch()
+        conditions = [
+            self.get_condition(batch, interval=interval) for interval in ("1m", "1m", "5m")
+        ]
+        for condition in conditions:
+            for group in self.groups:
+                batch.add(condition, group, None)
+
+        for condition in conditions:
+            interval = condition.get_option("interval")
+            for group in self.groups:
+                assert condition.get_rate(MagicMock(group=group), interval, None) == group.id
+
+        assert self.tsdb.get_sums.call_count == 2
+        for call in self.tsdb.get_sums.call_args_list:
+            assert call.kwargs["keys"] == [group.id for group in self.groups]
+            assert call.kwargs["end"] == batch.now
+            assert call.kwargs["jitter_value"] is None
+
+    def test_single_group_same_query(self):
+        group = self.groups[0]
+        event = MagicMock(group=group, group_id=group.id)
+        for condition_cls, query in (
+            (EventFrequencyCondition, self.tsdb.get_sums),
+            (EventUniqueUserFrequencyCondition, self.tsdb.get_distinct_counts_totals),
+        ):
+            query.side_effect = lambda keys, **kwargs: {key: key for key in keys}
+            for batch in (None, EventFrequencyQueryBatch()):
+                condition = condition_cls(
+                    self.project,
+                    data={"value": 1, "interval": "1h"},
+                    rule=Rule(),
+                    tsdb=self.tsdb,
+                    batch=batch,
+                )
+                assert condition.get_rate(event, "1h", None) == group.id
+
+            # The batch queries the single group like a condition without
+            # one would, so both count the same events.
+            unbatched, batched = query.call_args_list
+            assert batched == unbatched
+            assert batched.kwargs["jitter_value"] == group.id
+
+    def test_long_windows_end_now(self):
+        batch = EventFrequencyQueryBatch()
+        condition = self.get_condition(batch, interval="1h")
+        group = self.groups[0]
+        assert batch.get_rate(condition, group, "1h", None) == group.id
+        (call,) = self.tsdb.get_sums.call_args_list
+        assert call.kwargs["end"] == batch.now
+        assert call.kwargs["start"] == batch.now - timedelta(hours=1)
+
+        # Counts are not shared between events.
+        batch = EventFrequencyQueryBatch()
+        condition = self.get_condition(batch, interval="1h")
+        assert batch.get_rate(condition, group, "1h", None) == group.id
+        assert self.tsdb.get_sums.call_count == 2
+
+    def test_percent_comparison(self):
+        counts = iter([30, 10])
+        self.tsdb.get_sums.side_effect = lambda keys, **kwargs: {key: next(counts) for key in keys}
+        batch = EventFrequencyQueryBatch()
+        condition = self.get_condition(
+            batch, interval="5m", comparisonType="percent", comparisonInterval="1h"
+        )
+        group = self.groups[0]
+        assert batch.get_rate(condition, group, "5m", None) == 200
+
+        current, comparison = self.tsdb.get_sums.call_args_list
+        assert current.kwargs["end"] == batch.now
+        assert comparison.kwargs["end"] == batch.now - timedelta(hours=1)